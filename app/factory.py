@@ -6,12 +6,17 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, RedirectResponse
 from fastapi import Request, Depends, Cookie, status, HTTPException
 import secrets
 import time
 from typing import Optional, Dict
 
+try:
+    import orjson
+except ImportError:  # optional C serializer; fall back to the stdlib json module
+    orjson = None
+
 from app.config import APP_TITLE, APP_VERSION, DEBUG, USE_JSON
 from app.services import supa
 from app.middleware import CSRFMiddleware
@@ -78,7 +83,8 @@ def create_app() -> FastAPI:
     app = FastAPI(
         title=APP_TITLE,
         version=APP_VERSION,
-        debug=DEBUG
+        debug=DEBUG,
+        default_response_class=ORJSONResponse if orjson is not None else JSONResponse,
     )
     
     # Add CORS middleware
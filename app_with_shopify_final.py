@@ -15,7 +15,7 @@ from PIL import Image
 from typing import Optional, List, Dict, Any
 
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request, Depends, Cookie, status
-from fastapi.responses import FileResponse, HTMLResponse, RedirectResponse, JSONResponse, StreamingResponse
+from fastapi.responses import FileResponse, HTMLResponse, RedirectResponse, JSONResponse, ORJSONResponse, StreamingResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
@@ -46,7 +46,9 @@ NAV_ITEMS = [
     {"id": "analytics", "name": "System Analytics", "icon": "📈", "url": "/admin/analytics", "active": False, "badge": "Soon", "required_roles": ["owner", "admin"]},
 ]
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from pydantic import BaseModel
 from starlette.middleware.base import BaseHTTPMiddleware
 
 # Authentication imports
@@ -59,16 +61,39 @@ from datetime import datetime
 from processor import process_csv_file, extract_color
 
 import io
+import asyncio
+import csv
+import functools
+import gzip
+import zipfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import datetime
+try:
+    import orjson
+except ImportError:  # optional C serializer; fall back to the stdlib json module
+    orjson = None
 import requests
+import httpx
 from typing import Dict, List, Any
 import json
 # import aiohttp  # Temporarily disabled for Windows compatibility
 from PIL import Image
 # import zipstream_ng as zipstream  # Removed for Windows compatibility
 
-app = FastAPI(title="Eraya Style Order Processor")
+# orjson serializes dict/list route results several times faster than the stdlib encoder
+app = FastAPI(
+    title="Eraya Style Order Processor",
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse,
+)
+
+
+def _json_dumps(payload) -> bytes:
+    """Serialize a JSON payload to bytes, via orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode("utf-8")
 
 # Authentication middleware
 class AuthMiddleware(BaseHTTPMiddleware):
@@ -110,6 +135,17 @@ class AuthMiddleware(BaseHTTPMiddleware):
 # Add authentication middleware
 app.add_middleware(AuthMiddleware)
 
+class VersionedStaticCacheMiddleware(BaseHTTPMiddleware):
+    """Mark content-versioned static assets (?v=<hash>) as immutable."""
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        if request.url.path.startswith("/static/") and "v" in request.query_params and response.status_code == 200:
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+app.add_middleware(VersionedStaticCacheMiddleware)
+
 # Shopify configuration from environment variables
 SHOPIFY_SHOP = os.getenv("SHOPIFY_SHOP", "")  # e.g., "mystore.myshopify.com"
 SHOPIFY_TOKEN = os.getenv("SHOPIFY_TOKEN", "")  # Admin API token
@@ -168,6 +204,9 @@ def _shopify_get(path: str, params: dict = None) -> dict:
 # In-memory store for attendance records
 ATTENDANCE_RECORDS = {}
 
+# Bumped on every check-in/out so pollers can revalidate with an ETag
+ATTENDANCE_STATE = {"version": 0}
+
 # In-memory store for employee data (name to ID mapping)
 EMPLOYEES = {
     "Ritik": "EMP001",
@@ -177,6 +216,7 @@ EMPLOYEES = {
     "Vishal": "EMP005",
     "Nishant": "EMP006",
 }
+EMPLOYEE_NAMES_BY_ID = {emp_id: name for name, emp_id in EMPLOYEES.items()}
 
 # User roles and permissions - ALL USERS GET FULL ACCESS
 USER_ROLES = {
@@ -246,6 +286,11 @@ USER_STATUS = {}  # Format: {"EMP001": {"status": "online", "last_seen": timesta
 # In-memory store for message reactions
 MESSAGE_REACTIONS = {}
 
+# Open chat event streams: stream key -> set of (event loop, queue) per subscriber
+CHAT_SUBSCRIBERS: Dict[str, set] = {}
+# Bumped on every published change to a stream, so conversation reads can revalidate with an ETag
+CHAT_STREAM_VERSIONS: Dict[str, int] = {}
+
 # -------------------- SHOPIFY INTEGRATION --------------------
 # Shopify store configuration - In production, use environment variables or database
 SHOPIFY_CONFIG = {
@@ -1078,6 +1123,49 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Already-compressed payloads gain nothing from gzip, and event streams must reach the client frame by frame
+_GZIP_SKIP_TYPES = ("application/zip", "text/event-stream")
+
+
+def _skip_gzip(start_message) -> bool:
+    headers = {k.lower(): v for k, v in start_message.get("headers", [])}
+    if b"content-encoding" in headers:
+        return True
+    content_type = headers.get(b"content-type", b"").decode("latin-1").split(";", 1)[0].strip().lower()
+    return content_type.startswith("image/") or content_type in _GZIP_SKIP_TYPES
+
+
+class SelectiveGZipMiddleware:
+    """GZip responses, except those _skip_gzip rejects by their response headers; those go out untouched."""
+
+    def __init__(self, app, minimum_size: int = 500, compresslevel: int = 9):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def app_with_bypass(scope, receive, gzip_send):
+            target = gzip_send
+
+            async def route(message):
+                nonlocal target
+                if message["type"] == "http.response.start" and _skip_gzip(message):
+                    # Hand this response straight to the client; the gzip responder never sees it
+                    target = send
+                await target(message)
+
+            await self.app(scope, receive, route)
+
+        gzip = GZipMiddleware(app_with_bypass, minimum_size=self.minimum_size, compresslevel=self.compresslevel)
+        await gzip(scope, receive, send)
+
+# The embedded pages are large, repetitive HTML/JS and compress very well
+app.add_middleware(SelectiveGZipMiddleware, minimum_size=1024, compresslevel=6)
+
 # Jobs memory store (in-memory; for production you'd use Redis/DB)
 JOBS = {}
 BASE_DIR = Path(os.getenv("DATA_DIR", "jobs"))
@@ -1215,8 +1303,8 @@ def api_download(job_id: str):
 
 
 # -------------------- ERAYA HUB ADD-ON (UI shell) --------------------
-def _eraya_style_page(title: str, body_html: str) -> HTMLResponse:
-    html = f"""
+def _eraya_shell_html(title: str, body_html: str) -> str:
+    return f"""
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -1603,7 +1691,52 @@ def _eraya_style_page(title: str, body_html: str) -> HTMLResponse:
 </body>
 </html>
 """
-    return HTMLResponse(html)
+
+
+def _compile_eraya_shell() -> bytes:
+    """Render the shell once with placeholders so pages only splice in their title and body."""
+    html = _eraya_shell_html("\0title\0", "\0body\0").replace("%", "%%")
+    return html.replace("\0title\0", "%s").replace("\0body\0", "%s").encode("utf-8")
+
+
+# Placeholders in document order: title, body, footer title
+_ERAYA_SHELL_TEMPLATE = _compile_eraya_shell()
+
+
+def _eraya_style_page(title: str, body_html: str) -> HTMLResponse:
+    title_bytes = title.encode("utf-8")
+    return HTMLResponse(_ERAYA_SHELL_TEMPLATE % (title_bytes, body_html.encode("utf-8"), title_bytes))
+
+
+def _static_script_tag(path: str) -> str:
+    """Script tag for a file under static/, versioned by content so it can be cached long-term."""
+    digest = hashlib.sha1((Path("static") / path).read_bytes()).hexdigest()[:10]
+    return f'    <script src="/static/{path}?v={digest}" defer></script>\n'
+
+
+def _build_static_page(title: str, body_html: str) -> Dict[str, Any]:
+    """Render a page whose body has no per-request data once, at import time."""
+    content = _eraya_style_page(title, body_html).body
+    digest = hashlib.md5(content).hexdigest()
+    return {
+        "content": content,
+        "etag": f'"{digest}"',
+        "content_gz": gzip.compress(content, 9),
+        "etag_gz": f'"{digest}-gzip"',
+    }
+
+
+def _serve_static_page(request: Request, page: Dict[str, Any]) -> Response:
+    """Return a prebuilt page, answering 304 when the client already has it."""
+    use_gzip = "gzip" in request.headers.get("accept-encoding", "")
+    etag = page["etag_gz"] if use_gzip else page["etag"]
+    headers = {"Cache-Control": "private, max-age=60", "ETag": etag, "Vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=page["content_gz"], media_type="text/html", headers=headers)
+    return Response(content=page["content"], media_type="text/html", headers=headers)
 
 
 # -------------------- ROOT REDIRECT --------------------
@@ -3510,11 +3643,7 @@ def get_dashboard_stats(current_user: Dict = Depends(require_roles())):
     for emp_id, records in ATTENDANCE_RECORDS.items():
         total_employees += 1
         # Get employee name
-        emp_name = None
-        for name, id_val in EMPLOYEES.items():
-            if id_val == emp_id:
-                emp_name = name
-                break
+        emp_name = EMPLOYEE_NAMES_BY_ID.get(emp_id)
         
         # Check if currently checked in (last record has no check_out_time)
         if records and "check_out_time" not in records[-1]:
@@ -3596,11 +3725,7 @@ def send_message(employee_id: str = Form(...), message: str = Form(...)):
         raise HTTPException(status_code=400, detail="Employee ID and message are required.")
     
     # Get employee name
-    employee_name = None
-    for name, emp_id in EMPLOYEES.items():
-        if emp_id == employee_id:
-            employee_name = name
-            break
+    employee_name = EMPLOYEE_NAMES_BY_ID.get(employee_id)
     
     if not employee_name:
         raise HTTPException(status_code=400, detail="Invalid employee ID.")
@@ -3629,8 +3754,31 @@ def get_messages(limit: int = 20):
     return JSONResponse(content={"messages": recent_messages})
 
 # -------------------- ADVANCED CHAT API --------------------
+# JSON request bodies for the chat page; file uploads stay multipart
+class ChannelMessageIn(BaseModel):
+    channel: str
+    employee_id: str
+    message: str = ""
+    file_info: Optional[Dict[str, Any]] = None
+
+class DirectMessageIn(BaseModel):
+    to_employee_id: str
+    from_employee_id: str
+    message: str = ""
+    file_info: Optional[Dict[str, Any]] = None
+
+class ReactionIn(BaseModel):
+    message_id: str
+    employee_id: str
+    emoji: str
+
+class UserStatusIn(BaseModel):
+    employee_id: str
+    status: str = "online"
+
 @app.post("/api/chat/channel/send")
-def send_channel_message(channel: str = Form(...), employee_id: str = Form(...), message: str = Form(...), file_info: str = Form(None)):
+def send_channel_message(payload: ChannelMessageIn):
+    channel, employee_id, message, file_info = payload.channel, payload.employee_id, payload.message, payload.file_info
     if channel not in CHAT_CHANNELS:
         raise HTTPException(status_code=400, detail="Invalid channel.")
     
@@ -3638,11 +3786,7 @@ def send_channel_message(channel: str = Form(...), employee_id: str = Form(...),
         raise HTTPException(status_code=400, detail="Employee ID and message or file are required.")
     
     # Get employee name
-    employee_name = None
-    for name, emp_id in EMPLOYEES.items():
-        if emp_id == employee_id:
-            employee_name = name
-            break
+    employee_name = EMPLOYEE_NAMES_BY_ID.get(employee_id)
     
     if not employee_name:
         raise HTTPException(status_code=400, detail="Invalid employee ID.")
@@ -3653,14 +3797,7 @@ def send_channel_message(channel: str = Form(...), employee_id: str = Form(...),
         found_links = extract_links_from_message(message)
         links = [get_link_preview(link) for link in found_links]
     
-    # Parse file info if provided
-    file_attachment = None
-    if file_info:
-        try:
-            import json
-            file_attachment = json.loads(file_info)
-        except:
-            pass
+    file_attachment = file_info or None
     
     # Create message object
     message_id = f"{channel}_{len(CHAT_CHANNELS[channel]['messages']) + 1}_{get_timestamp()}"
@@ -3683,13 +3820,26 @@ def send_channel_message(channel: str = Form(...), employee_id: str = Form(...),
     if len(CHAT_CHANNELS[channel]["messages"]) > 200:
         CHAT_CHANNELS[channel]["messages"].pop(0)
     
+    _publish_chat_event(f"channel:{channel}", {"type": "message", "message": {**chat_message, "reactions": {}}})
+    
     return JSONResponse(content={"status": "success", "message": "Message sent successfully.", "message_id": message_id})
 
+# Versions restart at 0 with the in-memory store, so tags carry a per-process epoch
+_CHAT_ETAG_EPOCH = secrets.token_hex(4)
+
+def _chat_etag(stream_key: str, limit: int) -> str:
+    return f'W/"{_CHAT_ETAG_EPOCH}-{CHAT_STREAM_VERSIONS.get(stream_key, 0)}-{limit}"'
+
 @app.get("/api/chat/channel/{channel_name}")
-def get_channel_messages(channel_name: str, limit: int = 50):
+def get_channel_messages(request: Request, channel_name: str, limit: int = 50):
     if channel_name not in CHAT_CHANNELS:
         raise HTTPException(status_code=404, detail="Channel not found.")
     
+    etag = _chat_etag(f"channel:{channel_name}", limit)
+    headers = {"Cache-Control": "private, no-cache", "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    
     messages = CHAT_CHANNELS[channel_name]["messages"]
     recent_messages = messages[-limit:] if len(messages) > limit else messages
     
@@ -3697,11 +3847,12 @@ def get_channel_messages(channel_name: str, limit: int = 50):
     for msg in recent_messages:
         msg["reactions"] = MESSAGE_REACTIONS.get(msg["id"], {})
     
-    return JSONResponse(content={
+    # Pre-serialized so the message list skips the response encoder's per-field walk
+    return Response(content=_json_dumps({
         "channel": channel_name,
         "channel_name": CHAT_CHANNELS[channel_name]["name"],
         "messages": recent_messages
-    })
+    }), media_type="application/json", headers=headers)
 
 @app.get("/api/chat/channels")
 def get_channels():
@@ -3718,18 +3869,15 @@ def get_channels():
     return JSONResponse(content={"channels": channels_info})
 
 @app.post("/api/chat/dm/send")
-def send_direct_message(to_employee_id: str = Form(...), from_employee_id: str = Form(...), message: str = Form(...), file_info: str = Form(None)):
+def send_direct_message(payload: DirectMessageIn):
+    to_employee_id, from_employee_id = payload.to_employee_id, payload.from_employee_id
+    message, file_info = payload.message, payload.file_info
     if not to_employee_id or not from_employee_id or (not message.strip() and not file_info):
         raise HTTPException(status_code=400, detail="All fields are required.")
     
     # Validate employee IDs
-    from_name = None
-    to_name = None
-    for name, emp_id in EMPLOYEES.items():
-        if emp_id == from_employee_id:
-            from_name = name
-        if emp_id == to_employee_id:
-            to_name = name
+    from_name = EMPLOYEE_NAMES_BY_ID.get(from_employee_id)
+    to_name = EMPLOYEE_NAMES_BY_ID.get(to_employee_id)
     
     if not from_name or not to_name:
         raise HTTPException(status_code=400, detail="Invalid employee ID.")
@@ -3746,14 +3894,7 @@ def send_direct_message(to_employee_id: str = Form(...), from_employee_id: str =
         found_links = extract_links_from_message(message)
         links = [get_link_preview(link) for link in found_links]
     
-    # Parse file info if provided
-    file_attachment = None
-    if file_info:
-        try:
-            import json
-            file_attachment = json.loads(file_info)
-        except:
-            pass
+    file_attachment = file_info or None
     
     # Create message object
     message_id = f"dm_{dm_key}_{len(DIRECT_MESSAGES[dm_key]) + 1}_{get_timestamp()}"
@@ -3777,6 +3918,8 @@ def send_direct_message(to_employee_id: str = Form(...), from_employee_id: str =
     if len(DIRECT_MESSAGES[dm_key]) > 500:
         DIRECT_MESSAGES[dm_key].pop(0)
     
+    _publish_chat_event(f"dm:{dm_key}", {"type": "message", "message": {**dm_message, "reactions": {}}})
+    
     return JSONResponse(content={"status": "success", "message": "DM sent successfully.", "message_id": message_id})
 
 # -------------------- SHOPIFY API ENDPOINTS --------------------
@@ -4582,12 +4725,17 @@ def get_user_navigation(employee_id: str, current_user: Dict = Depends(require_r
     })
 
 @app.get("/api/chat/dm/{other_employee_id}")
-def get_direct_messages(other_employee_id: str, current_employee_id: str, limit: int = 50):
+def get_direct_messages(request: Request, other_employee_id: str, current_employee_id: str, limit: int = 50):
     # Create DM key
     dm_key = "_".join(sorted([current_employee_id, other_employee_id]))
     
+    etag = _chat_etag(f"dm:{dm_key}", limit)
+    headers = {"Cache-Control": "private, no-cache", "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    
     if dm_key not in DIRECT_MESSAGES:
-        return JSONResponse(content={"messages": []})
+        return JSONResponse(content={"messages": []}, headers=headers)
     
     messages = DIRECT_MESSAGES[dm_key]
     recent_messages = messages[-limit:] if len(messages) > limit else messages
@@ -4596,10 +4744,11 @@ def get_direct_messages(other_employee_id: str, current_employee_id: str, limit:
     for msg in recent_messages:
         msg["reactions"] = MESSAGE_REACTIONS.get(msg["id"], {})
     
-    return JSONResponse(content={"messages": recent_messages})
+    return Response(content=_json_dumps({"messages": recent_messages}), media_type="application/json", headers=headers)
 
 @app.post("/api/chat/reaction/add")
-def add_reaction(message_id: str = Form(...), employee_id: str = Form(...), emoji: str = Form(...)):
+def add_reaction(payload: ReactionIn):
+    message_id, employee_id, emoji = payload.message_id, payload.employee_id, payload.emoji
     if not message_id or not employee_id or not emoji:
         raise HTTPException(status_code=400, detail="All fields are required.")
     
@@ -4612,10 +4761,12 @@ def add_reaction(message_id: str = Form(...), employee_id: str = Form(...), emoj
     if employee_id not in MESSAGE_REACTIONS[message_id][emoji]:
         MESSAGE_REACTIONS[message_id][emoji].append(employee_id)
     
+    _publish_reaction_event(message_id)
     return JSONResponse(content={"status": "success", "message": "Reaction added."})
 
 @app.post("/api/chat/reaction/remove")
-def remove_reaction(message_id: str = Form(...), employee_id: str = Form(...), emoji: str = Form(...)):
+def remove_reaction(payload: ReactionIn):
+    message_id, employee_id, emoji = payload.message_id, payload.employee_id, payload.emoji
     if not message_id or not employee_id or not emoji:
         raise HTTPException(status_code=400, detail="All fields are required.")
     
@@ -4629,10 +4780,12 @@ def remove_reaction(message_id: str = Form(...), employee_id: str = Form(...), e
             if not MESSAGE_REACTIONS[message_id]:
                 del MESSAGE_REACTIONS[message_id]
     
+    _publish_reaction_event(message_id)
     return JSONResponse(content={"status": "success", "message": "Reaction removed."})
 
 @app.post("/api/chat/status/update")
-def update_user_status(employee_id: str = Form(...), status: str = Form("online")):
+def update_user_status(payload: UserStatusIn):
+    employee_id, status = payload.employee_id, payload.status
     if not employee_id:
         raise HTTPException(status_code=400, detail="Employee ID is required.")
     
@@ -4640,6 +4793,7 @@ def update_user_status(employee_id: str = Form(...), status: str = Form("online"
         "status": status,
         "last_seen": get_timestamp()
     }
+    _publish_chat_event("presence", {"type": "presence"})
     
     return JSONResponse(content={"status": "success", "message": "Status updated."})
 
@@ -4653,11 +4807,7 @@ def get_online_users():
         # Consider user online if they were active in the last 5 minutes
         if (current_time - last_seen).total_seconds() < 300:
             # Get employee name
-            emp_name = None
-            for name, id_val in EMPLOYEES.items():
-                if id_val == emp_id:
-                    emp_name = name
-                    break
+            emp_name = EMPLOYEE_NAMES_BY_ID.get(emp_id)
             
             online_users.append({
                 "employee_id": emp_id,
@@ -4668,6 +4818,65 @@ def get_online_users():
     
     return JSONResponse(content={"online_users": online_users})
 
+# -------------------- CHAT EVENT STREAM (SSE) --------------------
+def _publish_chat_event(stream_key: str, event: Dict[str, Any]) -> None:
+    """Push an event to every open stream for stream_key. Safe to call from sync (threadpool) routes."""
+    CHAT_STREAM_VERSIONS[stream_key] = CHAT_STREAM_VERSIONS.get(stream_key, 0) + 1
+    subscribers = CHAT_SUBSCRIBERS.get(stream_key)
+    if not subscribers:
+        return
+    payload = json.dumps(event)
+    for loop, queue in list(subscribers):
+        loop.call_soon_threadsafe(queue.put_nowait, payload)
+
+def _publish_reaction_event(message_id: str) -> None:
+    # Message ids are "<channel>_<n>_<ts>" or "dm_<emp>_<emp>_<n>_<ts>"
+    parts = message_id.split("_")
+    stream_key = f"dm:{parts[1]}_{parts[2]}" if parts[0] == "dm" and len(parts) > 2 else f"channel:{parts[0]}"
+    _publish_chat_event(stream_key, {
+        "type": "reaction",
+        "message_id": message_id,
+        "reactions": MESSAGE_REACTIONS.get(message_id, {}),
+    })
+
+@app.get("/api/chat/stream")
+async def chat_stream(request: Request, channel: str | None = None, dm: str | None = None, current_employee_id: str | None = None):
+    """Server-sent events for one conversation: new messages, reaction changes and presence updates."""
+    if channel:
+        if channel not in CHAT_CHANNELS:
+            raise HTTPException(status_code=404, detail="Channel not found.")
+        stream_key = f"channel:{channel}"
+    elif dm and current_employee_id:
+        stream_key = "dm:" + "_".join(sorted([current_employee_id, dm]))
+    else:
+        raise HTTPException(status_code=400, detail="channel or dm and current_employee_id are required.")
+
+    subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+    stream_keys = (stream_key, "presence")
+
+    async def event_stream():
+        for key in stream_keys:
+            CHAT_SUBSCRIBERS.setdefault(key, set()).add(subscriber)
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    payload = await asyncio.wait_for(subscriber[1].get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Comment frame keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {payload}\n\n"
+        finally:
+            for key in stream_keys:
+                CHAT_SUBSCRIBERS.get(key, set()).discard(subscriber)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @app.post("/api/chat/upload")
 async def upload_chat_file(file: UploadFile = File(...), employee_id: str = Form(...)):
     if not employee_id:
@@ -4719,6 +4928,7 @@ def check_in(employee_id: str = Form(...)):
         raise HTTPException(status_code=400, detail="Already checked in.")
 
     ATTENDANCE_RECORDS[employee_id].append({"check_in_time": get_timestamp()})
+    ATTENDANCE_STATE["version"] += 1
     return JSONResponse(content={"status": "success", "message": "Checked in successfully."})
 
 @app.post("/api/attendance/check_out")
@@ -4731,10 +4941,30 @@ def check_out(employee_id: str = Form(...)):
         raise HTTPException(status_code=400, detail="Already checked out.")
 
     last_record["check_out_time"] = get_timestamp()
+    ATTENDANCE_STATE["version"] += 1
     return JSONResponse(content={"status": "success", "message": "Checked out successfully."})
 
-@app.get("/api/attendance/records")
-def get_attendance_records(employee_id: str | None = None, date: str | None = None):
+# Attendance reads revalidate on every poll; the ETag changes only when the payload does
+ATTENDANCE_CACHE_HEADERS = {"Cache-Control": "private, no-cache"}
+
+@functools.lru_cache(maxsize=64)
+def _attendance_etag(content: bytes) -> str:
+    # Hash of the body itself, so a tag stays valid across restarts and workers (the version
+    # counter is per process); payloads come from the caches below, so each is hashed once
+    return f'W/"{hashlib.blake2b(content, digest_size=12).hexdigest()}"'
+
+def _attendance_json_response(request: Request, build_payload, *args) -> Response:
+    """Serve a cached attendance payload, or 304 when the client's copy is current."""
+    content = build_payload(ATTENDANCE_STATE["version"], *args)
+    etag = _attendance_etag(content)
+    headers = {**ATTENDANCE_CACHE_HEADERS, "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type="application/json", headers=headers)
+
+# The version argument keys these caches, so entries from before a check-in/out are never reused
+@functools.lru_cache(maxsize=64)
+def _attendance_records_payload(version: int, employee_id: str | None, date: str | None) -> bytes:
     filtered_records = {}
     for emp_id, records in ATTENDANCE_RECORDS.items():
         if employee_id and emp_id != employee_id:
@@ -4746,15 +4976,22 @@ def get_attendance_records(employee_id: str | None = None, date: str | None = No
                 record_date = datetime.datetime.fromisoformat(record["check_in_time"]).strftime("%Y-%m-%d")
                 if record_date != date:
                     continue
-            emp_filtered_records.append(record)
+            duration_hours = None
+            if "check_out_time" in record:
+                duration_hours = round(calculate_duration(record["check_in_time"], record["check_out_time"]), 2)
+            emp_filtered_records.append({**record, "duration_hours": duration_hours})
         
         if emp_filtered_records:
             filtered_records[emp_id] = emp_filtered_records
             
-    return JSONResponse(content=filtered_records)
+    return _json_dumps(filtered_records)
 
-@app.get("/api/attendance/report")
-def get_attendance_report(employee_id: str | None = None, start_date: str | None = None, end_date: str | None = None):
+@app.get("/api/attendance/records")
+def get_attendance_records(request: Request, employee_id: str | None = None, date: str | None = None):
+    return _attendance_json_response(request, _attendance_records_payload, employee_id, date)
+
+@functools.lru_cache(maxsize=64)
+def _attendance_report_payload(version: int, employee_id: str | None, start_date: str | None, end_date: str | None) -> bytes:
     report = {}
     for emp_id, records in ATTENDANCE_RECORDS.items():
         if employee_id and emp_id != employee_id:
@@ -4771,10 +5008,14 @@ def get_attendance_report(employee_id: str | None = None, start_date: str | None
                 total_hours += calculate_duration(record["check_in_time"], record["check_out_time"])
         if total_hours > 0 or not records: # Include employee even if 0 hours, but not if no records
              report[emp_id] = {"total_hours": round(total_hours, 2)}
-    return JSONResponse(content=report)
+    return _json_dumps(report)
 
-@app.get("/api/attendance/overtime")
-def get_overtime_report(threshold_hours: float = 8.0, employee_id: str | None = None, start_date: str | None = None, end_date: str | None = None):
+@app.get("/api/attendance/report")
+def get_attendance_report(request: Request, employee_id: str | None = None, start_date: str | None = None, end_date: str | None = None):
+    return _attendance_json_response(request, _attendance_report_payload, employee_id, start_date, end_date)
+
+@functools.lru_cache(maxsize=64)
+def _attendance_overtime_payload(version: int, threshold_hours: float, employee_id: str | None, start_date: str | None, end_date: str | None) -> bytes:
     overtime_report = {}
     for emp_id, records in ATTENDANCE_RECORDS.items():
         if employee_id and emp_id != employee_id:
@@ -4793,42 +5034,56 @@ def get_overtime_report(threshold_hours: float = 8.0, employee_id: str | None =
         if total_hours > 0 or not records:
             overtime = max(0.0, total_hours - threshold_hours)
             overtime_report[emp_id] = {"total_hours": round(total_hours, 2), "overtime_hours": round(overtime, 2)}
-    return JSONResponse(content=overtime_report)
-@app.get("/api/attendance/export")
-def export_attendance_data(employee_id: str | None = None, start_date: str | None = None, end_date: str | None = None):
-    data_for_df = []
-    for emp_id, records in ATTENDANCE_RECORDS.items():
+    return _json_dumps(overtime_report)
+
+@app.get("/api/attendance/overtime")
+def get_overtime_report(request: Request, threshold_hours: float = 8.0, employee_id: str | None = None, start_date: str | None = None, end_date: str | None = None):
+    return _attendance_json_response(request, _attendance_overtime_payload, threshold_hours, employee_id, start_date, end_date)
+def _iter_attendance_export_rows(snapshot: dict, employee_id: str | None, start_date: str | None, end_date: str | None):
+    """Yield CSV rows for attendance records matching the export filters."""
+    start = datetime.date.fromisoformat(start_date) if start_date else None
+    end = datetime.date.fromisoformat(end_date) if end_date else None
+    for emp_id, records in snapshot.items():
         if employee_id and emp_id != employee_id:
             continue
         for record in records:
-            if "check_in_time" in record:
-                record_date = datetime.datetime.fromisoformat(record["check_in_time"]).date()
-                if start_date and record_date < datetime.date.fromisoformat(start_date):
+            check_in = record.get("check_in_time")
+            check_out = record.get("check_out_time")
+            if check_in:
+                check_in_dt = datetime.datetime.fromisoformat(check_in)
+                if start and check_in_dt.date() < start:
                     continue
-                if end_date and record_date > datetime.date.fromisoformat(end_date):
+                if end and check_in_dt.date() > end:
                     continue
-            row = {"employee_id": emp_id}
-            row.update(record)
-            data_for_df.append(row)
+                check_in = str(check_in_dt)
+            if check_out:
+                check_out = str(datetime.datetime.fromisoformat(check_out))
+            yield [emp_id, check_in or "", check_out or ""]
 
-    if not data_for_df:
+@app.get("/api/attendance/export")
+def export_attendance_data(employee_id: str | None = None, start_date: str | None = None, end_date: str | None = None):
+    # Streaming runs after this handler returns, so copy the live records first; a concurrent
+    # check-in would otherwise change the dict mid-iteration and truncate the download
+    snapshot = {emp_id: list(records) for emp_id, records in ATTENDANCE_RECORDS.items()}
+    rows = _iter_attendance_export_rows(snapshot, employee_id, start_date, end_date)
+    first_row = next(rows, None)
+    if first_row is None:
         raise HTTPException(status_code=404, detail="No attendance data to export.")
 
-    df = pd.DataFrame(data_for_df)
-    
-    # Convert timestamps to datetime objects for better formatting in CSV
-    for col in ["check_in_time", "check_out_time"]:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col])
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["employee_id", "check_in_time", "check_out_time"])
+        writer.writerow(first_row)
+        yield buffer.getvalue()
+        for row in rows:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow(row)
+            yield buffer.getvalue()
 
-    csv_buffer = io.StringIO()
-    df.to_csv(csv_buffer, index=False)
-    
-    headers = {
-        "Content-Disposition": "attachment; filename=\"attendance_data.csv\"".encode('latin-1').decode('utf-8'),
-        "Content-Type": "text/csv",
-    }
-    return FileResponse(path=io.BytesIO(csv_buffer.getvalue().encode('utf-8')), media_type="text/csv", filename="attendance_data.csv", headers=headers)
+    headers = {"Content-Disposition": 'attachment; filename="attendance_data.csv"'}
+    return StreamingResponse(generate_csv(), media_type="text/csv", headers=headers)
 
 
 # -------------------- PACKING MANAGEMENT — API --------------------
@@ -6031,6 +6286,10 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
       let allRoles = {};
       let allPermissions = {};
       let currentEditingRole = null;
+      let visibleCheckboxes = [];
+      let rolesCache = null;
+      let rolesCacheAt = 0;
+      const ROLES_CACHE_TTL_MS = 60000;
       
       // DOM elements
       const searchInput = document.getElementById('searchUsers');
@@ -6047,15 +6306,63 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
       const selectedCount = document.getElementById('selectedCount');
       const userModal = document.getElementById('userModal');
       const closeModalBtn = document.getElementById('closeModal');
+      const modalEls = {
+        title: document.getElementById('modalTitle'),
+        photo: document.getElementById('modalUserPhoto'),
+        name: document.getElementById('modalUserName'),
+        email: document.getElementById('modalUserEmail'),
+        icon: document.getElementById('modalUserIcon'),
+        status: document.getElementById('modalUserStatus'),
+        roleSel: document.getElementById('changeUserRole'),
+        toggleBtn: document.getElementById('toggleUserStatus'),
+        passwordBtn: document.getElementById('changeUserPassword'),
+        deleteBtn: document.getElementById('deleteUserBtn'),
+        permissionsMatrix: document.getElementById('permissionsMatrix'),
+        editModeNotice: document.getElementById('editModeNotice')
+      };
       const manageRolesBtn = document.getElementById('manageRoles');
       const roleModal = document.getElementById('roleModal');
       const closeRoleModalBtn = document.getElementById('closeRoleModal');
       const roleEditModal = document.getElementById('roleEditModal');
       const closeRoleEditModalBtn = document.getElementById('closeRoleEditModal');
+      const roleEditEls = {
+        title: document.getElementById('roleEditTitle'),
+        name: document.getElementById('roleName'),
+        description: document.getElementById('roleDescription'),
+        color: document.getElementById('roleColor')
+      };
       const passwordModal = document.getElementById('passwordModal');
       const closePasswordModalBtn = document.getElementById('closePasswordModal');
+      const passwordModalUserName = document.getElementById('passwordModalUserName');
+      const passwordModalIcon = document.getElementById('passwordModalIcon');
+      const newPasswordInput = document.getElementById('newPassword');
+      const confirmPasswordInput = document.getElementById('confirmPassword');
+      const passwordMatchError = document.getElementById('passwordMatchError');
       const addUserModal = document.getElementById('addUserModal');
       const closeAddUserModalBtn = document.getElementById('closeAddUserModal');
+      // [form field name, input element id] pairs submitted by createNewUser
+      const USER_FORM_FIELDS = Object.freeze([
+        ['employee_id', 'newEmployeeId'],
+        ['name', 'newEmployeeName'],
+        ['email', 'newEmployeeEmail'],
+        ['phone', 'newEmployeePhone'],
+        ['role', 'newEmployeeRole'],
+        ['password', 'newEmployeePassword'],
+        ['joining_date', 'newEmployeeJoiningDate'],
+        ['shift', 'newEmployeeShift'],
+        ['manager', 'newEmployeeManager'],
+        ['address', 'newEmployeeAddress'],
+        ['city', 'newEmployeeCity'],
+        ['state', 'newEmployeeState'],
+        ['zip', 'newEmployeeZip'],
+        ['emergency_contact_name', 'emergencyContactName'],
+        ['emergency_contact_relation', 'emergencyContactRelation'],
+        ['emergency_contact_phone', 'emergencyContactPhone'],
+        ['emergency_contact_email', 'emergencyContactEmail']
+      ]);
+      const addUserFields = Object.fromEntries(
+        USER_FORM_FIELDS.map(([, id]) => [id, document.getElementById(id)])
+      );
       const editPermissionsBtn = document.getElementById('editPermissions');
       const savePermissionsBtn = document.getElementById('savePermissions');
       const cancelPermissionsBtn = document.getElementById('cancelPermissions');
@@ -6108,6 +6415,10 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
         closeRoleEditModalBtn.addEventListener('click', closeRoleEditModal);
         document.getElementById('cancelRoleEdit').addEventListener('click', closeRoleEditModal);
         document.getElementById('roleForm').addEventListener('submit', saveRole);
+        document.getElementById('rolePermissionsGrid').addEventListener('click', (e) => {
+          const toggle = e.target.closest('.permission-toggle');
+          if (toggle) toggleRolePermission(toggle);
+        });
         
         // Password Change Modal
         closePasswordModalBtn.addEventListener('click', closePasswordModal);
@@ -6117,8 +6428,12 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
         document.getElementById('passwordForm').addEventListener('submit', changeUserPassword);
         document.getElementById('cancelPasswordChange').addEventListener('click', closePasswordModal);
         
-        // Password validation
-        document.getElementById('confirmPassword').addEventListener('input', validatePasswordMatch);
+        // Password validation (debounced while typing, immediate on blur)
+        const debouncedPasswordCheck = debounce(validatePasswordMatch, 150);
+        newPasswordInput.addEventListener('input', debouncedPasswordCheck);
+        confirmPasswordInput.addEventListener('input', debouncedPasswordCheck);
+        newPasswordInput.addEventListener('blur', validatePasswordMatch);
+        confirmPasswordInput.addEventListener('blur', validatePasswordMatch);
         
         // Add User Modal
         document.getElementById('addNewUser').addEventListener('click', openAddUserModal);
@@ -6236,6 +6551,7 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
         if (users.length === 0) {
           usersTableBody.style.display = 'none';
           noUsers.style.display = 'block';
+          visibleCheckboxes = [];
           return;
         }
         
@@ -6299,9 +6615,10 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
         }).join('');
         
         // Add event listeners to checkboxes
-        document.querySelectorAll('.user-checkbox').forEach(checkbox => {
+        visibleCheckboxes = Array.from(usersTableBody.querySelectorAll('.user-checkbox'));
+        for (const checkbox of visibleCheckboxes) {
           checkbox.addEventListener('change', handleUserSelection);
-        });
+        }
         
         updateSelectionUI();
       }
@@ -6322,26 +6639,35 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
       }
       
       function toggleSelectAll() {
-        const visibleUsers = Array.from(document.querySelectorAll('.user-checkbox'));
-        
         if (selectAllCheckbox.checked) {
-          visibleUsers.forEach(checkbox => {
+          for (const checkbox of visibleCheckboxes) {
             checkbox.checked = true;
             selectedUsers.add(checkbox.dataset.userId);
             checkbox.closest('tr').classList.add('selected-row');
-          });
+          }
         } else {
-          visibleUsers.forEach(checkbox => {
+          for (const checkbox of visibleCheckboxes) {
             checkbox.checked = false;
             selectedUsers.delete(checkbox.dataset.userId);
             checkbox.closest('tr').classList.remove('selected-row');
-          });
+          }
         }
         
         updateSelectionUI();
       }
       
+      // Coalesce selection UI updates so bursts of changes cost one write pass per frame
+      let selectionUIPending = false;
       function updateSelectionUI() {
+        if (selectionUIPending) return;
+        selectionUIPending = true;
+        requestAnimationFrame(() => {
+          selectionUIPending = false;
+          renderSelectionUI();
+        });
+      }
+      
+      function renderSelectionUI() {
         const count = selectedUsers.size;
         selectedCount.textContent = count;
         
@@ -6356,10 +6682,12 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
         }
         
         // Update select all checkbox
-        const visibleCheckboxes = document.querySelectorAll('.user-checkbox');
-        const checkedCheckboxes = document.querySelectorAll('.user-checkbox:checked');
-        selectAllCheckbox.indeterminate = checkedCheckboxes.length > 0 && checkedCheckboxes.length < visibleCheckboxes.length;
-        selectAllCheckbox.checked = visibleCheckboxes.length > 0 && checkedCheckboxes.length === visibleCheckboxes.length;
+        let checkedCount = 0;
+        for (const checkbox of visibleCheckboxes) {
+          if (checkbox.checked) checkedCount++;
+        }
+        selectAllCheckbox.indeterminate = checkedCount > 0 && checkedCount < visibleCheckboxes.length;
+        selectAllCheckbox.checked = visibleCheckboxes.length > 0 && checkedCount === visibleCheckboxes.length;
       }
       
       async function toggleUserStatus(userId) {
@@ -6370,8 +6698,7 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
           });
           
           if (response.ok) {
-            await loadUsers();
-            await loadUserStats();
+            await Promise.all([loadUsers(), loadUserStats()]);
           } else {
             throw new Error('Failed to toggle user status');
           }
@@ -6402,8 +6729,7 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
           
           if (response.ok) {
             selectedUsers.clear();
-            await loadUsers();
-            await loadUserStats();
+            await Promise.all([loadUsers(), loadUserStats()]);
           } else {
             throw new Error(`Failed to ${actionText} users`);
           }
@@ -6438,18 +6764,17 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
         currentModal = user;
         
         // Populate modal with user data
-        document.getElementById('modalTitle').textContent = `User Details - ${user.name}`;
-        document.getElementById('modalUserPhoto').src = user.photo;
-        document.getElementById('modalUserName').textContent = user.name;
-        document.getElementById('modalUserEmail').textContent = user.email;
+        modalEls.title.textContent = `User Details - ${user.name}`;
+        modalEls.photo.src = user.photo;
+        modalEls.name.textContent = user.name;
+        modalEls.email.textContent = user.email;
         
         // Set the cute icon
-        const modalUserIcon = document.getElementById('modalUserIcon');
-        modalUserIcon.textContent = user.icon || '👤';
-        modalUserIcon.style.background = user.icon_color || '#6b7280';
+        modalEls.icon.textContent = user.icon || '👤';
+        modalEls.icon.style.background = user.icon_color || '#6b7280';
         
         const statusClass = user.status === 'active' ? 'status-active' : 'status-inactive';
-        document.getElementById('modalUserStatus').innerHTML = `
+        modalEls.status.innerHTML = `
           <span class="px-3 py-1 rounded-full text-xs font-semibold text-white ${statusClass}">
             ${user.status.charAt(0).toUpperCase() + user.status.slice(1)}
           </span>
@@ -6457,11 +6782,9 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
         
         // Populate role dropdown
         try {
-          const rolesResponse = await fetch('/api/roles');
-          const rolesData = await rolesResponse.json();
+          const rolesData = await getRoles();
           
-          const roleSelect = document.getElementById('changeUserRole');
-          roleSelect.innerHTML = Object.keys(rolesData.roles).map(role => 
+          modalEls.roleSel.innerHTML = Object.keys(rolesData.roles).map(role => 
             `<option value="${role}" ${user.role === role ? 'selected' : ''}>${role}</option>`
           ).join('');
           
@@ -6480,12 +6803,12 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
         userModal.classList.add('flex');
         
         // Setup modal event listeners
-        document.getElementById('toggleUserStatus').onclick = () => {
+        modalEls.toggleBtn.onclick = () => {
           toggleUserStatus(userId);
           closeModal();
         };
         
-        document.getElementById('changeUserRole').onchange = async (e) => {
+        modalEls.roleSel.onchange = async (e) => {
           const newRole = e.target.value;
           if (newRole !== user.role) {
             try {
@@ -6500,9 +6823,16 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
                 user.role = newRole;
                 updateUserIcon(user);
                 
-                await loadUsers();
-                await loadUserStats();
-                openUserModal(userId); // Refresh modal
+                await Promise.all([loadUsers(), loadUserStats()]);
+                
+                // Refresh only the role-dependent parts of the open modal
+                const updatedUser = allUsers.find(u => u.id === userId) || user;
+                if (currentModal && currentModal.id === userId) {
+                  currentModal = updatedUser;
+                  modalEls.icon.textContent = updatedUser.icon || '👤';
+                  modalEls.icon.style.background = updatedUser.icon_color || '#6b7280';
+                  renderPermissionsMatrix(updatedUser, false);
+                }
                 
                 // Show success message
                 alert(`Role updated successfully! ${user.name} is now a ${newRole}.`);
@@ -6513,11 +6843,11 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
           }
         };
         
-        document.getElementById('changeUserPassword').onclick = () => {
+        modalEls.passwordBtn.onclick = () => {
           openPasswordModal(userId, user.name);
         };
 
-        document.getElementById('deleteUserBtn').onclick = async () => {
+        modalEls.deleteBtn.onclick = async () => {
           if (!confirm(`Are you sure you want to delete ${user.name} (${user.id})? This cannot be undone.`)) {
             return;
           }
@@ -6526,8 +6856,7 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
             if (response.ok) {
               alert('User deleted successfully');
               closeModal();
-              await loadUsers();
-              await loadUserStats();
+              await Promise.all([loadUsers(), loadUserStats()]);
             } else {
               const err = await response.json().catch(() => ({ detail: 'Failed to delete user' }));
               alert(err.detail || 'Failed to delete user');
@@ -6545,11 +6874,11 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
       }
       
       function openPasswordModal(userId, userName) {
-        document.getElementById('passwordModalUserName').textContent = userName;
-        document.getElementById('passwordModalIcon').textContent = '🔑';
-        document.getElementById('newPassword').value = '';
-        document.getElementById('confirmPassword').value = '';
-        document.getElementById('passwordMatchError').classList.add('hidden');
+        passwordModalUserName.textContent = userName;
+        passwordModalIcon.textContent = '🔑';
+        newPasswordInput.value = '';
+        confirmPasswordInput.value = '';
+        passwordMatchError.classList.add('hidden');
         
         // Store current user ID for the password change
         passwordModal.dataset.userId = userId;
@@ -6560,7 +6889,7 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
         
         // Focus on password field
         setTimeout(() => {
-          document.getElementById('newPassword').focus();
+          newPasswordInput.focus();
         }, 100);
       }
       
@@ -6569,21 +6898,20 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
         passwordModal.classList.remove('flex');
         
         // Clear form
-        document.getElementById('newPassword').value = '';
-        document.getElementById('confirmPassword').value = '';
-        document.getElementById('passwordMatchError').classList.add('hidden');
+        newPasswordInput.value = '';
+        confirmPasswordInput.value = '';
+        passwordMatchError.classList.add('hidden');
       }
       
       function validatePasswordMatch() {
-        const newPassword = document.getElementById('newPassword').value;
-        const confirmPassword = document.getElementById('confirmPassword').value;
-        const errorDiv = document.getElementById('passwordMatchError');
+        const newPassword = newPasswordInput.value;
+        const confirmPassword = confirmPasswordInput.value;
         
         if (confirmPassword && newPassword !== confirmPassword) {
-          errorDiv.classList.remove('hidden');
+          passwordMatchError.classList.remove('hidden');
           return false;
         } else {
-          errorDiv.classList.add('hidden');
+          passwordMatchError.classList.add('hidden');
           return true;
         }
       }
@@ -6591,10 +6919,12 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
       async function changeUserPassword(event) {
         event.preventDefault();
         
-        const newPassword = document.getElementById('newPassword').value;
-        const confirmPassword = document.getElementById('confirmPassword').value;
+        const newPassword = newPasswordInput.value;
+        const confirmPassword = confirmPasswordInput.value;
         const userId = passwordModal.dataset.userId;
         
+        validatePasswordMatch();
+        
         // Validate passwords
         if (newPassword.length < 6) {
           alert('Password must be at least 6 characters long');
@@ -6629,19 +6959,19 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
       
       // Add User Modal Functions
       let uploadedPhoto = null;
-      let uploadedDocuments = [];
+      const uploadedDocumentsMap = new Map(); // file name -> {file, node}
       
       async function openAddUserModal() {
         // Clear form
         document.getElementById('addUserForm').reset();
         document.getElementById('photoPreview').innerHTML = '👤';
         document.getElementById('documentsPreview').innerHTML = '';
-        uploadedPhoto = null;
-        uploadedDocuments = [];
+        releaseUploadedPhoto();
+        uploadedDocumentsMap.clear();
         
         // Set default joining date to today
         const today = new Date().toISOString().split('T')[0];
-        document.getElementById('newEmployeeJoiningDate').value = today;
+        addUserFields.newEmployeeJoiningDate.value = today;
         
         // Load and populate roles dropdown
         await loadRolesForForm();
@@ -6655,7 +6985,7 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
         
         // Focus on employee ID field
         setTimeout(() => {
-          document.getElementById('newEmployeeId').focus();
+          addUserFields.newEmployeeId.focus();
         }, 100);
       }
       
@@ -6665,14 +6995,13 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
         
         // Clear form and uploads
         document.getElementById('addUserForm').reset();
-        uploadedPhoto = null;
-        uploadedDocuments = [];
+        releaseUploadedPhoto();
+        uploadedDocumentsMap.clear();
       }
       
       async function loadRolesForForm() {
         try {
-          const response = await fetch('/api/roles');
-          const data = await response.json();
+          const data = await getRoles();
           
           if (data.roles) {
             allRoles = data.roles;
@@ -6686,20 +7015,15 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
       }
       
       function populateRolesDropdown() {
-        const roleSelect = document.getElementById('newEmployeeRole');
-        roleSelect.innerHTML = '<option value="">Select Role</option>';
-        
-        Object.keys(allRoles).forEach(roleKey => {
-          const role = allRoles[roleKey];
-          const option = document.createElement('option');
-          option.value = roleKey;
-          option.textContent = role.name;
-          roleSelect.appendChild(option);
-        });
+        const roleSelect = addUserFields.newEmployeeRole;
+        roleSelect.innerHTML = '<option value="">Select Role</option>' +
+          Object.entries(allRoles).map(([roleKey, role]) =>
+            `<option value="${escapeHtml(roleKey)}">${escapeHtml(role.name)}</option>`
+          ).join('');
       }
       
       function populateRolesDropdownFallback() {
-        const roleSelect = document.getElementById('newEmployeeRole');
+        const roleSelect = addUserFields.newEmployeeRole;
         roleSelect.innerHTML = `
           <option value="">Select Role</option>
           <option value="owner">Company Owner</option>
@@ -6710,7 +7034,7 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
       }
       
       function populateManagersDropdown() {
-        const managerSelect = document.getElementById('newEmployeeManager');
+        const managerSelect = addUserFields.newEmployeeManager;
         managerSelect.innerHTML = '<option value="">Select Manager</option>';
         
         // Get users who are managers, admins, or owners
@@ -6718,12 +7042,12 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
           ['owner', 'admin', 'manager'].includes(user.role) && user.status === 'active'
         );
         
-        managers.forEach(manager => {
+        for (const manager of managers) {
           const option = document.createElement('option');
           option.value = manager.id;
           option.textContent = `${manager.name} (${manager.role})`;
           managerSelect.appendChild(option);
-        });
+        }
       }
       
       function handlePhotoUpload(event) {
@@ -6743,32 +7067,34 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
         }
         
         // Create preview
-        const reader = new FileReader();
-        reader.onload = function(e) {
-          const preview = document.getElementById('photoPreview');
-          preview.innerHTML = `<img src="${e.target.result}" class="w-full h-full object-cover rounded-full">`;
-          uploadedPhoto = {
-            file: file,
-            data: e.target.result
-          };
+        releaseUploadedPhoto();
+        const url = URL.createObjectURL(file);
+        const preview = document.getElementById('photoPreview');
+        preview.innerHTML = `<img src="${url}" class="w-full h-full object-cover rounded-full">`;
+        uploadedPhoto = {
+          file: file,
+          url: url
         };
-        reader.readAsDataURL(file);
+      }
+      
+      function releaseUploadedPhoto() {
+        if (uploadedPhoto) {
+          URL.revokeObjectURL(uploadedPhoto.url);
+          uploadedPhoto = null;
+        }
       }
       
       function handleDocumentsUpload(event) {
-        const files = Array.from(event.target.files);
         const preview = document.getElementById('documentsPreview');
+        const fragment = document.createDocumentFragment();
         
-        files.forEach(file => {
+        for (const file of event.target.files) {
           // Validate file size (10MB limit per file)
           if (file.size > 10 * 1024 * 1024) {
             alert(`File ${file.name} is too large. Maximum size is 10MB`);
-            return;
+            continue;
           }
           
-          // Add to uploaded documents
-          uploadedDocuments.push(file);
-          
           // Create preview item
           const docItem = document.createElement('div');
           docItem.className = 'flex items-center justify-between bg-slate-800/50 rounded-lg p-3';
@@ -6782,62 +7108,63 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
             </div>
             <button type="button" onclick="removeDocument('${file.name}')" class="text-red-400 hover:text-red-300">✕</button>
           `;
-          preview.appendChild(docItem);
-        });
+          
+          // Add to uploaded documents, replacing any earlier file with the same name
+          const existing = uploadedDocumentsMap.get(file.name);
+          if (existing) existing.node.remove();
+          uploadedDocumentsMap.set(file.name, { file, node: docItem });
+          fragment.appendChild(docItem);
+        }
+        preview.appendChild(fragment);
         
         // Clear input
         event.target.value = '';
       }
       
+      const FILE_ICON_PREFIXES = [
+        ['application/pdf', '📄'],
+        ['image/', '🖼️'],
+        ['application/msword', '📝'],
+        // Every Office Open XML / OpenDocument type (docx, xlsx, pptx, odt, ...) kept the
+        // document icon under the old 'doc' substring check
+        ['application/vnd.openxmlformats-officedocument.', '📝'],
+        ['application/vnd.oasis.opendocument.', '📝']
+      ];
+      
       function getFileIcon(fileType) {
-        if (fileType.includes('pdf')) return '📄';
-        if (fileType.includes('doc')) return '📝';
-        if (fileType.includes('image')) return '🖼️';
+        for (const [prefix, icon] of FILE_ICON_PREFIXES) {
+          if (fileType.startsWith(prefix)) return icon;
+        }
         return '📎';
       }
       
       function formatFileSize(bytes) {
-        if (bytes === 0) return '0 Bytes';
-        const k = 1024;
+        if (!bytes) return '0 Bytes';
         const sizes = ['Bytes', 'KB', 'MB', 'GB'];
-        const i = Math.floor(Math.log(bytes) / Math.log(k));
-        return parseFloat((bytes / Math.pow(k, i)).toFixed(2)) + ' ' + sizes[i];
+        let i = 0;
+        let n = bytes;
+        while (n >= 1024 && i < sizes.length - 1) {
+          n /= 1024;
+          i++;
+        }
+        return Math.round(n * 100) / 100 + ' ' + sizes[i];
       }
       
       function removeDocument(fileName) {
-        uploadedDocuments = uploadedDocuments.filter(doc => doc.name !== fileName);
-        
-        // Refresh preview
-        const preview = document.getElementById('documentsPreview');
-        const items = preview.querySelectorAll('div');
-        items.forEach(item => {
-          if (item.textContent.includes(fileName)) {
-            item.remove();
-          }
-        });
+        const entry = uploadedDocumentsMap.get(fileName);
+        if (entry) {
+          entry.node.remove();
+          uploadedDocumentsMap.delete(fileName);
+        }
       }
       async function createNewUser(event) {
         event.preventDefault();
         
         // Get form data
         const formData = new FormData();
-        formData.append('employee_id', document.getElementById('newEmployeeId').value);
-        formData.append('name', document.getElementById('newEmployeeName').value);
-        formData.append('email', document.getElementById('newEmployeeEmail').value);
-        formData.append('phone', document.getElementById('newEmployeePhone').value);
-        formData.append('role', document.getElementById('newEmployeeRole').value);
-        formData.append('password', document.getElementById('newEmployeePassword').value);
-        formData.append('joining_date', document.getElementById('newEmployeeJoiningDate').value);
-        formData.append('shift', document.getElementById('newEmployeeShift').value);
-        formData.append('manager', document.getElementById('newEmployeeManager').value);
-        formData.append('address', document.getElementById('newEmployeeAddress').value);
-        formData.append('city', document.getElementById('newEmployeeCity').value);
-        formData.append('state', document.getElementById('newEmployeeState').value);
-        formData.append('zip', document.getElementById('newEmployeeZip').value);
-        formData.append('emergency_contact_name', document.getElementById('emergencyContactName').value);
-        formData.append('emergency_contact_relation', document.getElementById('emergencyContactRelation').value);
-        formData.append('emergency_contact_phone', document.getElementById('emergencyContactPhone').value);
-        formData.append('emergency_contact_email', document.getElementById('emergencyContactEmail').value);
+        for (const [key, id] of USER_FORM_FIELDS) {
+          formData.append(key, addUserFields[id].value);
+        }
         
         // Add photo if uploaded
         if (uploadedPhoto) {
@@ -6845,9 +7172,10 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
         }
         
         // Add documents if uploaded
-        uploadedDocuments.forEach((doc, index) => {
-          formData.append(`document_${index}`, doc);
-        });
+        let docIndex = 0;
+        for (const { file } of uploadedDocumentsMap.values()) {
+          formData.append(`document_${docIndex++}`, file);
+        }
         
         try {
           const response = await fetch('/api/users/create', {
@@ -6860,8 +7188,7 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
           if (response.ok && result.success) {
             alert(result.message);
             closeAddUserModal();
-            await loadUsers();
-            await loadUserStats();
+            await Promise.all([loadUsers(), loadUserStats()]);
           } else {
             alert(result.message || 'Failed to create user');
           }
@@ -6870,6 +7197,31 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
         }
       }
       
+      // Roles change rarely; reuse the last /api/roles payload for a minute
+      async function getRoles() {
+        if (rolesCache && performance.now() - rolesCacheAt < ROLES_CACHE_TTL_MS) {
+          return rolesCache;
+        }
+        const response = await fetch('/api/roles');
+        const data = await response.json();
+        rolesCache = data;
+        rolesCacheAt = performance.now();
+        return data;
+      }
+      
+      function invalidateRolesCache() {
+        rolesCache = null;
+      }
+      
+      function escapeHtml(value) {
+        return String(value)
+          .replace(/&/g, '&amp;')
+          .replace(/</g, '&lt;')
+          .replace(/>/g, '&gt;')
+          .replace(/"/g, '&quot;')
+          .replace(/'/g, '&#39;');
+      }
+      
       function formatDateTime(dateString) {
         const date = new Date(dateString);
         return date.toLocaleDateString() + ' ' + date.toLocaleTimeString([], {hour: '2-digit', minute:'2-digit'});
@@ -6896,7 +7248,7 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
         editPermissionsBtn.style.display = 'none';
         savePermissionsBtn.style.display = 'inline-block';
         cancelPermissionsBtn.style.display = 'inline-block';
-        document.getElementById('editModeNotice').style.display = 'block';
+        modalEls.editModeNotice.style.display = 'block';
         
         // Make permission cards clickable
         renderPermissionsMatrix(currentModal, true);
@@ -6910,7 +7262,7 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
         editPermissionsBtn.style.display = 'inline-block';
         savePermissionsBtn.style.display = 'none';
         cancelPermissionsBtn.style.display = 'none';
-        document.getElementById('editModeNotice').style.display = 'none';
+        modalEls.editModeNotice.style.display = 'none';
         
         // Restore original permissions display
         renderPermissionsMatrix(currentModal, false);
@@ -6925,14 +7277,14 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
           });
           
           if (response.ok) {
+            invalidateRolesCache();
             editingPermissions = false;
             editPermissionsBtn.style.display = 'inline-block';
             savePermissionsBtn.style.display = 'none';
             cancelPermissionsBtn.style.display = 'none';
-            document.getElementById('editModeNotice').style.display = 'none';
+            modalEls.editModeNotice.style.display = 'none';
             
-            await loadUsers();
-            await loadUserStats();
+            await Promise.all([loadUsers(), loadUserStats()]);
             renderPermissionsMatrix(currentModal, false);
             
             alert('Permissions updated successfully!');
@@ -6945,10 +7297,12 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
       }
       
       function renderPermissionsMatrix(user, editable = false) {
-        const permissionsMatrix = document.getElementById('permissionsMatrix');
+        const permissionsMatrix = modalEls.permissionsMatrix;
+        const permSet = new Set(user.permissions);
+        const hasAll = permSet.has('all');
         
         permissionsMatrix.innerHTML = Object.entries(allPermissions).map(([key, perm]) => {
-          const isEnabled = user.permissions.includes(key) || user.permissions.includes('all');
+          const isEnabled = hasAll || permSet.has(key);
           const enabledClass = isEnabled ? 'permission-enabled' : 'permission-disabled';
           const editableClass = editable ? 'permission-editable' : '';
           const clickHandler = editable ? `onclick="togglePermission('${key}')"` : '';
@@ -6989,8 +7343,7 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
       // Role Management Functions
       async function openRoleModal() {
         try {
-          const response = await fetch('/api/roles');
-          const data = await response.json();
+          const data = await getRoles();
           
           allRoles = data.roles;
           allPermissions = data.permissions;
@@ -7003,6 +7356,7 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
           // Setup event listeners for role actions
           document.getElementById('createNewRole').onclick = () => openRoleEditModal();
           document.getElementById('refreshRoles').onclick = () => {
+            invalidateRolesCache();
             openRoleModal(); // Refresh
           };
           
@@ -7019,10 +7373,14 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
       function renderRolesGrid() {
         const rolesGrid = document.getElementById('rolesGrid');
         
+        // Count users per role in one pass rather than filtering per card
+        const roleCounts = Object.create(null);
+        for (const u of allUsers) roleCounts[u.role] = (roleCounts[u.role] || 0) + 1;
+        
         rolesGrid.innerHTML = Object.entries(allRoles).map(([roleName, role]) => {
           const isCustom = role.custom || false;
           const cardClass = isCustom ? 'role-custom' : 'role-system';
-          const userCount = allUsers.filter(u => u.role === roleName).length;
+          const userCount = roleCounts[roleName] || 0;
           
           return `
             <div class="glass p-4 role-card ${cardClass}" style="border-left: 4px solid ${role.color}">
@@ -7056,13 +7414,13 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
         const role = isEditing ? allRoles[roleName] : null;
         
         // Update modal title
-        document.getElementById('roleEditTitle').textContent = isEditing ? `Edit Role: ${roleName}` : 'Create New Role';
+        roleEditEls.title.textContent = isEditing ? `Edit Role: ${roleName}` : 'Create New Role';
         
         // Populate form
-        document.getElementById('roleName').value = role ? role.name : '';
-        document.getElementById('roleName').disabled = isEditing && !role?.custom; // Can't rename system roles
-        document.getElementById('roleDescription').value = role ? role.description : '';
-        document.getElementById('roleColor').value = role ? role.color : '#6b7280';
+        roleEditEls.name.value = role ? role.name : '';
+        roleEditEls.name.disabled = isEditing && !role?.custom; // Can't rename system roles
+        roleEditEls.description.value = role ? role.description : '';
+        roleEditEls.color.value = role ? role.color : '#6b7280';
         
         // Render permissions grid
         renderRolePermissionsGrid(role ? role.permissions : []);
@@ -7080,13 +7438,14 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
       
       function renderRolePermissionsGrid(selectedPermissions) {
         const grid = document.getElementById('rolePermissionsGrid');
+        const selectedSet = new Set(selectedPermissions);
         
         grid.innerHTML = Object.entries(allPermissions).map(([key, perm]) => {
-          const isSelected = selectedPermissions.includes(key);
+          const isSelected = selectedSet.has(key);
           const toggleClass = isSelected ? 'active' : 'inactive';
           
           return `
-            <div class="permission-toggle ${toggleClass} p-3 rounded-lg border cursor-pointer" onclick="toggleRolePermission('${key}')">
+            <div class="permission-toggle ${toggleClass} p-3 rounded-lg border cursor-pointer" data-permission="${key}">
               <div class="flex items-center gap-2">
                 <input type="checkbox" ${isSelected ? 'checked' : ''} readonly>
                 <div>
@@ -7099,11 +7458,10 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
         }).join('');
       }
       
-      function toggleRolePermission(permissionKey) {
-        const checkbox = event.target.closest('.permission-toggle').querySelector('input[type="checkbox"]');
+      function toggleRolePermission(toggle) {
+        const checkbox = toggle.querySelector('input[type="checkbox"]');
         checkbox.checked = !checkbox.checked;
         
-        const toggle = checkbox.closest('.permission-toggle');
         if (checkbox.checked) {
           toggle.classList.add('active');
           toggle.classList.remove('inactive');
@@ -7116,16 +7474,13 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
       async function saveRole(event) {
         event.preventDefault();
         
-        const roleName = document.getElementById('roleName').value.trim();
-        const roleDescription = document.getElementById('roleDescription').value.trim();
-        const roleColor = document.getElementById('roleColor').value;
+        const roleName = roleEditEls.name.value.trim();
+        const roleDescription = roleEditEls.description.value.trim();
+        const roleColor = roleEditEls.color.value;
         
         // Get selected permissions
         const selectedPermissions = Array.from(document.querySelectorAll('#rolePermissionsGrid input[type="checkbox"]:checked'))
-          .map(checkbox => {
-            const toggle = checkbox.closest('.permission-toggle');
-            return toggle.onclick.toString().match(/'([^']+)'/)[1];
-          });
+          .map(checkbox => checkbox.closest('.permission-toggle').dataset.permission);
         
         const roleData = {
           name: roleName,
@@ -7153,6 +7508,7 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
           }
           
           if (response.ok) {
+            invalidateRolesCache();
             closeRoleEditModal();
             await openRoleModal(); // Refresh roles
             await loadUsers(); // Refresh users
@@ -7181,6 +7537,7 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
           });
           
           if (response.ok) {
+            invalidateRolesCache();
             await openRoleModal(); // Refresh roles
             alert('Role deleted successfully!');
           } else {
@@ -7206,10 +7563,9 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
         user.icon_color = roleIconData.icon_color;
         
         // Update modal icon if it's currently open
-        const modalUserIcon = document.getElementById('modalUserIcon');
-        if (modalUserIcon && currentModal && currentModal.id === user.id) {
-          modalUserIcon.textContent = user.icon;
-          modalUserIcon.style.background = user.icon_color;
+        if (modalEls.icon && currentModal && currentModal.id === user.id) {
+          modalEls.icon.textContent = user.icon;
+          modalEls.icon.style.background = user.icon_color;
         }
       }
       
@@ -7217,7 +7573,6 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
       window.togglePermission = togglePermission;
       window.editRole = editRole;
       window.deleteRole = deleteRole;
-      window.toggleRolePermission = toggleRolePermission;
       window.updateUserIcon = updateUserIcon;
     </script>
     """
@@ -7225,20 +7580,20 @@ def user_management_page(current_user: Dict = Depends(require_roles("owner", "ad
     return _eraya_style_page("User Management", body)
 
 # -------------------- Pending & Attendance placeholders --------------------
-@app.get("/pending")
-def eraya_pending_page():
-    body = """
+_PENDING_BODY = """
     <section class="glass p-6">
       <h1 class="text-3xl font-bold">Pending Orders</h1>
       <p class="text-white/80 mt-2">Coming next.</p>
     </section>
     """
-    return _eraya_style_page("Pending Orders", body)
+_PENDING_PAGE = _build_static_page("Pending Orders", _PENDING_BODY)
 
+@app.get("/pending")
+def eraya_pending_page(request: Request):
+    return _serve_static_page(request, _PENDING_PAGE)
 
-@app.get("/attendance")
-def eraya_attendance_page(current_user: Dict = Depends(require_roles("owner", "admin", "manager", "packer"))):
-    body = """
+
+_ATTENDANCE_BODY = """
     <section class="glass p-6">
       <h1 class="text-3xl font-bold">Employee Attendance</h1>
       <p class="text-white/80 mt-2">Simple check-in/out and attendance records.</p>
@@ -7292,221 +7647,14 @@ def eraya_attendance_page(current_user: Dict = Depends(require_roles("owner", "a
       </div>
     </section>
 
-    <script>
-      const employeeIdInput = document.getElementById('employeeId');
-      const checkInBtn = document.getElementById('checkInBtn');
-      const checkOutBtn = document.getElementById('checkOutBtn');
-      const attendanceStatus = document.getElementById('attendanceStatus');
-      const attendanceTableBody = document.getElementById('attendanceTableBody');
-      const filterEmployeeIdInput = document.getElementById('filterEmployeeId');
-      const filterDateInput = document.getElementById('filterDate');
-      const applyFilterBtn = document.getElementById('applyFilterBtn');
-      const clearFilterBtn = document.getElementById('clearFilterBtn');
-      const realtimeStatusDiv = document.getElementById('realtimeStatus');
-      const employeeSelect = document.getElementById('employeeSelect');
-
-      // Populate employee dropdown
-      const employees = {
-          "Ritik": "EMP001",
-          "Sunny": "EMP002",
-          "Rahul": "EMP003",
-          "Sumit": "EMP004",
-          "Vishal": "EMP005",
-          "Nishant": "EMP006",
-      };
-      const employeeIdToName = {};
-      // Role-based icon mapping
-      const roleIcons = {
-          'Super Admin': '👑', 'Admin': '🛡️', 'Manager': '🎯', 'Employee': '⭐'
-      };
-      
-      const employeeRoles = {
-          'EMP001': 'Super Admin', 'EMP002': 'Admin', 'EMP003': 'Manager',
-          'EMP004': 'Employee', 'EMP005': 'Manager', 'EMP006': 'Employee'
-      };
-
-      for (const name in employees) {
-          const id = employees[name];
-          employeeIdToName[id] = name;
-          const role = employeeRoles[id] || 'Employee';
-          const icon = roleIcons[role] || '👤';
-
-          const option = document.createElement('option');
-          option.value = id;
-          option.textContent = `${icon} ${name}`;
-          employeeSelect.appendChild(option);
-      }
-
-      async function fetchAttendanceRecords() {
-        const employee_id_filter = filterEmployeeIdInput.value;
-        const date_filter = filterDateInput.value;
-        
-        let url = '/api/attendance/records';
-        const params = new URLSearchParams();
-        if (employee_id_filter) {
-            params.append('employee_id', employee_id_filter);
-        }
-        if (date_filter) {
-            params.append('date', date_filter);
-        }
-        if (params.toString()) {
-            url += `?${params.toString()}`;
-        }
+""" + _static_script_tag("js/attendance.js")
+_ATTENDANCE_PAGE = _build_static_page("Attendance", _ATTENDANCE_BODY)
 
-        const response = await fetch(url);
-        const records = await response.json();
-        attendanceTableBody.innerHTML = '';
-        
-        const realtimeStatus = {};
-
-        for (const employee_id in records) {
-          records[employee_id].forEach(record => {
-            const row = document.createElement('tr');
-            const checkInTime = record.check_in_time ? new Date(record.check_in_time).toLocaleString() : 'N/A';
-            const checkOutTime = record.check_out_time ? new Date(record.check_out_time).toLocaleString() : 'N/A';
-            let duration = 'N/A';
-            if (record.check_in_time && record.check_out_time) {
-                const start = new Date(record.check_in_time);
-                const end = new Date(record.check_out_time);
-                duration = ((end - start) / (1000 * 60 * 60)).toFixed(2);
-            } else if (record.check_in_time && !record.check_out_time) {
-                const start = new Date(record.check_in_time);
-                const now = new Date();
-                duration = ((now - start) / (1000 * 60 * 60)).toFixed(2) + ' (current)';
-                realtimeStatus[employee_id] = {status: 'Checked In', duration: duration};
-            }
-            
-            if (!realtimeStatus[employee_id]) {
-                // If not currently checked in, show status from the last record
-                const lastRecord = records[employee_id][records[employee_id].length - 1];
-                if (lastRecord && lastRecord.check_out_time) {
-                     const start = new Date(lastRecord.check_in_time);
-                     const end = new Date(lastRecord.check_out_time);
-                     const last_duration = ((end - start) / (1000 * 60 * 60)).toFixed(2);
-                    realtimeStatus[employee_id] = {status: 'Checked Out', duration: `${last_duration} (last)`};
-                } else {
-                    realtimeStatus[employee_id] = {status: 'Unknown', duration: 'N/A'};
-                }
-            }
-
-            row.innerHTML = `
-              <td class="border-t border-white/10 p-2">${employee_id}</td>
-              <td class="border-t border-white/10 p-2">${checkInTime}</td>
-              <td class="border-t border-white/10 p-2">${checkOutTime}</td>
-              <td class="border-t border-white/10 p-2">${duration}</td>
-            `;
-            attendanceTableBody.appendChild(row);
-          });
-        }
-        
-        // Display real-time status
-        realtimeStatusDiv.innerHTML = '';
-        if (Object.keys(realtimeStatus).length === 0) {
-            realtimeStatusDiv.innerHTML = '<p class="text-white/70">No employee status to display.</p>';
-        } else {
-            for (const emp_id in realtimeStatus) {
-                const statusCard = document.createElement('div');
-                statusCard.className = "glass p-4 rounded-lg";
-                const employeeName = employeeIdToName[emp_id] || emp_id; // Get name or fallback to ID
-                // Get role-based icon data
-                const roleIcons = {
-                    'Super Admin': {icon: '👑', icon_color: '#FFD700'},
-                    'Admin': {icon: '🛡️', icon_color: '#4F46E5'},
-                    'Manager': {icon: '🎯', icon_color: '#EF4444'},
-                    'Employee': {icon: '⭐', icon_color: '#10B981'}
-                };
-                
-                // Map employee IDs to their roles (this could be fetched from API in real implementation)
-                const employeeRoles = {
-                    'EMP001': 'Super Admin',
-                    'EMP002': 'Admin', 
-                    'EMP003': 'Manager',
-                    'EMP004': 'Employee',
-                    'EMP005': 'Manager',
-                    'EMP006': 'Employee'
-                };
-                
-                const userRole = employeeRoles[emp_id] || 'Employee';
-                const userIcon = roleIcons[userRole] || {icon: '👤', icon_color: '#6b7280'};
-                
-                statusCard.innerHTML = `
-                    <div class="flex items-center gap-3 mb-3">
-                        <div class="relative">
-                            <div class="w-12 h-12 rounded-full bg-slate-700 flex items-center justify-center">
-                                <span class="text-lg">👤</span>
-                            </div>
-                            <div class="absolute -bottom-1 -right-1 w-6 h-6 rounded-full flex items-center justify-center text-sm profile-icon" 
-                                 style="background: ${userIcon.icon_color}; border: 2px solid rgba(255,255,255,0.8);">
-                                ${userIcon.icon}
-                            </div>
-                        </div>
-                        <div>
-                            <h3 class="font-semibold text-lg">${employeeName}</h3>
-                            <p class="text-sm text-white/60">${emp_id}</p>
-                        </div>
-                    </div>
-                    <p>Status: <span class="font-bold ${realtimeStatus[emp_id].status === 'Checked In' ? 'text-green-400' : 'text-red-400'}">${realtimeStatus[emp_id].status}</span></p>
-                    <p>Duration: ${realtimeStatus[emp_id].duration}</p>
-                `;
-                realtimeStatusDiv.appendChild(statusCard);
-            }
-        }
-
-      }
-
-      async function handleCheckIn() {
-        const employee_id = employeeSelect.value;
-        if (!employee_id) {
-          attendanceStatus.textContent = 'Please select an Employee.';
-          return;
-        }
-        const formData = new FormData();
-        formData.append('employee_id', employee_id);
-        const response = await fetch('/api/attendance/check_in', {
-          method: 'POST',
-          body: formData,
-        });
-        const result = await response.json();
-        attendanceStatus.textContent = result.message;
-        fetchAttendanceRecords();
-      }
-
-      async function handleCheckOut() {
-        const employee_id = employeeSelect.value;
-        if (!employee_id) {
-          attendanceStatus.textContent = 'Please select an Employee.';
-          return;
-        }
-        const formData = new FormData();
-        formData.append('employee_id', employee_id);
-        const response = await fetch('/api/attendance/check_out', {
-          method: 'POST',
-          body: formData,
-        });
-        const result = await response.json();
-        attendanceStatus.textContent = result.message;
-        fetchAttendanceRecords();
-      }
-
-      checkInBtn.addEventListener('click', handleCheckIn);
-      checkOutBtn.addEventListener('click', handleCheckOut);
-      applyFilterBtn.addEventListener('click', fetchAttendanceRecords);
-      clearFilterBtn.addEventListener('click', () => {
-          filterEmployeeIdInput.value = '';
-          filterDateInput.value = '';
-          fetchAttendanceRecords();
-      });
-
-      // Initial fetch and set up real-time refresh
-      fetchAttendanceRecords();
-      setInterval(fetchAttendanceRecords, 30000); // Refresh every 30 seconds
+@app.get("/attendance")
+def eraya_attendance_page(request: Request, current_user: Dict = Depends(require_roles("owner", "admin", "manager", "packer"))):
+    return _serve_static_page(request, _ATTENDANCE_PAGE)
 
-    </script>
-    """
-    return _eraya_style_page("Attendance", body)
-@app.get("/attendance/report_page")
-def eraya_attendance_report_page():
-    body = """
+_ATTENDANCE_REPORT_BODY = """
     <section class="glass p-6">
       <h1 class="text-3xl font-bold">Attendance Reports</h1>
       <p class="text-white/80 mt-2">View total hours and overtime reports with filters.</p>
@@ -7540,124 +7688,14 @@ def eraya_attendance_report_page():
       </div>
     </section>
 
-    <script>
-      const reportEmployeeIdInput = document.getElementById('reportEmployeeId');
-      const reportStartDateInput = document.getElementById('reportStartDate');
-      const reportEndDateInput = document.getElementById('reportEndDate');
-      const applyReportFilterBtn = document.getElementById('applyReportFilterBtn');
-      const clearReportFilterBtn = document.getElementById('clearReportFilterBtn');
-      const exportReportDataBtn = document.getElementById('exportReportDataBtn');
-      const reportingData = document.getElementById('reportingData');
-      const reportOvertimeThresholdInput = document.getElementById('reportOvertimeThreshold');
-      const generateReportOvertimeBtn = document.getElementById('generateReportOvertimeBtn');
-      const overtimeData = document.getElementById('overtimeData');
-
-      async function fetchReports() {
-        const employee_id_filter = reportEmployeeIdInput.value;
-        const start_date = reportStartDateInput.value;
-        const end_date = reportEndDateInput.value;
-
-        // Fetch Total Hours Report
-        let reportUrl = '/api/attendance/report';
-        let reportParams = new URLSearchParams();
-        if (employee_id_filter) reportParams.append('employee_id', employee_id_filter);
-        if (start_date) reportParams.append('start_date', start_date);
-        if (end_date) reportParams.append('end_date', end_date);
-        if (reportParams.toString()) reportUrl += `?${reportParams.toString()}`;
-
-        const totalHoursResponse = await fetch(reportUrl);
-        const totalHoursReport = await totalHoursResponse.json();
-        let totalHoursHtml = '<h3>Total Hours Report</h3>';
-        if (Object.keys(totalHoursReport).length === 0) {
-            totalHoursHtml += '<p>No total hours data available.</p>';
-        } else {
-            totalHoursHtml += '<ul class="list-disc pl-5 mt-2">';
-            for (const employee_id in totalHoursReport) {
-                totalHoursHtml += `<li><strong>${employee_id}:</strong> Total Hours: ${totalHoursReport[employee_id].total_hours}</li>`;
-            }
-            totalHoursHtml += '</ul>';
-        }
-        reportingData.innerHTML = totalHoursHtml;
-
-        // Fetch Overtime Report
-        let overtimeUrl = '/api/attendance/overtime';
-        let overtimeParams = new URLSearchParams();
-        if (employee_id_filter) overtimeParams.append('employee_id', employee_id_filter);
-        if (start_date) overtimeParams.append('start_date', start_date);
-        if (end_date) overtimeParams.append('end_date', end_date);
-        const threshold = reportOvertimeThresholdInput.value;
-        if (threshold) overtimeParams.append('threshold_hours', threshold);
-        if (overtimeParams.toString()) overtimeUrl += `?${overtimeParams.toString()}`;
-
-        const overtimeResponse = await fetch(overtimeUrl);
-        const overtimeReport = await overtimeResponse.json();
-        let overtimeHtml = '<h3>Overtime Report</h3>';
-        if (Object.keys(overtimeReport).length === 0) {
-            overtimeHtml += '<p>No overtime data available.</p>';
-        } else {
-            overtimeHtml += '<ul class="list-disc pl-5 mt-2">';
-            for (const employee_id in overtimeReport) {
-                overtimeHtml += `<li><strong>${employee_id}:</strong> Total Hours: ${overtimeReport[employee_id].total_hours}, Overtime Hours: ${overtimeReport[employee_id].overtime_hours}</li>`;
-            }
-            overtimeHtml += '</ul>';
-        }
-        overtimeData.innerHTML = overtimeHtml;
-      }
-
-      async function handleExportReportData() {
-          const employee_id_filter = reportEmployeeIdInput.value;
-          const start_date = reportStartDateInput.value;
-          const end_date = reportEndDateInput.value;
-
-          let url = '/api/attendance/export';
-          const params = new URLSearchParams();
-          if (employee_id_filter) params.append('employee_id', employee_id_filter);
-          if (start_date) params.append('start_date', start_date);
-          if (end_date) params.append('end_date', end_date);
-          if (params.toString()) url += `?${params.toString()}`;
+""" + _static_script_tag("js/attendance_report.js")
+_ATTENDANCE_REPORT_PAGE = _build_static_page("Attendance Reports", _ATTENDANCE_REPORT_BODY)
 
-          try {
-              const response = await fetch(url);
-              if (!response.ok) {
-                  const errorText = await response.text();
-                  alert(`Error exporting data: ${errorText}`);
-                  return;
-              }
-              const blob = await response.blob();
-              const urlBlob = window.URL.createObjectURL(blob);
-              const a = document.createElement('a');
-              a.href = urlBlob;
-              a.download = 'attendance_report.csv';
-              document.body.appendChild(a);
-              a.click();
-              a.remove();
-              window.URL.revokeObjectURL(urlBlob);
-          } catch (error) {
-              console.error('Export failed:', error);
-              alert('Failed to export data.');
-          }
-      }
-
-      applyReportFilterBtn.addEventListener('click', fetchReports);
-      clearReportFilterBtn.addEventListener('click', () => {
-          reportEmployeeIdInput.value = '';
-          reportStartDateInput.value = '';
-          reportEndDateInput.value = '';
-          fetchReports();
-      });
-      exportReportDataBtn.addEventListener('click', handleExportReportData);
-      generateReportOvertimeBtn.addEventListener('click', fetchReports);
-
-      // Initial fetch
-      fetchReports();
-
-    </script>
-    """
-    return _eraya_style_page("Attendance Reports", body)
+@app.get("/attendance/report_page")
+def eraya_attendance_report_page(request: Request):
+    return _serve_static_page(request, _ATTENDANCE_REPORT_PAGE)
 
-@app.get("/chat")
-def eraya_chat_page():
-    body = """
+_CHAT_BODY = """
     <div class="flex h-screen bg-slate-900">
       <!-- Sidebar -->
       <div class="w-80 glass border-r border-white/10 flex flex-col">
@@ -7750,6 +7788,23 @@ def eraya_chat_page():
         <div id="messagesContainer" class="flex-1 overflow-y-auto p-4 space-y-4">
           <div class="text-center text-white/60">Loading messages...</div>
         </div>
+        <template id="messageTemplate">
+          <div class="message-item">
+            <div class="flex items-start gap-3">
+              <div class="w-8 h-8 rounded-full bg-gradient-to-r from-blue-500 to-purple-500 flex items-center justify-center flex-shrink-0">
+                <span class="message-avatar text-white text-sm font-semibold"></span>
+              </div>
+              <div class="flex-1 min-w-0">
+                <div class="flex items-center gap-2 mb-1">
+                  <span class="message-sender font-semibold text-sm"></span>
+                  <span class="message-time text-xs text-white/50"></span>
+                </div>
+                <div class="text-sm bg-slate-800/50 rounded-lg p-3 message-bubble"></div>
+                <div class="message-reactions"></div>
+              </div>
+            </div>
+          </div>
+        </template>
 
         <!-- Message Input -->
         <div class="p-4 border-t border-white/10 glass">
@@ -7779,31 +7834,47 @@ def eraya_chat_page():
               <button id="removeFile" class="text-red-400 hover:text-red-300">✕</button>
             </div>
           </div>
-          <div id="emojiPicker" class="hidden mt-2 p-3 bg-slate-800 rounded-lg border border-white/10">
-            <div class="grid grid-cols-8 gap-2 text-lg">
-              <span class="emoji cursor-pointer hover:bg-white/10 p-1 rounded">👍</span>
-              <span class="emoji cursor-pointer hover:bg-white/10 p-1 rounded">❤️</span>
-              <span class="emoji cursor-pointer hover:bg-white/10 p-1 rounded">😂</span>
-              <span class="emoji cursor-pointer hover:bg-white/10 p-1 rounded">😮</span>
-              <span class="emoji cursor-pointer hover:bg-white/10 p-1 rounded">😢</span>
-              <span class="emoji cursor-pointer hover:bg-white/10 p-1 rounded">😡</span>
-              <span class="emoji cursor-pointer hover:bg-white/10 p-1 rounded">🎉</span>
-              <span class="emoji cursor-pointer hover:bg-white/10 p-1 rounded">🔥</span>
-              <span class="emoji cursor-pointer hover:bg-white/10 p-1 rounded">💯</span>
-              <span class="emoji cursor-pointer hover:bg-white/10 p-1 rounded">✅</span>
-              <span class="emoji cursor-pointer hover:bg-white/10 p-1 rounded">❌</span>
-              <span class="emoji cursor-pointer hover:bg-white/10 p-1 rounded">⚠️</span>
+          <div id="emojiPicker" class="hidden mt-2 p-3 bg-slate-800 rounded-lg border border-white/10"></div>
+          <template id="emojiPickerTemplate">
+            <div class="emoji-grid grid grid-cols-8 gap-2 text-lg">
+              <span class="emoji">👍</span>
+              <span class="emoji">❤️</span>
+              <span class="emoji">😂</span>
+              <span class="emoji">😮</span>
+              <span class="emoji">😢</span>
+              <span class="emoji">😡</span>
+              <span class="emoji">🎉</span>
+              <span class="emoji">🔥</span>
+              <span class="emoji">💯</span>
+              <span class="emoji">✅</span>
+              <span class="emoji">❌</span>
+              <span class="emoji">⚠️</span>
             </div>
-          </div>
+          </template>
         </div>
       </div>
     </div>
 
     <style>
+      .emoji-grid {
+        contain: content;
+      }
+      .emoji {
+        cursor: pointer;
+        padding: 0.25rem;
+        border-radius: 0.25rem;
+      }
+      .emoji:hover {
+        background-color: rgba(255, 255, 255, 0.1);
+      }
       .channel-item.active {
         background-color: rgba(59, 130, 246, 0.2);
         border-left: 3px solid #3b82f6;
       }
+      .message-item {
+        content-visibility: auto;
+        contain-intrinsic-size: auto 80px;
+      }
       .message-bubble {
         max-width: 70%;
         word-wrap: break-word;
@@ -7903,526 +7974,131 @@ def eraya_chat_page():
         cursor: pointer;
       }
     </style>
-    <script>
-      // Chat application state
-      let currentUser = '';
-      let currentChannel = 'general';
-      let currentDM = null;
-      let isTyping = false;
-      let selectedFile = null;
+""" + _static_script_tag("js/chat.js")
+_CHAT_PAGE = _build_static_page("Team Chat", _CHAT_BODY)
 
-      // DOM elements
-      const currentUserSelect = document.getElementById('currentUser');
-      const userInitials = document.getElementById('userInitials');
-      const onlineIndicator = document.getElementById('onlineIndicator');
-      const channelsList = document.getElementById('channelsList');
-      const dmsList = document.getElementById('dmsList');
-      const onlineUsersList = document.getElementById('onlineUsersList');
-      const chatTitle = document.getElementById('chatTitle');
-      const chatDescription = document.getElementById('chatDescription');
-      const messagesContainer = document.getElementById('messagesContainer');
-      const messageInput = document.getElementById('messageInput');
-      const sendMessage = document.getElementById('sendMessage');
-      const emojiBtn = document.getElementById('emojiBtn');
-      const emojiPicker = document.getElementById('emojiPicker');
-      const backToHub = document.getElementById('backToHub');
-      const fileBtn = document.getElementById('fileBtn');
-      const fileInput = document.getElementById('fileInput');
-      const filePreview = document.getElementById('filePreview');
-      const fileName = document.getElementById('fileName');
-      const fileSize = document.getElementById('fileSize');
-      const fileIcon = document.getElementById('fileIcon');
-      const removeFile = document.getElementById('removeFile');
-
-      // Employee data
-      const employees = {
-          "Ritik": "EMP001",
-          "Sunny": "EMP002",
-          "Rahul": "EMP003",
-          "Sumit": "EMP004",
-          "Vishal": "EMP005",
-          "Nishant": "EMP006",
-      };
+@app.get("/chat")
+def eraya_chat_page(request: Request):
+    return _serve_static_page(request, _CHAT_PAGE)
 
-      // Initialize
-      function init() {
-          // Populate user dropdown
-          for (const name in employees) {
-              const option = document.createElement('option');
-              option.value = employees[name];
-              option.textContent = name;
-              currentUserSelect.appendChild(option);
-          }
+class _ZipStreamBuffer(io.RawIOBase):
+    """Write-only sink for zipfile; the ZIP chunks written so far are handed out with drain()."""
 
-          // Event listeners
-          currentUserSelect.addEventListener('change', handleUserChange);
-          sendMessage.addEventListener('click', handleSendMessage);
-          messageInput.addEventListener('keypress', handleKeyPress);
-          emojiBtn.addEventListener('click', toggleEmojiPicker);
-          backToHub.addEventListener('click', () => window.location.href = '/hub');
-          fileBtn.addEventListener('click', () => fileInput.click());
-          fileInput.addEventListener('change', handleFileSelect);
-          removeFile.addEventListener('click', handleRemoveFile);
-
-          // Channel clicks
-          document.querySelectorAll('.channel-item').forEach(item => {
-              item.addEventListener('click', () => {
-                  const channel = item.dataset.channel;
-                  switchToChannel(channel);
-              });
-          });
+    def __init__(self):
+        self._chunks = []
 
-          // Emoji picker
-          document.querySelectorAll('.emoji').forEach(emoji => {
-              emoji.addEventListener('click', () => {
-                  messageInput.value += emoji.textContent;
-                  emojiPicker.classList.add('hidden');
-                  messageInput.focus();
-              });
-          });
+    def writable(self):
+        return True
 
-          // Auto-resize textarea
-          messageInput.addEventListener('input', function() {
-              this.style.height = 'auto';
-              this.style.height = Math.min(this.scrollHeight, 120) + 'px';
-          });
+    def write(self, data):
+        # zipfile hands over the entry data object itself; only copy views, which may be reused
+        self._chunks.append(data if isinstance(data, bytes) else bytes(data))
+        return len(data)
 
-          // Load initial data
-          loadOnlineUsers();
-          loadChannelMessages();
-          
-          // Set up periodic updates
-          setInterval(loadOnlineUsers, 10000);
-          setInterval(loadChannelMessages, 5000);
-      }
+    def drain(self) -> List[bytes]:
+        # Chunks are returned as written rather than joined, so a multi-MB image is never copied again
+        chunks = self._chunks
+        self._chunks = []
+        return chunks
 
-      function handleUserChange() {
-          currentUser = currentUserSelect.value;
-          if (currentUser) {
-              const userName = Object.keys(employees).find(key => employees[key] === currentUser);
-              userInitials.textContent = userName ? userName.charAt(0).toUpperCase() : '?';
-              onlineIndicator.className = 'w-3 h-3 bg-green-400 rounded-full';
-              
-              // Update user status
-              updateUserStatus('online');
-              
-              // Load DMs
-              loadDirectMessages();
-          }
-      }
 
-      function switchToChannel(channel) {
-          currentChannel = channel;
-          currentDM = null;
-          
-          // Update UI
-          document.querySelectorAll('.channel-item').forEach(item => {
-              item.classList.remove('active');
-          });
-          document.querySelector(`[data-channel="${channel}"]`).classList.add('active');
-          
-          document.querySelectorAll('.dm-item').forEach(item => {
-              item.classList.remove('active');
-          });
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Order numbers keep word characters, '#' and '-' in ZIP entry names
+_ORDER_FILENAME_UNSAFE_RE = re.compile(r'[^\w#-]')
+# ASCII order numbers (the common case) go through a translate table instead of the regex engine
+_ORDER_FILENAME_ASCII_SAFE = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_#-")
+_ORDER_FILENAME_TRANS = str.maketrans({chr(c): "_" for c in range(128) if chr(c) not in _ORDER_FILENAME_ASCII_SAFE})
 
-          // Update header
-          const channelNames = {
-              'general': 'General',
-              'packing': 'Packing Team',
-              'management': 'Management',
-              'announcements': 'Announcements'
-          };
-          
-          chatTitle.textContent = `# ${channel}`;
-          chatDescription.textContent = `${channelNames[channel]} discussion`;
-          
-          loadChannelMessages();
-      }
 
-      function switchToDM(employeeId) {
-          currentDM = employeeId;
-          currentChannel = null;
-          
-          // Update UI
-          document.querySelectorAll('.channel-item').forEach(item => {
-              item.classList.remove('active');
-          });
-          document.querySelectorAll('.dm-item').forEach(item => {
-              item.classList.remove('active');
-          });
-          document.querySelector(`[data-dm="${employeeId}"]`).classList.add('active');
+def _clean_order_number(order_number) -> str:
+    text = str(order_number)
+    if text.isascii():
+        return text.translate(_ORDER_FILENAME_TRANS)
+    return _ORDER_FILENAME_UNSAFE_RE.sub('_', text)
 
-          // Update header
-          const employeeName = Object.keys(employees).find(key => employees[key] === employeeId);
-          chatTitle.textContent = `@ ${employeeName}`;
-          chatDescription.textContent = 'Direct message';
-          
-          loadDMMessages(employeeId);
-      }
+# Concurrent image fetches per ZIP download; the HTTP pool is sized to match so connections are reused
+_PHOTO_FETCH_CONCURRENCY = 16
+# Finished images waiting for the ZIP writer; when full, fetchers hold their slot until it drains
+_PHOTO_QUEUE_SIZE = 8
 
-      async function loadChannelMessages() {
-          if (!currentChannel) return;
-          
-          try {
-              const response = await fetch(`/api/chat/channel/${currentChannel}`);
-              const data = await response.json();
-              displayMessages(data.messages);
-          } catch (error) {
-              console.error('Error loading channel messages:', error);
-          }
-      }
 
-      async function loadDMMessages(employeeId) {
-          if (!currentUser || !employeeId) return;
-          
-          try {
-              const response = await fetch(`/api/chat/dm/${employeeId}?current_employee_id=${currentUser}`);
-              const data = await response.json();
-              displayMessages(data.messages, true);
-          } catch (error) {
-              console.error('Error loading DM messages:', error);
-          }
-      }
+# Pillow decode/encode runs in worker processes so a batch of JPEGs never holds the event
+# loop's GIL; created on first use, not at import. Capped so the web process keeps cores for requests
+_IMAGE_WORKERS = max(1, min(4, (os.cpu_count() or 1) // 2))
+_IMAGE_EXECUTOR: Optional[ProcessPoolExecutor] = None
 
-      function displayMessages(messages, isDM = false) {
-          if (!messages || messages.length === 0) {
-              messagesContainer.innerHTML = '<div class="text-center text-white/60">No messages yet. Start the conversation!</div>';
-              return;
-          }
 
-          let html = '';
-          messages.forEach(msg => {
-              const time = new Date(msg.timestamp).toLocaleTimeString([], {hour: '2-digit', minute:'2-digit'});
-              const isOwnMessage = isDM ? msg.from_employee_id === currentUser : msg.employee_id === currentUser;
-              
-              const senderName = isDM ? msg.from_employee_name : msg.employee_name;
-              
-              html += `
-                  <div class="message-item">
-                      <div class="flex items-start gap-3">
-                          <div class="w-8 h-8 rounded-full bg-gradient-to-r from-blue-500 to-purple-500 flex items-center justify-center flex-shrink-0">
-                              <span class="text-white text-sm font-semibold">${senderName.charAt(0).toUpperCase()}</span>
-                          </div>
-                          <div class="flex-1 min-w-0">
-                              <div class="flex items-center gap-2 mb-1">
-                                  <span class="font-semibold text-sm ${isOwnMessage ? 'text-blue-400' : 'text-white'}">${senderName}</span>
-                                  <span class="text-xs text-white/50">${time}</span>
-                              </div>
-                              <div class="text-sm bg-slate-800/50 rounded-lg p-3 message-bubble">
-                                  ${msg.message}
-                              </div>
-                              ${renderFileAttachment(msg.file_attachment)}
-                              ${renderLinkPreviews(msg.links)}
-                              <div class="message-reactions" data-message-id="${msg.id}">
-                                  ${renderReactions(msg.reactions || {}, msg.id)}
-                              </div>
-                          </div>
-                      </div>
-                  </div>
-              `;
-          });
-          
-          messagesContainer.innerHTML = html;
-          messagesContainer.scrollTop = messagesContainer.scrollHeight;
-          
-          // Add reaction click handlers
-          document.querySelectorAll('.reaction-btn').forEach(btn => {
-              btn.addEventListener('click', handleReactionClick);
-          });
-      }
+def _image_executor() -> ProcessPoolExecutor:
+    global _IMAGE_EXECUTOR
+    if _IMAGE_EXECUTOR is None:
+        # spawn, like processor.py: forking this threaded server could copy held locks into the child
+        _IMAGE_EXECUTOR = ProcessPoolExecutor(max_workers=_IMAGE_WORKERS,
+                                              mp_context=multiprocessing.get_context("spawn"))
+    return _IMAGE_EXECUTOR
 
-      function renderReactions(reactions, messageId) {
-          let html = '';
-          for (const emoji in reactions) {
-              const users = reactions[emoji];
-              if (users.length > 0) {
-                  const isActive = users.includes(currentUser);
-                  html += `
-                      <span class="reaction-btn ${isActive ? 'active' : ''}" 
-                            data-message-id="${messageId}" 
-                            data-emoji="${emoji}">
-                          ${emoji} ${users.length}
-                      </span>
-                  `;
-              }
-          }
-          return html;
-      }
 
-      function renderFileAttachment(fileAttachment) {
-          if (!fileAttachment) return '';
-          
-          const fileTypeIcons = {
-              'image': '🖼️',
-              'video': '🎥',
-              'audio': '🎵',
-              'pdf': '📄',
-              'document': '📝',
-              'file': '📎'
-          };
-          
-          const icon = fileTypeIcons[fileAttachment.file_type] || '📎';
-          
-          if (fileAttachment.file_type === 'image') {
-              return `
-                  <div class="file-attachment">
-                      <img src="${fileAttachment.url}" alt="${fileAttachment.filename}" class="image-preview" onclick="window.open('${fileAttachment.url}', '_blank')">
-                  </div>
-              `;
-          } else {
-              return `
-                  <div class="file-attachment" onclick="window.open('${fileAttachment.url}', '_blank')">
-                      <div class="file-icon">${icon}</div>
-                      <div class="flex-1">
-                          <div class="font-medium text-sm">${fileAttachment.filename}</div>
-                          <div class="text-xs text-white/60">${formatFileSize(fileAttachment.file_size)}</div>
-                      </div>
-                      <div class="text-blue-400 text-sm">Download</div>
-                  </div>
-              `;
-          }
-      }
+def _encode_png(image_data: bytes) -> bytes:
+    # Runs in a worker process, so the result is pickled back as bytes either way
+    img = Image.open(io.BytesIO(image_data))
+    img_byte_arr = io.BytesIO()
+    # Fastest zlib level: these are download bundles, so encode time matters more than a few % of size
+    img.save(img_byte_arr, format='PNG', compress_level=1)
+    return img_byte_arr.getvalue()
 
-      function renderLinkPreviews(links) {
-          if (!links || links.length === 0) return '';
-          
-          let html = '';
-          links.forEach(link => {
-              html += `
-                  <div class="link-preview" onclick="window.open('${link.url}', '_blank')">
-                      <div class="font-medium text-sm text-blue-400">${link.title}</div>
-                      <div class="text-xs text-white/60 mt-1">${link.description}</div>
-                      <div class="text-xs text-white/40 mt-1">${link.url}</div>
-                  </div>
-              `;
-          });
-          
-          return html;
-      }
 
-      async function handleReactionClick(e) {
-          if (!currentUser) return;
-          
-          const messageId = e.target.dataset.messageId;
-          const emoji = e.target.dataset.emoji;
-          const isActive = e.target.classList.contains('active');
-          
-          try {
-              const formData = new FormData();
-              formData.append('message_id', messageId);
-              formData.append('employee_id', currentUser);
-              formData.append('emoji', emoji);
-              
-              const endpoint = isActive ? '/api/chat/reaction/remove' : '/api/chat/reaction/add';
-              await fetch(endpoint, { method: 'POST', body: formData });
-              
-              // Reload messages to show updated reactions
-              if (currentChannel) {
-                  loadChannelMessages();
-              } else if (currentDM) {
-                  loadDMMessages(currentDM);
-              }
-          } catch (error) {
-              console.error('Error handling reaction:', error);
-          }
-      }
+async def _convert_to_png(image_data: bytes) -> bytes:
+    # PNG sources are passed through untouched; decoding and re-encoding them gains nothing,
+    # and keeping them in-process avoids shipping them to a worker and back
+    if image_data.startswith(_PNG_SIGNATURE):
+        return image_data
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_image_executor(), _encode_png, image_data)
 
-      async function handleSendMessage() {
-          if (!currentUser) {
-              alert('Please select your name first.');
-              return;
-          }
-          
-          const message = messageInput.value.trim();
-          if (!message && !selectedFile) return;
-          
-          try {
-              let fileInfo = null;
-              
-              // Upload file if selected
-              if (selectedFile) {
-                  fileInfo = await uploadFile(selectedFile, currentUser);
-                  if (!fileInfo) return; // Upload failed
-              }
-              
-              const formData = new FormData();
-              formData.append('employee_id', currentUser);
-              formData.append('message', message);
-              
-              if (fileInfo) {
-                  formData.append('file_info', JSON.stringify(fileInfo));
-              }
-              
-              if (currentChannel) {
-                  formData.append('channel', currentChannel);
-                  await fetch('/api/chat/channel/send', { method: 'POST', body: formData });
-                  loadChannelMessages();
-              } else if (currentDM) {
-                  formData.append('from_employee_id', currentUser);
-                  formData.append('to_employee_id', currentDM);
-                  await fetch('/api/chat/dm/send', { method: 'POST', body: formData });
-                  loadDMMessages(currentDM);
-              }
-              
-              messageInput.value = '';
-              messageInput.style.height = 'auto';
-              handleRemoveFile(); // Clear file selection
-              
-          } catch (error) {
-              console.error('Error sending message:', error);
-          }
-      }
-
-      function handleKeyPress(e) {
-          if (e.key === 'Enter' && !e.shiftKey) {
-              e.preventDefault();
-              handleSendMessage();
-          }
-      }
-
-      function toggleEmojiPicker() {
-          emojiPicker.classList.toggle('hidden');
-      }
-
-      function handleFileSelect(e) {
-          const file = e.target.files[0];
-          if (!file) return;
-          
-          // Check file size (10MB limit)
-          if (file.size > 10 * 1024 * 1024) {
-              alert('File too large. Maximum size is 10MB.');
-              return;
-          }
-          
-          selectedFile = file;
-          showFilePreview(file);
-      }
 
-      function showFilePreview(file) {
-          fileName.textContent = file.name;
-          fileSize.textContent = formatFileSize(file.size);
-          
-          // Set appropriate icon based on file type
-          const ext = file.name.split('.').pop().toLowerCase();
-          if (['jpg', 'jpeg', 'png', 'gif', 'webp'].includes(ext)) {
-              fileIcon.textContent = '🖼️';
-          } else if (['mp4', 'avi', 'mov', 'wmv'].includes(ext)) {
-              fileIcon.textContent = '🎥';
-          } else if (['mp3', 'wav', 'ogg'].includes(ext)) {
-              fileIcon.textContent = '🎵';
-          } else if (ext === 'pdf') {
-              fileIcon.textContent = '📄';
-          } else if (['doc', 'docx', 'txt'].includes(ext)) {
-              fileIcon.textContent = '📝';
-          } else {
-              fileIcon.textContent = '📎';
-          }
-          
-          filePreview.classList.remove('hidden');
-      }
-
-      function handleRemoveFile() {
-          selectedFile = null;
-          fileInput.value = '';
-          filePreview.classList.add('hidden');
-      }
-
-      function formatFileSize(bytes) {
-          if (bytes === 0) return '0 Bytes';
-          const k = 1024;
-          const sizes = ['Bytes', 'KB', 'MB', 'GB'];
-          const i = Math.floor(Math.log(bytes) / Math.log(k));
-          return parseFloat((bytes / Math.pow(k, i)).toFixed(2)) + ' ' + sizes[i];
-      }
-
-      async function uploadFile(file, employeeId) {
-          const formData = new FormData();
-          formData.append('file', file);
-          formData.append('employee_id', employeeId);
-          
-          try {
-              const response = await fetch('/api/chat/upload', {
-                  method: 'POST',
-                  body: formData
-              });
-              
-              if (response.ok) {
-                  const result = await response.json();
-                  return result.file;
-              } else {
-                  throw new Error('Upload failed');
-              }
-          } catch (error) {
-              console.error('File upload error:', error);
-              alert('Failed to upload file.');
-              return null;
-          }
-      }
-
-      async function loadOnlineUsers() {
-          try {
-              const response = await fetch('/api/chat/users/online');
-              const data = await response.json();
-              
-              let html = '';
-              if (data.online_users.length === 0) {
-                  html = '<div class="text-xs text-white/40">No one online</div>';
-              } else {
-                  data.online_users.forEach(user => {
-                      html += `
-                          <div class="flex items-center gap-2 p-1 cursor-pointer hover:bg-white/5 rounded text-sm"
-                               onclick="switchToDM('${user.employee_id}')">
-                              <div class="online-dot"></div>
-                              <span>${user.employee_name}</span>
-                          </div>
-                      `;
-                  });
-              }
-              
-              onlineUsersList.innerHTML = html;
-          } catch (error) {
-              console.error('Error loading online users:', error);
-          }
-      }
-
-      async function loadDirectMessages() {
-          if (!currentUser) return;
-          
-          let html = '';
-          for (const [name, empId] of Object.entries(employees)) {
-              if (empId !== currentUser) {
-                  html += `
-                      <div class="dm-item" data-dm="${empId}" onclick="switchToDM('${empId}')">
-                          <div class="w-6 h-6 rounded-full bg-gradient-to-r from-green-500 to-blue-500 flex items-center justify-center">
-                              <span class="text-white text-xs font-semibold">${name.charAt(0).toUpperCase()}</span>
-                          </div>
-                          <span class="text-sm">${name}</span>
-                      </div>
-                  `;
-              }
-          }
-          
-          dmsList.innerHTML = html;
-      }
-
-      async function updateUserStatus(status) {
-          if (!currentUser) return;
-          
-          try {
-              const formData = new FormData();
-              formData.append('employee_id', currentUser);
-              formData.append('status', status);
-              await fetch('/api/chat/status/update', { method: 'POST', body: formData });
-          } catch (error) {
-              console.error('Error updating status:', error);
-          }
-      }
-
-      // Initialize the app
-      init();
-    </script>
+async def _iter_fetched_images(entries: List[tuple], transform, label: str):
     """
-    return _eraya_style_page("Team Chat", body)
+    Fetch (url, filename) entries concurrently and yield (filename, await transform(data)) as each one completes.
+    Failed fetches are logged and skipped; transform is a coroutine and decides where its CPU work runs.
+    Results pass through a bounded queue, so a slow client caps how many images are held in memory.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=_PHOTO_QUEUE_SIZE)
+    semaphore = asyncio.Semaphore(_PHOTO_FETCH_CONCURRENCY)
+    limits = httpx.Limits(max_connections=_PHOTO_FETCH_CONCURRENCY, max_keepalive_connections=_PHOTO_FETCH_CONCURRENCY)
+    # Retry connection failures; a CDN hiccup should not drop an image from the bundle
+    transport = httpx.AsyncHTTPTransport(retries=2, limits=limits)
+
+    async with httpx.AsyncClient(timeout=10, follow_redirects=True, transport=transport) as client:
+        async def fetch(url: str, filename: str):
+            async with semaphore:
+                try:
+                    response = await client.get(url)
+                    response.raise_for_status()
+                    data = await transform(response.content)
+                except httpx.HTTPError as e:
+                    print(f"Error fetching {label} from {url}: {e}")
+                    return
+                except Exception as e:
+                    print(f"Error processing {label} image {url}: {e}")
+                    return
+                # Still holding the slot: no new fetch starts while the writer is behind
+                await queue.put((filename, data))
+
+        async def produce():
+            await asyncio.gather(*(fetch(url, filename) for url, filename in entries))
+            await queue.put(None)
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                result = await queue.get()
+                if result is None:
+                    break
+                yield result
+        finally:
+            # Client went away mid-download: stop the remaining fetches before the HTTP client closes
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+
 
 @app.post("/api/orders/download-photos")
 async def download_order_photos(request: Request):
@@ -8437,62 +8113,30 @@ async def download_order_photos(request: Request):
         if not photos_to_download:
             raise HTTPException(status_code=400, detail="No photos provided for download.")
 
-        def generate_zip():
-            import requests
-            import zipfile
-            import tempfile
-            
-            # Create a temporary file for the ZIP
-            temp_zip = tempfile.NamedTemporaryFile(delete=False, suffix='.zip')
-            temp_zip.close()
-            
-            try:
-                with zipfile.ZipFile(temp_zip.name, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                    for photo_info in photos_to_download:
-                        url = photo_info.get("url")
-                        order_number = photo_info.get("order_number")
-
-                        if not url or not order_number:
-                            continue
-
-                        # Clean order number for filename - preserve # and numbers, remove other special chars
-                        clean_order = re.sub(r'[^\w#-]', '_', str(order_number))
-                        filename = f"{clean_order}.png"
-
-                        try:
-                            response = requests.get(url, timeout=10)
-                            response.raise_for_status()
-                            image_data = response.content
-
-                            img = Image.open(io.BytesIO(image_data))
-                            
-                            # Convert to PNG
-                            img_byte_arr = io.BytesIO()
-                            img.save(img_byte_arr, format='PNG')
-                            
-                            # Add to ZIP
-                            zipf.writestr(filename, img_byte_arr.getvalue())
-                            
-                        except requests.RequestException as e:
-                            print(f"Error fetching photo from {url}: {e}")
-                        except Exception as e:
-                            print(f"Error processing image {url}: {e}")
-                
-                # Read the ZIP file and yield its contents
-                with open(temp_zip.name, 'rb') as f:
-                    while True:
-                        chunk = f.read(8192)
-                        if not chunk:
-                            break
+        entries = []
+        for photo_info in photos_to_download:
+            url = photo_info.get("url")
+            order_number = photo_info.get("order_number")
+
+            if not url or not order_number:
+                continue
+
+            clean_order = _clean_order_number(order_number)
+            entries.append((url, f"{clean_order}.png"))
+
+        async def generate_zip():
+            # Each photo is streamed out as soon as it is zipped; zipfile writes data
+            # descriptors when the sink is not seekable, so no temp file is needed
+            sink = _ZipStreamBuffer()
+            # Every entry is a PNG, which is already deflate-compressed; store it as-is
+            with zipfile.ZipFile(sink, 'w', zipfile.ZIP_STORED) as zipf:
+                async for filename, png_data in _iter_fetched_images(entries, _convert_to_png, "photo"):
+                    zipf.writestr(filename, png_data)
+                    for chunk in sink.drain():
                         yield chunk
-                        
-            finally:
-                # Clean up temp file
-                import os
-                try:
-                    os.unlink(temp_zip.name)
-                except:
-                    pass
+            # Central directory
+            for chunk in sink.drain():
+                yield chunk
 
         # Generate filename with timestamp for uniqueness
         from datetime import datetime
@@ -8525,63 +8169,32 @@ async def download_order_polaroids(request: Request):
         if not polaroids_to_download:
             raise HTTPException(status_code=400, detail="No polaroids provided for download.")
 
-        def generate_zip():
-            import requests
-            import zipfile
-            import tempfile
-            
-            # Create a temporary file for the ZIP
-            temp_zip = tempfile.NamedTemporaryFile(delete=False, suffix='.zip')
-            temp_zip.close()
-            
-            try:
-                with zipfile.ZipFile(temp_zip.name, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                    for polaroid_info in polaroids_to_download:
-                        url = polaroid_info.get("url")
-                        order_number = polaroid_info.get("order_number")
-                        polaroid_index = polaroid_info.get("polaroid_index", 1)
-
-                        if not url or not order_number:
-                            continue
-
-                        # Clean order number for filename - preserve # and numbers, remove other special chars
-                        clean_order = re.sub(r'[^\w#-]', '_', str(order_number))
-                        filename = f"{clean_order}_polaroid_{polaroid_index}.png"
-
-                        try:
-                            response = requests.get(url, timeout=10)
-                            response.raise_for_status()
-                            image_data = response.content
-
-                            img = Image.open(io.BytesIO(image_data))
-                            
-                            # Convert to PNG
-                            img_byte_arr = io.BytesIO()
-                            img.save(img_byte_arr, format='PNG')
-                            
-                            # Add to ZIP
-                            zipf.writestr(filename, img_byte_arr.getvalue())
-                            
-                        except requests.RequestException as e:
-                            print(f"Error fetching polaroid from {url}: {e}")
-                        except Exception as e:
-                            print(f"Error processing polaroid image {url}: {e}")
-                
-                # Read the ZIP file and yield its contents
-                with open(temp_zip.name, 'rb') as f:
-                    while True:
-                        chunk = f.read(8192)
-                        if not chunk:
-                            break
+        entries = []
+        for polaroid_info in polaroids_to_download:
+            url = polaroid_info.get("url")
+            order_number = polaroid_info.get("order_number")
+            polaroid_index = polaroid_info.get("polaroid_index", 1)
+
+            if not url or not order_number:
+                continue
+
+            # Clean order number for filename - preserve # and numbers, remove other special chars
+            clean_order = _clean_order_number(order_number)
+            entries.append((url, f"{clean_order}_polaroid_{polaroid_index}.png"))
+
+        async def generate_zip():
+            # Stream each polaroid out as soon as it is zipped, the same way as the photo download
+            sink = _ZipStreamBuffer()
+            # Every entry is a PNG, which is already deflate-compressed; store it as-is
+            with zipfile.ZipFile(sink, 'w', zipfile.ZIP_STORED) as zipf:
+                # Polaroids are fetched concurrently and added in completion order
+                async for filename, png_data in _iter_fetched_images(entries, _convert_to_png, "polaroid"):
+                    zipf.writestr(filename, png_data)
+                    for chunk in sink.drain():
                         yield chunk
-                        
-            finally:
-                # Clean up temp file
-                import os
-                try:
-                    os.unlink(temp_zip.name)
-                except:
-                    pass
+            # Central directory
+            for chunk in sink.drain():
+                yield chunk
 
         # Generate filename with timestamp for uniqueness
         from datetime import datetime
@@ -8715,3 +8328,16 @@ async def startup_event():
     else:
         print("⚠️  Shopify not configured. Visit /shopify/settings to configure.")
 
+    # Chat tables and default channels; DDL stays off the import path and the event loop
+    try:
+        from chat_models import init_chat_schema
+        await asyncio.to_thread(init_chat_schema)
+    except Exception as e:
+        print(f"Warning: chat schema init failed: {e}")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the image worker processes, if any were started"""
+    if _IMAGE_EXECUTOR is not None:
+        _IMAGE_EXECUTOR.shutdown(cancel_futures=True)
@@ -1,8 +1,18 @@
 from __future__ import annotations
 
+import functools
+import os
+import tempfile
+from contextlib import contextmanager
 from datetime import datetime
+from typing import Dict, List, Optional
 from uuid import uuid4
 
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, each worker just runs the idempotent DDL itself
+    fcntl = None
+
 from sqlalchemy import (
     Column,
     String,
@@ -11,8 +21,12 @@ from sqlalchemy import (
     Boolean,
     ForeignKey,
     Index,
+    UniqueConstraint,
+    null,
+    text,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, relationship
 from sqlalchemy import JSON as SA_JSON
 
 from models import Base, engine, SessionLocal, User  # reuse the main Base/engine/session
@@ -21,7 +35,7 @@ from models import Base, engine, SessionLocal, User  # reuse the main Base/engin
 class ChatChannel(Base):
     __tablename__ = "chat_channels"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    id = Column(String, primary_key=True, default=lambda: uuid4().hex)
     name = Column(String, unique=True, nullable=False, index=True)
     is_private = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -32,26 +46,27 @@ class ChatChannel(Base):
 class DirectConversation(Base):
     __tablename__ = "chat_direct_conversations"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
-    user_a_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
+    id = Column(String, primary_key=True, default=lambda: uuid4().hex)
+    user_a_id = Column(String, ForeignKey("users.id"), nullable=False)
     user_b_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     user_a = relationship("User", foreign_keys=[user_a_id])
     user_b = relationship("User", foreign_keys=[user_b_id])
 
-    # Helpful index to speed up lookups by pair (unordered)
+    # Pairs are stored ordered (user_a_id < user_b_id), so one conversation exists per pair
+    # and a lookup is a single probe; the constraint's index also serves user_a_id lookups
     __table_args__ = (
-        Index("ix_chat_direct_pair", "user_a_id", "user_b_id"),
+        UniqueConstraint("user_a_id", "user_b_id", name="uq_chat_direct_pair"),
     )
 
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
-    channel_id = Column(String, ForeignKey("chat_channels.id"), nullable=True, index=True)
-    conversation_id = Column(String, ForeignKey("chat_direct_conversations.id"), nullable=True, index=True)
+    id = Column(String, primary_key=True, default=lambda: uuid4().hex)
+    channel_id = Column(String, ForeignKey("chat_channels.id"), nullable=True)
+    conversation_id = Column(String, ForeignKey("chat_direct_conversations.id"), nullable=True)
     sender_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
 
     content = Column(Text, nullable=False)
@@ -59,41 +74,154 @@ class ChatMessage(Base):
     edited = Column(Boolean, default=False)
     edited_at = Column(DateTime, nullable=True)
 
-    parent_message_id = Column(String, ForeignKey("chat_messages.id"), nullable=True, index=True)
+    parent_message_id = Column(String, ForeignKey("chat_messages.id"), nullable=True)
     links = Column(SA_JSON, nullable=True)
     attachments = Column(SA_JSON, nullable=True)
-    reactions = Column(SA_JSON, nullable=True)  # {"emoji": ["user_id", ...]}
+    reactions = Column(SA_JSON, nullable=True)  # deprecated: legacy {"emoji": ["user_id", ...]}, moved to MessageReaction at startup
 
     sender = relationship("User", foreign_keys=[sender_id])
     channel = relationship("ChatChannel", back_populates="messages", foreign_keys=[channel_id])
     conversation = relationship("DirectConversation", foreign_keys=[conversation_id])
     parent = relationship("ChatMessage", remote_side=[id], backref="thread_replies")
 
+    # Feeds are "WHERE channel_id/conversation_id = ? ORDER BY created_at DESC LIMIT n":
+    # the composite indexes serve them with a backward index scan and no sort.
+    # Thread replies are rare, so the parent index only covers rows that have one.
+    __table_args__ = (
+        Index("ix_chat_msg_channel_created", "channel_id", "created_at"),
+        Index("ix_chat_msg_conv_created", "conversation_id", "created_at"),
+        Index(
+            "ix_chat_msg_parent",
+            "parent_message_id",
+            postgresql_where=text("parent_message_id IS NOT NULL"),
+            sqlite_where=text("parent_message_id IS NOT NULL"),
+        ),
+    )
+
 
 class MessageRead(Base):
     __tablename__ = "chat_message_reads"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    id = Column(String, primary_key=True, default=lambda: uuid4().hex)
     message_id = Column(String, ForeignKey("chat_messages.id"), nullable=False, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
     read_at = Column(DateTime, default=datetime.utcnow)
 
 
+class MessageReaction(Base):
+    """One row per (message, emoji, user); adding or removing a reaction is a single INSERT/DELETE."""
+    __tablename__ = "chat_message_reactions"
+
+    message_id = Column(String, ForeignKey("chat_messages.id", ondelete="CASCADE"), primary_key=True)
+    emoji = Column(String, primary_key=True)
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+def add_reaction(db, message_id: str, emoji: str, user_id: str) -> bool:
+    """Add a reaction; returns False if the user had already reacted with that emoji."""
+    db.add(MessageReaction(message_id=message_id, emoji=emoji, user_id=user_id))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return False
+    return True
+
+
+def remove_reaction(db, message_id: str, emoji: str, user_id: str) -> bool:
+    """Remove a reaction; returns False if there was none to remove."""
+    deleted = (db.query(MessageReaction)
+                 .filter(MessageReaction.message_id == message_id,
+                         MessageReaction.emoji == emoji,
+                         MessageReaction.user_id == user_id)
+                 .delete(synchronize_session=False))
+    db.commit()
+    return deleted > 0
+
+
+def reactions_for(db, message_ids) -> Dict[str, Dict[str, List[str]]]:
+    """Reactions for a page of messages in one query, shaped like the legacy JSON column."""
+    result: Dict[str, Dict[str, List[str]]] = {}
+    if not message_ids:
+        return result
+    rows = (db.query(MessageReaction.message_id, MessageReaction.emoji, MessageReaction.user_id)
+              .filter(MessageReaction.message_id.in_(message_ids))
+              .order_by(MessageReaction.created_at))
+    for message_id, emoji, user_id in rows:
+        result.setdefault(message_id, {}).setdefault(emoji, []).append(user_id)
+    return result
+
+
+def backfill_reactions():
+    """
+    Move legacy JSON reactions into chat_message_reactions and clear the column, so
+    MessageReaction is the only source. Idempotent: rows already present are skipped.
+    """
+    with SessionLocal() as db:
+        legacy = db.query(ChatMessage).filter(ChatMessage.reactions.isnot(None)).all()
+        if not legacy:
+            return
+        existing = {
+            (message_id, emoji, user_id)
+            for message_id, emoji, user_id in db.query(
+                MessageReaction.message_id, MessageReaction.emoji, MessageReaction.user_id
+            ).filter(MessageReaction.message_id.in_([m.id for m in legacy]))
+        }
+        for message in legacy:
+            for emoji, user_ids in (message.reactions or {}).items():
+                for user_id in user_ids or []:
+                    key = (message.id, emoji, user_id)
+                    if key not in existing:
+                        existing.add(key)
+                        db.add(MessageReaction(message_id=message.id, emoji=emoji, user_id=user_id))
+            message.reactions = null()  # SQL NULL, not JSON 'null', so the probe above skips it next time
+        db.commit()
+
+
 DEFAULT_CHANNELS = ["general", "packing", "management", "announcements", "support"]
 
 
 def ensure_channels():
     """Ensure all default channels exist."""
     with SessionLocal() as db:
-        existing = {c.name for c in db.query(ChatChannel).all()}
-        for name in DEFAULT_CHANNELS:
-            if name not in existing:
-                db.add(ChatChannel(name=name))
-        db.commit()
+        # Probe only the default names; after first boot this returns them all and nothing is written
+        existing = {name for (name,) in db.query(ChatChannel.name).filter(ChatChannel.name.in_(DEFAULT_CHANNELS))}
+        missing = [name for name in DEFAULT_CHANNELS if name not in existing]
+        if missing:
+            db.add_all([ChatChannel(name=name) for name in missing])
+            db.commit()
+            channel_id_by_name.cache_clear()
 
 
-def ensure_channel_by_name(name: str) -> ChatChannel:
-    """Get or create a channel by name."""
+@functools.lru_cache(maxsize=128)
+def channel_id_by_name(name: str) -> str:
+    """
+    Id of the named channel, cached for the process lifetime. Raises LookupError when there is
+    no such channel (misses are not cached). Every path here that creates channels clears the
+    cache; anything that renames or deletes one must call channel_id_by_name.cache_clear().
+    """
+    with SessionLocal() as db:
+        row = db.query(ChatChannel.id).filter(ChatChannel.name == name).first()
+    if row is None:
+        raise LookupError(name)
+    return row[0]
+
+
+def ensure_channel_by_name(name: str, db: Optional[Session] = None) -> ChatChannel:
+    """
+    Get or create a channel by name. With a caller's session the new row is only flushed and
+    the caller's transaction commits it; without one a short-lived session is used.
+    """
+    if db is not None:
+        channel = db.query(ChatChannel).filter(ChatChannel.name == name).first()
+        if not channel:
+            channel = ChatChannel(name=name)
+            db.add(channel)
+            db.flush()
+            channel_id_by_name.cache_clear()
+        return channel
+
     with SessionLocal() as db:
         channel = db.query(ChatChannel).filter(ChatChannel.name == name).first()
         if not channel:
@@ -101,6 +229,7 @@ def ensure_channel_by_name(name: str) -> ChatChannel:
             db.add(channel)
             db.commit()
             db.refresh(channel)
+            channel_id_by_name.cache_clear()
         return channel
 
 
@@ -108,16 +237,34 @@ def _seed_default_channels():
     ensure_channels()
 
 
-def init_chat_schema():
-    Base.metadata.create_all(bind=engine)
-    _seed_default_channels()
+_SCHEMA_LOCK_PATH = os.path.join(tempfile.gettempdir(), "eraya_chat_schema.lock")
+_schema_initialized = False
 
 
-# Initialize schema on import to avoid touching app startup code
-try:
-    init_chat_schema()
-except Exception:
-    # Avoid hard-crashing during import; app can retry later
-    pass
+@contextmanager
+def _schema_lock():
+    """Serialize schema setup across worker processes on the same host."""
+    if fcntl is None:
+        yield
+        return
+    with open(_SCHEMA_LOCK_PATH, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def init_chat_schema():
+    """Create chat tables and seed default channels. Called from app startup; runs once per process."""
+    global _schema_initialized
+    if _schema_initialized:
+        return
+    with _schema_lock():
+        Base.metadata.create_all(bind=engine)
+        _seed_default_channels()
+        backfill_reactions()
+    channel_id_by_name.cache_clear()
+    _schema_initialized = True
 
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 import os
 from datetime import datetime
 from uuid import uuid4
@@ -14,34 +15,77 @@ from sqlalchemy import (
     Boolean,
     ForeignKey,
     Integer,
+    event,
 )
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
 from sqlalchemy import JSON as SA_JSON
+from sqlalchemy.dialects.postgresql import JSONB
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib json module works, just slower
+    orjson = None
 
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./eraya_ops.db")
 POSTGRES = DATABASE_URL.startswith("postgres://") or DATABASE_URL.startswith("postgresql://")
+SQLITE = DATABASE_URL.startswith("sqlite")
+SQLITE_MEMORY = SQLITE and (DATABASE_URL.endswith(":memory:") or DATABASE_URL.rstrip("/") == "sqlite:")
+
+
+if orjson is not None:
+    # The dialects bind JSON columns as text, so the serializer must return str.
+    # OPT_NON_STR_KEYS keeps json.dumps' behaviour of stringifying int dict keys.
+    def _json_serializer(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    _json_deserializer = orjson.loads
+else:
+    _json_serializer = json.dumps
+    _json_deserializer = json.loads
 
 
 engine = create_engine(
     DATABASE_URL,
     future=True,
     pool_pre_ping=True,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {},
+    # Compiled-SQL LRU shared by all sessions; sized above the default 500 so the task,
+    # order and chat statement variants all stay resident
+    query_cache_size=1200,
+    json_serializer=_json_serializer,
+    json_deserializer=_json_deserializer,
+    connect_args={"check_same_thread": False} if SQLITE else {},
 )
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
 Base = declarative_base()
 
 
+if SQLITE:
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets readers run alongside the writer (recurring-template jobs no longer block
+        # page loads); NORMAL sync is durable across app crashes under WAL. 256 MB mmap, 64 MB page cache
+        cursor = dbapi_connection.cursor()
+        if not SQLITE_MEMORY:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.execute("PRAGMA cache_size=-65536")
+        cursor.close()
+
+
 def _json_column():
-    # Use SQLAlchemy's generic JSON; on SQLite it stores as TEXT/JSON depending on build
-    return SA_JSON
+    # Generic JSON on SQLite (TEXT/JSON depending on build); JSONB on Postgres, which is stored
+    # pre-parsed, supports @> containment and can be GIN-indexed
+    return SA_JSON().with_variant(JSONB(), "postgresql")
 
 
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    id = Column(String, primary_key=True, default=lambda: uuid4().hex)
     email = Column(String, unique=True, index=True, nullable=False)
     password_hash = Column(String, nullable=False)
     name = Column(String, nullable=False)
@@ -54,7 +98,7 @@ class User(Base):
 class Task(Base):
     __tablename__ = "tasks"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    id = Column(String, primary_key=True, default=lambda: uuid4().hex)
     title = Column(String, nullable=False)
     description = Column(Text)
     board = Column(Enum("DAILY", "OTHER", name="board_enum"), nullable=False, index=True)
@@ -80,7 +124,7 @@ class Task(Base):
 class Comment(Base):
     __tablename__ = "comments"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    id = Column(String, primary_key=True, default=lambda: uuid4().hex)
     task_id = Column(String, ForeignKey("tasks.id"), index=True)
     author_id = Column(String, ForeignKey("users.id"), index=True)
     content = Column(Text, nullable=False)
@@ -104,7 +148,7 @@ class CommentMention(Base):
 class Attachment(Base):
     __tablename__ = "attachments"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    id = Column(String, primary_key=True, default=lambda: uuid4().hex)
     task_id = Column(String, ForeignKey("tasks.id"), index=True)
     uploaded_by_id = Column(String, ForeignKey("users.id"), index=True)
     filename = Column(String, nullable=False)
@@ -122,7 +166,7 @@ class Attachment(Base):
 class ActivityLog(Base):
     __tablename__ = "activity_logs"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    id = Column(String, primary_key=True, default=lambda: uuid4().hex)
     task_id = Column(String, ForeignKey("tasks.id"), index=True)
     actor_id = Column(String, ForeignKey("users.id"), index=True)
     action = Column(String)  # CREATE, UPDATE_STATUS, ADD_COMMENT, ADD_ATTACHMENT, MARK_DONE
@@ -133,7 +177,7 @@ class ActivityLog(Base):
 class Subtask(Base):
     __tablename__ = "subtasks"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    id = Column(String, primary_key=True, default=lambda: uuid4().hex)
     task_id = Column(String, ForeignKey("tasks.id"), index=True)
     title = Column(String, nullable=False)
     is_completed = Column(Boolean, default=False)
@@ -145,7 +189,7 @@ class Subtask(Base):
 class Announcement(Base):
     __tablename__ = "announcements"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    id = Column(String, primary_key=True, default=lambda: uuid4().hex)
     title = Column(String, nullable=False)
     body = Column(Text)
     created_by_id = Column(String, ForeignKey("users.id"))
@@ -155,7 +199,7 @@ class Announcement(Base):
 class RecurringTemplate(Base):
     __tablename__ = "recurring_templates"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    id = Column(String, primary_key=True, default=lambda: uuid4().hex)
     title = Column(String, nullable=False)
     description = Column(Text)
     board = Column(Enum("DAILY", "OTHER", name="board_enum_copy"), nullable=False)
@@ -1,12 +1,16 @@
 from __future__ import annotations
 from datetime import datetime
 from typing import List, Optional
-from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, ForeignKey, JSON, Enum, Text
+from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, ForeignKey, JSON, Enum, Text, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
 
+# JSONB on Postgres (pre-parsed, GIN-indexable); generic JSON elsewhere
+JSONColumn = JSON().with_variant(JSONB(), "postgresql")
+
 class Order(Base):
     __tablename__ = "orders"
     
@@ -51,15 +55,21 @@ class Order(Base):
     sla_breached = Column(Boolean, default=False)
     
     # Metadata
-    tags = Column(JSON, default=list)
+    tags = Column(JSONColumn, default=list)
     note = Column(Text)
-    customization_fields = Column(JSON, default=dict)
+    customization_fields = Column(JSONColumn, default=dict)
     
-    # Relationships
+    # Relationships. Left lazy so list views don't pay for them; the detail route loads all
+    # three with selectinload (one IN query per collection instead of one SELECT per order)
     line_items = relationship("OrderLineItem", back_populates="order")
     fulfillments = relationship("OrderFulfillment", back_populates="order")
     events = relationship("OrderEvent", back_populates="order")
 
+    # Tag filters are JSONB containment (tags @> '["RTO"]'), which a GIN index serves; Postgres only
+    __table_args__ = (
+        Index("ix_orders_tags_gin", "tags", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
+
 class OrderLineItem(Base):
     __tablename__ = "order_line_items"
     
@@ -75,7 +85,7 @@ class OrderLineItem(Base):
     quantity = Column(Integer)
     price = Column(Float)
     
-    customization_fields = Column(JSON, default=dict)
+    customization_fields = Column(JSONColumn, default=dict)
     requires_engraving = Column(Boolean, default=False)
     engraving_text = Column(String, nullable=True)
     
@@ -105,8 +115,8 @@ class OrderEvent(Base):
     order_id = Column(Integer, ForeignKey("orders.id"))
     
     event_type = Column(String)  # status_change, note_added, tag_added, etc.
-    old_value = Column(JSON, nullable=True)
-    new_value = Column(JSON, nullable=True)
+    old_value = Column(JSONColumn, nullable=True)
+    new_value = Column(JSONColumn, nullable=True)
     
     actor_id = Column(String)  # User ID who made the change
     actor_name = Column(String)
@@ -2,6 +2,7 @@
 import os
 import re
 import json
+import asyncio
 import pytz
 import unicodedata
 import zipfile
@@ -10,43 +11,65 @@ from io import BytesIO
 from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor
-from threading import Lock
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
+import httpx
 import pandas as pd
-import requests
-from PIL import Image
-from html2image import Html2Image
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-
-# ------------------ Global locks & counters ------------------
-skipped_lock = Lock()
-backmsg_lock = Lock()
-counter_lock = Lock()
-
+from PIL import Image, ImageDraw, ImageFont
+
+try:
+    import pyarrow
+    import pyarrow.csv as pa_csv
+    CSV_ENGINE = "pyarrow"
+except ImportError:  # optional multithreaded reader/writer; pandas' C reader and to_csv are the fallback
+    pyarrow = None
+    CSV_ENGINE = "c"
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # optional C parser; fall back to the stdlib json module
+    _json_loads = json.loads
+
+# ------------------ Global counters ------------------
 counters = {"success_main": 0, "success_polaroid": 0}
 
 # ------------------ Feature toggles (safe defaults) ------------------
-# If you haven't installed wkhtmltoimage (wkhtmltopdf), keep this False.
-# When set True, we will render back message PNGs.
+# When set True, we will render back message PNGs (drawn with Pillow, no external tools).
 DEFAULT_GENERATE_BACK_MESSAGE_IMAGES = False
 
 # ------------------ Helpers ------------------
+_UNSAFE_FILENAME_RE = re.compile(r"[^\w\s\-\(\)\[\]#&\.]")
+# ASCII characters the regex above strips, as a delete-only translate table
+_UNSAFE_ASCII_TABLE = str.maketrans("", "", "".join(
+    ch for ch in map(chr, range(128)) if not (ch.isalnum() or ch.isspace() or ch in "_-()[]#&.")
+))
+
 def safe_filename(name: str, maxlen: int = 180) -> str:
     name = str(name)
-    name = re.sub(r"[^\w\s\-\(\)\[\]#&\.]", "", name)
-    name = re.sub(r"\s+", " ", name).strip()
-    name = name.replace(" ", "_")
+    # Order numbers and product names are almost always ASCII: one translate pass, no regex
+    name = name.translate(_UNSAFE_ASCII_TABLE) if name.isascii() else _UNSAFE_FILENAME_RE.sub("", name)
+    name = "_".join(name.split())
     return name[:maxlen]
 
+# Characters remove_emojis drops on top of the C*/S* categories (mojibake from exported text)
+EMOJI_EXTRA_CHARS = frozenset("\u00e2\u00a4\u00ef\u00b8\u00ae\u00a9\u2122 \u00b6\u00ab\u00bb")
+
+class _EmojiStripTable(dict):
+    """str.translate table that classifies each code point once, then answers from the dict."""
+    def __missing__(self, codepoint):
+        ch = chr(codepoint)
+        value = None if unicodedata.category(ch)[0] in "CS" or ch in EMOJI_EXTRA_CHARS else codepoint
+        self[codepoint] = value
+        return value
+
+_EMOJI_STRIP_TABLE = _EmojiStripTable()
+
 def remove_emojis(text: str) -> str:
     if text is None:
         return ""
-    cleaned = ''.join(ch for ch in text if not unicodedata.category(ch).startswith(('C', 'S')))
-    cleaned = re.sub(r'[â¤ï¸®©™ ¶«»]', '', cleaned)
-    cleaned = re.sub(r'[\x00-\x1F\x7F-\x9F]', '', cleaned)
-    return cleaned.strip()
+    return text.translate(_EMOJI_STRIP_TABLE).strip()
 
 def extract_color(variant: str) -> str:
     if not variant or str(variant).strip().lower() == "nan":
@@ -60,99 +83,285 @@ def extract_color(variant: str) -> str:
         return variant.split("/")[0].strip().title()
     return variant.split()[0].strip().title()
 
+# Python-repr fixups for exported properties, applied in one pass
+_PROPS_FIXUP_RE = re.compile(r"''|u'|None")
+_PROPS_FIXUPS = {"''": '"', "u'": '"', "None": "null"}
+
 def parse_lineitem_properties(props_raw):
     if props_raw is None or (isinstance(props_raw, float) and pd.isna(props_raw)):
         return []
     s = str(props_raw).strip()
-    s = s.replace("''", '"').replace("u'", '"').replace("None", "null")
+    s = _PROPS_FIXUP_RE.sub(lambda m: _PROPS_FIXUPS[m.group()], s)
     try:
-        return json.loads(s)
+        return _json_loads(s)
     except Exception:
         try:
-            return json.loads(s.strip('"'))
+            return _json_loads(s.strip('"'))
         except Exception:
             return []
 
+def read_orders_csv(csv_path) -> pd.DataFrame:
+    """
+    Read a Shopify export as strings. The pyarrow engine is tried first for speed, but it
+    rejects ragged rows and keeps duplicate header names as-is; either way the C engine
+    (pads short rows, mangles duplicates to "name.1") is used so the frame matches.
+    """
+    if CSV_ENGINE == "pyarrow":
+        try:
+            df = pd.read_csv(csv_path, dtype=str, keep_default_na=False, engine="pyarrow")
+        except (pd.errors.ParserError, ValueError):
+            df = None
+        if df is not None and not df.columns.duplicated().any():
+            return df
+    return pd.read_csv(csv_path, dtype=str, keep_default_na=False, engine="c")
+
 def clean_text(text):
     return "" if text is None or (isinstance(text, float) and pd.isna(text)) else str(text).strip()
 
-def make_session(retry_total: int, backoff_factor: float) -> requests.Session:
-    session = requests.Session()
-    retry = Retry(
-        total=retry_total,
-        backoff_factor=backoff_factor,
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["GET"],
-        raise_on_status=False,
-    )
-    adapter = HTTPAdapter(max_retries=retry)
-    session.mount("http://", adapter)
-    session.mount("https://", adapter)
-    return session
-
-def download_and_save_png(session: requests.Session, img_url: str, save_path: str, timeout: int) -> bool:
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+def make_client(timeout: int, max_connections: int) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    return httpx.AsyncClient(timeout=timeout, follow_redirects=True, limits=limits)
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+def is_plain_rgb_png(content: bytes) -> bool:
+    # IHDR is always the first chunk: bit depth at byte 24, colour type at byte 25 (2 = RGB)
+    return content[:8] == PNG_SIGNATURE and content[12:16] == b"IHDR" and content[24] == 8 and content[25] == 2
+
+def save_as_png(content: bytes, save_path: str) -> None:
+    if len(content) > 25 and is_plain_rgb_png(content):
+        # Already the 8-bit RGB PNG that convert("RGB") + save would produce; skip the decode/encode
+        Path(save_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(save_path).write_bytes(content)
+        return
+    with Image.open(BytesIO(content)).convert("RGB") as img:
+        Path(save_path).parent.mkdir(parents=True, exist_ok=True)
+        img.save(save_path, "PNG")
+
+async def download_and_save_png(client: httpx.AsyncClient, semaphore: asyncio.Semaphore, img_url: str,
+                                save_path: str, retry_total: int, backoff_factor: float) -> bool:
     try:
-        resp = session.get(img_url, timeout=timeout)
-        resp.raise_for_status()
-        with Image.open(BytesIO(resp.content)).convert("RGB") as img:
-            Path(save_path).parent.mkdir(parents=True, exist_ok=True)
-            img.save(save_path, "PNG")
+        # Only the request holds a network slot; decoding runs on the worker threads afterwards
+        async with semaphore:
+            for attempt in range(retry_total + 1):
+                try:
+                    resp = await client.get(img_url)
+                    if resp.status_code not in RETRY_STATUSES or attempt == retry_total:
+                        break
+                except httpx.TransportError:
+                    if attempt == retry_total:
+                        raise
+                await asyncio.sleep(backoff_factor * (2 ** attempt))
+            resp.raise_for_status()
+        await asyncio.to_thread(save_as_png, resp.content, save_path)
         return True
     except Exception:
         return False
 
+BACK_MESSAGE_FONT_SIZE = 28
+BACK_MESSAGE_LINE_HEIGHT = round(BACK_MESSAGE_FONT_SIZE * 1.2)
+BACK_MESSAGE_FONTS = ("arial.ttf", "Arial.ttf", "DejaVuSans.ttf", "LiberationSans-Regular.ttf")
+
+@lru_cache(maxsize=1)
+def back_message_font() -> ImageFont.FreeTypeFont:
+    for name in BACK_MESSAGE_FONTS:
+        try:
+            return ImageFont.truetype(name, BACK_MESSAGE_FONT_SIZE)
+        except OSError:
+            continue
+    return ImageFont.load_default(size=BACK_MESSAGE_FONT_SIZE)
+
+def wrap_text(text: str, font: ImageFont.FreeTypeFont, max_width: int) -> list[str]:
+    """Greedy word wrap; words wider than a line are broken, like CSS word-break: break-word."""
+    lines: list[str] = []
+    line = ""
+    for word in text.split():
+        candidate = f"{line} {word}" if line else word
+        if font.getlength(candidate) <= max_width:
+            line = candidate
+            continue
+        if line:
+            lines.append(line)
+        while len(word) > 1 and font.getlength(word) > max_width:
+            cut = len(word) - 1
+            while cut > 1 and font.getlength(word[:cut]) > max_width:
+                cut -= 1
+            lines.append(word[:cut])
+            word = word[cut:]
+        line = word
+    if line:
+        lines.append(line)
+    return lines
+
 def generate_back_message_image(order_id, message_text, save_path, width=709, height=189):
     """
-    Requires wkhtmltoimage to be installed (via wkhtmltopdf).
-    If it's not installed, this may fail; we gate this with a toggle above.
+    Render the back message as centered black text on white, in-process with Pillow.
+    Text that does not fit vertically is clipped evenly top and bottom.
     """
     cleaned_text = remove_emojis(message_text).upper()
-    temp_height = max(height, 300)
-    hti = Html2Image(output_path=os.path.dirname(save_path))
-    temp_name = os.path.basename(save_path).replace(".png", "_temp.png")
-
-    html = f"""
-    <html>
-    <head>
-    <style>
-        body {{
-            width: {width}px;
-            height: {temp_height}px;
-            display: flex;
-            justify-content: center;
-            align-items: center;
-            background-color: white;
-            font-size: 28px;
-            font-family: Arial, sans-serif;
-            text-align: center;
-            line-height: 1.2;
-            padding: 0 10px;
-            margin: 0;
-        }}
-        span {{
-            max-width: {width - 40}px;
-            word-break: break-word;
-            white-space: pre-wrap;
-        }}
-    </style>
-    </head>
-    <body><span>{cleaned_text}</span></body>
-    </html>
-    """
-
-    # Render to a taller temporary image, then crop to target height
-    hti.screenshot(html_str=html, save_as=temp_name, size=(width, temp_height))
-    temp_path = os.path.join(os.path.dirname(save_path), temp_name)
-    with Image.open(temp_path) as img:
-        top = max((temp_height - height) // 2, 0)
-        cropped = img.crop((0, top, width, top + height))
-        cropped.save(save_path)
-    try:
-        os.remove(temp_path)
-    except Exception:
-        pass
+    font = back_message_font()
+    lines = wrap_text(cleaned_text, font, width - 40)
+
+    img = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(img)
+    y = (height - BACK_MESSAGE_LINE_HEIGHT * len(lines)) / 2
+    for line in lines:
+        draw.text((width / 2, y + BACK_MESSAGE_LINE_HEIGHT / 2), line, font=font, fill="black", anchor="mm")
+        y += BACK_MESSAGE_LINE_HEIGHT
+    img.save(save_path)
     return True
 
+UTF8_BOM = b"\xef\xbb\xbf"
+
+def write_csv(rows: list[dict], path: Path) -> None:
+    """Write dict rows as a UTF-8-with-BOM CSV (what Excel expects), via pyarrow's C++ writer when available."""
+    if pyarrow is not None and rows:
+        # Union of keys in first-seen order, like DataFrame(rows); from_pylist would keep only row 0's keys
+        columns = list(dict.fromkeys(key for row in rows for key in row))
+        try:
+            table = pyarrow.table({col: [row.get(col) for row in rows] for col in columns})
+        except (pyarrow.ArrowException, TypeError):
+            table = None  # mixed types in a column; let pandas stringify them
+        if table is not None:
+            with open(path, "wb") as f:
+                f.write(UTF8_BOM)
+                pa_csv.write_csv(table, f, write_options=pa_csv.WriteOptions(include_header=True))
+            return
+    pd.DataFrame(rows).to_csv(path, index=False, encoding="utf-8-sig")
+
+# ------------------ Per-product worker ------------------
+def process_group(product_name: str, group_orders: list[dict], output_folder: Path, settings: dict):
+    """
+    Download and convert one product's images and write its CSVs. Runs in a worker
+    process, so results come back by value: (updated orders, skipped images, success counts).
+    """
+    max_threads = settings["max_threads"]
+    max_connections = settings["max_connections"]
+    retry_total = settings["retry_total"]
+    backoff_factor = settings["backoff_factor"]
+    timeout_sec = settings["timeout_sec"]
+    include_per_product_csv = settings["include_per_product_csv"]
+    include_back_messages_csv = settings["include_back_messages_csv"]
+    generate_back_images = settings["generate_back_images"]
+
+    main_dir = output_folder / product_name / "main"
+    polaroid_dir = output_folder / product_name / "polaroids"
+    back_dir = output_folder / product_name / "back_messages"
+    main_dir.mkdir(parents=True, exist_ok=True)
+    polaroid_dir.mkdir(parents=True, exist_ok=True)
+    back_dir.mkdir(parents=True, exist_ok=True)
+
+    async def process_one(client: httpx.AsyncClient, semaphore: asyncio.Semaphore, order: dict):
+        """Fills in the order's statuses; returns (main ok, polaroids saved, skipped entries, back message row)."""
+        skipped: list[dict] = []
+        back_row = None
+        main_ok = False
+        order_id = order["Order Number"]
+        variant = clean_text(order["Variant"]).title()
+        color = extract_color(variant)
+        photo_link = clean_text(order["Main Photo Link"])
+        polaroid_list = order.get("Polaroid Link(s)", []) or []
+        back_value = order["Back Engraving Value"]
+
+        # MAIN
+        main_fname = safe_filename(f"{order_id} -{color}.png")
+        main_path = main_dir / main_fname
+        if photo_link.lower().startswith("http"):
+            if await download_and_save_png(client, semaphore, photo_link, str(main_path), retry_total, backoff_factor):
+                order["Main Photo Status"] = "✅ Success"
+                main_ok = True
+            else:
+                order["Main Photo Status"] = "❌ Failed"
+                skipped.append({"Order ID": order_id, "Type": "Main Photo", "Link": photo_link})
+        else:
+            order["Main Photo Status"] = "⚠️ Invalid"
+            skipped.append({"Order ID": order_id, "Type": "Main Photo", "Link": photo_link})
+
+        # POLAROID(S)
+        count = 0
+        for idx, link in enumerate(polaroid_list, 1):
+            if isinstance(link, str) and link.lower().startswith("http"):
+                p_fname = safe_filename(f"{order_id} -{color}_polaroid_{idx}.png")
+                p_path = polaroid_dir / p_fname
+                if await download_and_save_png(client, semaphore, link, str(p_path), retry_total, backoff_factor):
+                    count += 1
+                else:
+                    skipped.append({"Order ID": order_id, "Type": f"Polaroid {idx}", "Link": link})
+            else:
+                skipped.append({"Order ID": order_id, "Type": f"Polaroid {idx}", "Link": link})
+        order["Polaroid Count"] = count
+
+        # BACK MESSAGE (toggleable)
+        if back_value and generate_back_images:
+            try:
+                b_fname = safe_filename(f"{order_id} -{color}_backmsg.png")
+                b_path = back_dir / b_fname
+                await asyncio.to_thread(generate_back_message_image, order_id, back_value, str(b_path))
+                back_row = {
+                    "Order ID": order_id,
+                    "Engraving Type": order["Back Engraving Type"],
+                    "Engraving Value": remove_emojis(back_value).upper()
+                }
+            except Exception:
+                # Don't fail the whole job for one bad render
+                pass
+        else:
+            # We may still want the CSV row even if image is disabled, depending on option below
+            if back_value:
+                back_row = {
+                    "Order ID": order_id,
+                    "Engraving Type": order["Back Engraving Type"],
+                    "Engraving Value": remove_emojis(back_value).upper()
+                }
+
+        return main_ok, count, skipped, back_row
+
+    async def run_downloads():
+        # Every download in the group is in flight at once, up to max_connections;
+        # PIL work goes to max_threads worker threads
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=max_threads))
+        semaphore = asyncio.Semaphore(max_connections)
+        async with make_client(timeout_sec, max_connections) as client:
+            return await asyncio.gather(*(process_one(client, semaphore, order) for order in group_orders))
+
+    # Each order reports its own results; merging them here keeps the CSVs in order-list
+    # order no matter which downloads finish first
+    results = asyncio.run(run_downloads())
+    counts = {
+        "success_main": sum(1 for main_ok, _, _, _ in results if main_ok),
+        "success_polaroid": sum(polaroids for _, polaroids, _, _ in results),
+    }
+    skipped_images = [entry for _, _, skipped, _ in results for entry in skipped]
+    back_messages_rows = [back_row for _, _, _, back_row in results if back_row is not None]
+
+    # Per-product CSV
+    if include_per_product_csv:
+        rows = []
+        for o in group_orders:
+            pls = o.get("Polaroid Link(s)", [])
+            pls_str = ", ".join(pls) if isinstance(pls, list) else str(pls)
+            rows.append({
+                "Order Number": o["Order Number"],
+                "Product Name": o["Product Name"],
+                "Variant": o["Variant"],
+                "Main Photo Link": o["Main Photo Link"],
+                "Polaroid Link(s)": pls_str,
+                "Back Engraving Type": o.get("Back Engraving Type", ""),
+                "Back Engraving Value": remove_emojis(o.get("Back Engraving Value", "")),
+                "Main Photo Status": o.get("Main Photo Status", "")
+            })
+        write_csv(rows, output_folder / product_name / "Organized Orders.csv")
+
+    # Back messages CSV
+    if include_back_messages_csv and back_messages_rows:
+        write_csv(back_messages_rows, output_folder / product_name / "Back_Messages.csv")
+
+    return group_orders, skipped_images, counts
+
+STORED_SUFFIXES = frozenset({".png", ".jpg", ".jpeg", ".webp"})
+
 # ------------------ Main worker ------------------
 def process_csv_file(csv_path: Path, out_dir: Path, status_cb=lambda s, progress=None: None, options: dict | None = None) -> Path:
     """
@@ -161,7 +370,8 @@ def process_csv_file(csv_path: Path, out_dir: Path, status_cb=lambda s, progress
     status_cb: callback(str, progress_float)
     options:
         - order_prefix (str) default "#ER"
-        - max_threads (int) default 8
+        - max_threads (int) default 8 (image decode/encode threads)
+        - max_connections (int) default 64 (concurrent image downloads)
         - retry_total (int) default 3
         - backoff_factor (float) default 0.6
         - timeout_sec (int) default 15
@@ -175,6 +385,7 @@ def process_csv_file(csv_path: Path, out_dir: Path, status_cb=lambda s, progress
     opts = options or {}
     order_prefix = opts.get("order_prefix", "#ER")
     max_threads = int(opts.get("max_threads", 8))
+    max_connections = max(1, int(opts.get("max_connections", 64)))
     retry_total = int(opts.get("retry_total", 3))
     backoff_factor = float(opts.get("backoff_factor", 0.6))
     timeout_sec = int(opts.get("timeout_sec", 15))
@@ -183,10 +394,8 @@ def process_csv_file(csv_path: Path, out_dir: Path, status_cb=lambda s, progress
     zip_name = str(opts.get("zip_name", "results")).strip() or "results"
     generate_back_images = bool(opts.get("generate_back_message_images", DEFAULT_GENERATE_BACK_MESSAGE_IMAGES))
 
-    session = make_session(retry_total, backoff_factor)
-
     status_cb("Reading CSV...", 5.0)
-    df = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    df = read_orders_csv(csv_path)
     df.columns = df.columns.str.strip()
 
     required_cols = ["Order Name", "Lineitem Properties", "Lineitem Name", "Lineitem Variant Title"]
@@ -203,22 +412,27 @@ def process_csv_file(csv_path: Path, out_dir: Path, status_cb=lambda s, progress
     orders: list[dict] = []
     skipped_images: list[dict] = []
 
-    for order_id in df["Order Name"].unique():
-        order_rows = df[df["Order Name"] == order_id]
+    # One pass over the frame: parse every row's properties and title-case the name columns
+    # up front (column-wise str ops), then walk each order's rows as plain tuples
+    # (groupby keeps first-seen order, like unique())
+    df["_props"] = df["Lineitem Properties"].map(parse_lineitem_properties)
+    df["_ln_title"] = df["Lineitem Name"].fillna("").str.strip().str.title()
+    df["_vt_title"] = df["Lineitem Variant Title"].fillna("").str.strip().str.title()
+    row_cols = ["_props", "_ln_title", "_vt_title"]
+
+    for order_id, order_rows in df.groupby("Order Name", sort=False):
         photo_link, polaroid_links, product_name, variant = "", [], "", ""
         back_message, spotify_link = "", ""
 
-        for _, row in order_rows.iterrows():
-            props = parse_lineitem_properties(row.get("Lineitem Properties", ""))
-
+        for props, lineitem_title, variant_title in order_rows[row_cols].itertuples(index=False, name=None):
             for item in props:
                 key = clean_text(item.get("name", "")).lower()
                 val = clean_text(item.get("value", ""))
 
                 if key in ["photo", "photo link"]:
                     photo_link = val
-                    product_name = clean_text(row.get("Lineitem Name", "")).title()
-                    variant = clean_text(row.get("Lineitem Variant Title", "")).title()
+                    product_name = lineitem_title
+                    variant = variant_title
 
                 elif key in ["polaroid", "your polaroid image"]:
                     if val:
@@ -254,124 +468,40 @@ def process_csv_file(csv_path: Path, out_dir: Path, status_cb=lambda s, progress
     # Clamp threads
     max_threads = max(1, min(max_threads, multiprocessing.cpu_count() * 2))
 
-    # Process each product group
+    # Product groups run in parallel worker processes (separate output folders, so no contention);
+    # the download budget is split between them so the CDN sees the same total concurrency
     total_products = len(product_groups)
+    workers = max(1, min(total_products, os.cpu_count() or 1))
+    settings = {
+        "max_threads": max_threads,
+        "max_connections": max(1, max_connections // workers),
+        "retry_total": retry_total,
+        "backoff_factor": backoff_factor,
+        "timeout_sec": timeout_sec,
+        "include_per_product_csv": include_per_product_csv,
+        "include_back_messages_csv": include_back_messages_csv,
+        "generate_back_images": generate_back_images,
+    }
     processed_products = 0
 
-    for product_name, group_orders in product_groups.items():
-        processed_products += 1
-        status_cb(f"Processing product {processed_products}/{total_products}: {product_name}",
-                  15.0 + 70.0 * processed_products / max(1, total_products))
-
-        main_dir = output_folder / product_name / "main"
-        polaroid_dir = output_folder / product_name / "polaroids"
-        back_dir = output_folder / product_name / "back_messages"
-        main_dir.mkdir(parents=True, exist_ok=True)
-        polaroid_dir.mkdir(parents=True, exist_ok=True)
-        back_dir.mkdir(parents=True, exist_ok=True)
-
-        back_messages_rows: list[dict] = []
-
-        def process_one(order: dict):
-            order_id = order["Order Number"]
-            variant = clean_text(order["Variant"]).title()
-            color = extract_color(variant)
-            photo_link = clean_text(order["Main Photo Link"])
-            polaroid_list = order.get("Polaroid Link(s)", []) or []
-            back_value = order["Back Engraving Value"]
-
-            # MAIN
-            main_fname = safe_filename(f"{order_id} -{color}.png")
-            main_path = main_dir / main_fname
-            if photo_link.lower().startswith("http"):
-                if download_and_save_png(session, photo_link, str(main_path), timeout_sec):
-                    order["Main Photo Status"] = "✅ Success"
-                    with counter_lock:
-                        counters["success_main"] += 1
-                else:
-                    order["Main Photo Status"] = "❌ Failed"
-                    with skipped_lock:
-                        skipped_images.append({"Order ID": order_id, "Type": "Main Photo", "Link": photo_link})
-            else:
-                order["Main Photo Status"] = "⚠️ Invalid"
-                with skipped_lock:
-                    skipped_images.append({"Order ID": order_id, "Type": "Main Photo", "Link": photo_link})
-
-            # POLAROID(S)
-            count = 0
-            for idx, link in enumerate(polaroid_list, 1):
-                if isinstance(link, str) and link.lower().startswith("http"):
-                    p_fname = safe_filename(f"{order_id} -{color}_polaroid_{idx}.png")
-                    p_path = polaroid_dir / p_fname
-                    if download_and_save_png(session, link, str(p_path), timeout_sec):
-                        count += 1
-                        with counter_lock:
-                            counters["success_polaroid"] += 1
-                    else:
-                        with skipped_lock:
-                            skipped_images.append({"Order ID": order_id, "Type": f"Polaroid {idx}", "Link": link})
-                else:
-                    with skipped_lock:
-                        skipped_images.append({"Order ID": order_id, "Type": f"Polaroid {idx}", "Link": link})
-            order["Polaroid Count"] = count
-
-            # BACK MESSAGE (toggleable)
-            if back_value and generate_back_images:
-                try:
-                    b_fname = safe_filename(f"{order_id} -{color}_backmsg.png")
-                    b_path = back_dir / b_fname
-                    generate_back_message_image(order_id, back_value, str(b_path))
-                    with backmsg_lock:
-                        back_messages_rows.append({
-                            "Order ID": order_id,
-                            "Engraving Type": order["Back Engraving Type"],
-                            "Engraving Value": remove_emojis(back_value).upper()
-                        })
-                except Exception:
-                    # Don't fail the whole job for one bad render
-                    pass
-            else:
-                # We may still want the CSV row even if image is disabled, depending on option below
-                if back_value:
-                    with backmsg_lock:
-                        back_messages_rows.append({
-                            "Order ID": order_id,
-                            "Engraving Type": order["Back Engraving Type"],
-                            "Engraving Value": remove_emojis(back_value).upper()
-                        })
-
-        with ThreadPoolExecutor(max_workers=max_threads) as pool:
-            list(pool.map(process_one, group_orders))
-
-        # Per-product CSV
-        if include_per_product_csv:
-            rows = []
-            for o in group_orders:
-                pls = o.get("Polaroid Link(s)", [])
-                pls_str = ", ".join(pls) if isinstance(pls, list) else str(pls)
-                rows.append({
-                    "Order Number": o["Order Number"],
-                    "Product Name": o["Product Name"],
-                    "Variant": o["Variant"],
-                    "Main Photo Link": o["Main Photo Link"],
-                    "Polaroid Link(s)": pls_str,
-                    "Back Engraving Type": o.get("Back Engraving Type", ""),
-                    "Back Engraving Value": remove_emojis(o.get("Back Engraving Value", "")),
-                    "Main Photo Status": o.get("Main Photo Status", "")
-                })
-            pd.DataFrame(rows).to_csv(
-                output_folder / product_name / "Organized Orders.csv",
-                index=False,
-                encoding="utf-8-sig"
-            )
-
-        # Back messages CSV
-        if include_back_messages_csv and back_messages_rows:
-            pd.DataFrame(back_messages_rows).to_csv(
-                output_folder / product_name / "Back_Messages.csv",
-                index=False,
-                encoding="utf-8-sig"
-            )
+    # spawn: the job runs on a thread inside the web server, which is not safe to fork
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {
+            pool.submit(process_group, product_name, group_orders, output_folder, settings): (product_name, group_orders)
+            for product_name, group_orders in product_groups.items()
+        }
+        for future in as_completed(futures):
+            product_name, group_orders = futures[future]
+            updated_orders, group_skipped, group_counts = future.result()
+            # Workers got copies of the order dicts; copy their statuses back for the global CSV
+            for order, updated in zip(group_orders, updated_orders):
+                order.update(updated)
+            skipped_images.extend(group_skipped)
+            for key, value in group_counts.items():
+                counters[key] += value
+            processed_products += 1
+            status_cb(f"Processed product {processed_products}/{total_products}: {product_name}",
+                      15.0 + 70.0 * processed_products / max(1, total_products))
 
     # Global CSVs
     ist = pytz.timezone("Asia/Kolkata")
@@ -386,18 +516,27 @@ def process_csv_file(csv_path: Path, out_dir: Path, status_cb=lambda s, progress
         ocopy["Back Engraving Value"] = remove_emojis(ocopy.get("Back Engraving Value", ""))
         orders_csv.append(ocopy)
 
-    pd.DataFrame(orders_csv).to_csv(out_dir / f"Organized Orders - {stamp}.csv", index=False, encoding="utf-8-sig")
+    write_csv(orders_csv, out_dir / f"Organized Orders - {stamp}.csv")
     if 'skipped_images' in locals() and skipped_images:
-        pd.DataFrame(skipped_images).to_csv(out_dir / f"Skipped_Images - {stamp}.csv", index=False, encoding="utf-8-sig")
+        write_csv(skipped_images, out_dir / f"Skipped_Images - {stamp}.csv")
 
     # Zip all outputs in this job folder
     status_cb("Creating ZIP...", 98.0)
     zip_base = zip_name.replace(" ", "_")
     zip_path = out_dir / f"{zip_base}_{stamp}.zip"
-    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as z:
-        for p in out_dir.rglob("*"):
-            if p.is_file() and p != zip_path:
-                z.write(p, p.relative_to(out_dir))
+    # Built under a temporary name and renamed at the end, so a failed job never leaves a partial ZIP
+    staging_path = zip_path.with_suffix(".zip.part")
+    try:
+        with zipfile.ZipFile(staging_path, "w", zipfile.ZIP_DEFLATED) as z:
+            for p in out_dir.rglob("*"):
+                if p.is_file() and p not in (zip_path, staging_path):
+                    # Images are already compressed; deflating them again costs CPU for ~0% gain
+                    compress_type = zipfile.ZIP_STORED if p.suffix.lower() in STORED_SUFFIXES else zipfile.ZIP_DEFLATED
+                    z.write(p, p.relative_to(out_dir), compress_type=compress_type)
+        os.replace(staging_path, zip_path)
+    except BaseException:
+        staging_path.unlink(missing_ok=True)
+        raise
 
     status_cb("Done", 100.0)
     return zip_path
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Form
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from models import get_db, User
 from chat_models import ChatChannel, ChatMessage
@@ -22,6 +22,7 @@ def list_messages(
 
     messages = (
         db.query(ChatMessage)
+        .options(selectinload(ChatMessage.sender))
         .filter(ChatMessage.channel_id == channel_id)
         .order_by(ChatMessage.created_at.desc())
         .limit(limit)
@@ -5,11 +5,20 @@ import json
 
 from fastapi import APIRouter, HTTPException, Depends, Form, Query, UploadFile, File
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import or_
 
 from models import get_db, User
-from chat_models import ChatChannel, ChatMessage, DirectConversation, MessageRead
+from chat_models import (
+    ChatChannel,
+    ChatMessage,
+    DirectConversation,
+    MessageRead,
+    add_reaction,
+    channel_id_by_name,
+    reactions_for,
+    remove_reaction,
+)
 
 router = APIRouter()
 
@@ -22,11 +31,13 @@ def list_channels(db: Session = Depends(get_db)):
 
 @router.get("/api/chat/channel/{name}")
 def get_channel_messages(name: str, limit: int = Query(50, ge=1, le=200), before: Optional[str] = None, db: Session = Depends(get_db)):
-    channel = db.query(ChatChannel).filter(ChatChannel.name == name).first()
-    if not channel:
+    try:
+        channel_id = channel_id_by_name(name)
+    except LookupError:
         raise HTTPException(status_code=404, detail="Channel not found")
 
-    q = db.query(ChatMessage).filter(ChatMessage.channel_id == channel.id)
+    # Senders for the whole page load in one IN query instead of one query per message
+    q = db.query(ChatMessage).options(selectinload(ChatMessage.sender)).filter(ChatMessage.channel_id == channel_id)
     if before:
         # before is message_id; fetch messages older than that message's created_at
         anchor = db.query(ChatMessage).filter(ChatMessage.id == before).first()
@@ -39,9 +50,10 @@ def get_channel_messages(name: str, limit: int = Query(50, ge=1, le=200), before
          .all()
     )
 
+    reactions = reactions_for(db, [m.id for m in messages])
     items = []
     for m in reversed(messages):
-        sender = db.query(User).filter(User.id == m.sender_id).first()
+        sender = m.sender
         items.append({
             "id": m.id,
             "employee_id": m.sender_id,
@@ -52,7 +64,7 @@ def get_channel_messages(name: str, limit: int = Query(50, ge=1, le=200), before
             "edited_at": m.edited_at.isoformat() if m.edited_at else None,
             "links": m.links,
             "attachments": m.attachments,
-            "reactions": m.reactions,
+            "reactions": reactions.get(m.id, {}),
         })
 
     next_before = messages[-1].id if messages else None
@@ -74,8 +86,9 @@ def send_channel_message(
     if not user:
         raise HTTPException(status_code=400, detail="Invalid user")
 
-    ch = db.query(ChatChannel).filter(ChatChannel.name == channel).first()
-    if not ch:
+    try:
+        channel_id = channel_id_by_name(channel)
+    except LookupError:
         raise HTTPException(status_code=404, detail="Channel not found")
 
     atts = None
@@ -86,7 +99,7 @@ def send_channel_message(
             atts = None
 
     msg = ChatMessage(
-        channel_id=ch.id,
+        channel_id=channel_id,
         sender_id=user.id,
         content=message.strip(),
         attachments=atts,
@@ -111,23 +124,13 @@ def send_channel_message(
 
 @router.post("/api/chat/message/react")
 def react_message(message_id: str = Form(...), employee_id: str = Form(...), emoji: str = Form(...), db: Session = Depends(get_db)):
-    m = db.query(ChatMessage).filter(ChatMessage.id == message_id).first()
-    if not m:
+    exists = db.query(ChatMessage.id).filter(ChatMessage.id == message_id).first()
+    if not exists:
         raise HTTPException(status_code=404, detail="Message not found")
-    reactions = m.reactions or {}
-    users = reactions.get(emoji, [])
-    if employee_id in users:
-        users.remove(employee_id)
-    else:
-        users.append(employee_id)
-    if users:
-        reactions[emoji] = users
-    elif emoji in reactions:
-        del reactions[emoji]
-    m.reactions = reactions
-    db.add(m)
-    db.commit()
-    return {"ok": True, "reactions": reactions}
+    # Toggle: a delete that removes nothing means the user had not reacted yet
+    if not remove_reaction(db, message_id, emoji, employee_id):
+        add_reaction(db, message_id, emoji, employee_id)
+    return {"ok": True, "reactions": reactions_for(db, [message_id]).get(message_id, {})}
 
 
 @router.post("/api/chat/thread/reply")
@@ -163,13 +166,14 @@ def thread_reply(parent_message_id: str = Form(...), employee_id: str = Form(...
 @router.get("/api/chat/thread/{parent_message_id}")
 def get_thread(parent_message_id: str, limit: int = Query(50, ge=1, le=200), db: Session = Depends(get_db)):
     q = (db.query(ChatMessage)
+            .options(selectinload(ChatMessage.sender))
             .filter(ChatMessage.parent_message_id == parent_message_id)
             .order_by(ChatMessage.created_at.asc())
             .limit(limit))
     rows = q.all()
     items = []
     for m in rows:
-        sender = db.query(User).filter(User.id == m.sender_id).first()
+        sender = m.sender
         items.append({
             "id": m.id,
             "employee_id": m.sender_id,
@@ -181,6 +185,7 @@ def get_thread(parent_message_id: str, limit: int = Query(50, ge=1, le=200), db:
 
 
 def _pair(a: str, b: str) -> tuple[str, str]:
+    # DirectConversation rows always hold the pair in this order
     return (a, b) if a <= b else (b, a)
 
 
@@ -200,8 +205,7 @@ def dm_send(
         raise HTTPException(status_code=400, detail="Invalid user")
     a, b = _pair(from_employee_id, to_employee_id)
     conv = (db.query(DirectConversation)
-               .filter(or_(and_(DirectConversation.user_a_id == a, DirectConversation.user_b_id == b),
-                           and_(DirectConversation.user_a_id == b, DirectConversation.user_b_id == a)))
+               .filter(DirectConversation.user_a_id == a, DirectConversation.user_b_id == b)
                .first())
     if not conv:
         conv = DirectConversation(user_a_id=a, user_b_id=b)
@@ -238,28 +242,28 @@ def dm_send(
 def dm_messages(user_a: str, user_b: str, limit: int = Query(50, ge=1, le=200), before: Optional[str] = None, db: Session = Depends(get_db)):
     a, b = _pair(user_a, user_b)
     conv = (db.query(DirectConversation)
-               .filter(or_(and_(DirectConversation.user_a_id == a, DirectConversation.user_b_id == b),
-                           and_(DirectConversation.user_a_id == b, DirectConversation.user_b_id == a)))
+               .filter(DirectConversation.user_a_id == a, DirectConversation.user_b_id == b)
                .first())
     if not conv:
         return {"messages": [], "next_before": None}
-    q = db.query(ChatMessage).filter(ChatMessage.conversation_id == conv.id)
+    q = db.query(ChatMessage).options(selectinload(ChatMessage.sender)).filter(ChatMessage.conversation_id == conv.id)
     if before:
         anchor = db.query(ChatMessage).filter(ChatMessage.id == before).first()
         if anchor:
             q = q.filter(ChatMessage.created_at < anchor.created_at)
     rows = q.order_by(ChatMessage.created_at.desc()).limit(limit).all()
     rows.reverse()
+    reactions = reactions_for(db, [m.id for m in rows])
     items = []
     for m in rows:
-        sender = db.query(User).filter(User.id == m.sender_id).first()
+        sender = m.sender
         items.append({
             "id": m.id,
             "from_employee_id": m.sender_id,
             "employee_name": sender.name if sender else "Unknown",
             "message": m.content,
             "timestamp": m.created_at.isoformat(),
-            "reactions": m.reactions,
+            "reactions": reactions.get(m.id, {}),
         })
     next_before = rows[0].id if rows else None
     return {"messages": items, "next_before": next_before}
@@ -364,12 +368,11 @@ def search_messages(
     date_to: Optional[str] = None,
     db: Session = Depends(get_db),
 ):
-    query = db.query(ChatMessage)
+    query = db.query(ChatMessage).options(selectinload(ChatMessage.sender))
     if channel:
-        ch = db.query(ChatChannel).filter(ChatChannel.name == channel).first()
-        if ch:
-            query = query.filter(ChatMessage.channel_id == ch.id)
-        else:
+        try:
+            query = query.filter(ChatMessage.channel_id == channel_id_by_name(channel))
+        except LookupError:
             return {"results": []}
     if user_id:
         query = query.filter(ChatMessage.sender_id == user_id)
@@ -391,7 +394,7 @@ def search_messages(
     rows = query.order_by(ChatMessage.created_at.desc()).limit(200).all()
     results = []
     for m in rows:
-        sender = db.query(User).filter(User.id == m.sender_id).first()
+        sender = m.sender
         results.append({
             "id": m.id,
             "channel_id": m.channel_id,
@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException, Request, Query
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy import or_, and_
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, raiseload, selectinload
 
 from models import get_db
 from models.orders import Order, OrderEvent
@@ -41,7 +41,8 @@ def list_orders(
     db: Session = Depends(get_db)
 ):
     """List orders with filters and cursor pagination"""
-    query = db.query(Order)
+    # Rows are serialized from columns only; a relationship touched here would be N+1, so fail loudly
+    query = db.query(Order).options(raiseload("*"))
     
     # Apply filters
     if status:
@@ -120,7 +121,11 @@ def list_orders(
 @router.get("/api/orders/{order_id}")
 def get_order(order_id: str, db: Session = Depends(get_db)):
     """Get detailed order information"""
-    order = db.query(Order).filter(
+    order = db.query(Order).options(
+        selectinload(Order.line_items),
+        selectinload(Order.fulfillments),
+        selectinload(Order.events),
+    ).filter(
         or_(Order.id == order_id, Order.shopify_id == order_id)
     ).first()
     
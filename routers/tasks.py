@@ -9,7 +9,8 @@ from pathlib import Path
 from uuid import uuid4
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.orm import Session, joinedload
 
 from models import (
     get_db,
@@ -149,6 +150,16 @@ def require_roles(*roles: str):
     return dep
 
 
+def _board_tasks(db: Session, user_id: str, board: str) -> List[Task]:
+    # Built and cache-keyed once; user_id and board become bound parameters on later calls
+    stmt = lambda_stmt(lambda: (
+        select(Task)
+        .where(Task.assigned_to_id == user_id, Task.board == board)
+        .order_by(Task.priority.desc(), Task.updated_at.desc())
+    ))
+    return db.execute(stmt).scalars().all()
+
+
 # ---- Pages ----
 @router.get("/task", response_class=HTMLResponse)
 def dashboard(request: Request, u: User = Depends(current_user), db: Session = Depends(get_db)):
@@ -158,18 +169,8 @@ def dashboard(request: Request, u: User = Depends(current_user), db: Session = D
     print(f"Dashboard - Current user: {u.id} ({u.name}) - Role: {u.role}")
     
     # Get tasks assigned to current user
-    my_daily = (
-        db.query(Task)
-        .filter(Task.assigned_to_id == u.id, Task.board == "DAILY")
-        .order_by(Task.priority.desc(), Task.updated_at.desc())
-        .all()
-    )
-    my_other = (
-        db.query(Task)
-        .filter(Task.assigned_to_id == u.id, Task.board == "OTHER")
-        .order_by(Task.priority.desc(), Task.updated_at.desc())
-        .all()
-    )
+    my_daily = _board_tasks(db, u.id, "DAILY")
+    my_other = _board_tasks(db, u.id, "OTHER")
     
     # Debug: Print task counts
     all_tasks = db.query(Task).all()
@@ -394,7 +395,11 @@ def admin_tasks_page(request: Request, u: User = Depends(require_roles("ADMIN"))
 @router.get("/api/tasks/{task_id}")
 def get_task(task_id: str, u: User = Depends(current_user), db: Session = Depends(get_db)):
     """Get a single task by ID."""
-    task = db.query(Task).filter(Task.id == task_id).first()
+    # Both users are serialized below; many-to-one, so join them into the same SELECT
+    task = (db.query(Task)
+              .options(joinedload(Task.assigned_to), joinedload(Task.created_by))
+              .filter(Task.id == task_id)
+              .first())
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
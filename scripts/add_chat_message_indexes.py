@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""One-shot migration: add the chat feed indexes to an existing chat_messages table.
+
+create_all only builds indexes alongside new tables, so databases created before the
+composite/partial indexes were declared need this run once. Safe to re-run:
+    python -m scripts.add_chat_message_indexes
+"""
+
+from sqlalchemy import text
+
+from models import engine
+
+NEW_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_chat_msg_channel_created ON chat_messages (channel_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_chat_msg_conv_created ON chat_messages (conversation_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_chat_msg_parent ON chat_messages (parent_message_id) "
+    "WHERE parent_message_id IS NOT NULL",
+]
+
+# Single-column indexes from the old index=True columns; the composites above lead with the same column
+OLD_INDEXES = [
+    "ix_chat_messages_channel_id",
+    "ix_chat_messages_conversation_id",
+    "ix_chat_messages_parent_message_id",
+]
+
+
+def add_chat_message_indexes():
+    with engine.begin() as conn:
+        for statement in NEW_INDEXES:
+            conn.execute(text(statement))
+        for name in OLD_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+if __name__ == "__main__":
+    add_chat_message_indexes()
+    print(f"Created {len(NEW_INDEXES)} chat message indexes, dropped {len(OLD_INDEXES)} superseded ones")
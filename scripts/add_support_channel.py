@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 """Add support channel to chat system."""
 
-from chat_models import ensure_channel_by_name
+from chat_models import ensure_channel_by_name, init_chat_schema
 
 if __name__ == "__main__":
+    init_chat_schema()
     channel = ensure_channel_by_name("support")
     print(f"Support channel exists with ID: {channel.id}")
\ No newline at end of file
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""One-shot migration: store every direct conversation as an ordered pair and merge duplicates.
+
+Run once before deploying the uq_chat_direct_pair constraint:
+    python -m scripts.merge_direct_pairs
+"""
+
+from sqlalchemy import text
+
+from models import engine
+
+
+def merge_direct_pairs():
+    with engine.begin() as conn:
+        rows = conn.execute(text(
+            "SELECT id, user_a_id, user_b_id FROM chat_direct_conversations ORDER BY created_at, id"
+        )).all()
+
+        # Oldest conversation per ordered pair survives; later duplicates are folded into it
+        keep = {}
+        merged = 0
+        swapped = 0
+        for conv_id, user_a, user_b in rows:
+            pair = (user_a, user_b) if user_a <= user_b else (user_b, user_a)
+            if pair in keep:
+                conn.execute(
+                    text("UPDATE chat_messages SET conversation_id = :keep WHERE conversation_id = :dup"),
+                    {"keep": keep[pair], "dup": conv_id},
+                )
+                conn.execute(text("DELETE FROM chat_direct_conversations WHERE id = :dup"), {"dup": conv_id})
+                merged += 1
+                continue
+            keep[pair] = conv_id
+            if pair != (user_a, user_b):
+                conn.execute(
+                    text("UPDATE chat_direct_conversations SET user_a_id = :a, user_b_id = :b WHERE id = :id"),
+                    {"a": pair[0], "b": pair[1], "id": conv_id},
+                )
+                swapped += 1
+
+        conn.execute(text("DROP INDEX IF EXISTS ix_chat_direct_pair"))
+        conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_chat_direct_pair "
+            "ON chat_direct_conversations (user_a_id, user_b_id)"
+        ))
+    return merged, swapped
+
+
+if __name__ == "__main__":
+    merged, swapped = merge_direct_pairs()
+    print(f"Merged {merged} duplicate conversations, reordered {swapped} pairs")
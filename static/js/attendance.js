@@ -0,0 +1,228 @@
+const employeeIdInput = document.getElementById('employeeId');
+const checkInBtn = document.getElementById('checkInBtn');
+const checkOutBtn = document.getElementById('checkOutBtn');
+const attendanceStatus = document.getElementById('attendanceStatus');
+const attendanceTableBody = document.getElementById('attendanceTableBody');
+const filterEmployeeIdInput = document.getElementById('filterEmployeeId');
+const filterDateInput = document.getElementById('filterDate');
+const applyFilterBtn = document.getElementById('applyFilterBtn');
+const clearFilterBtn = document.getElementById('clearFilterBtn');
+const realtimeStatusDiv = document.getElementById('realtimeStatus');
+const employeeSelect = document.getElementById('employeeSelect');
+
+// Populate employee dropdown
+const employees = {
+    "Ritik": "EMP001",
+    "Sunny": "EMP002",
+    "Rahul": "EMP003",
+    "Sumit": "EMP004",
+    "Vishal": "EMP005",
+    "Nishant": "EMP006",
+};
+const employeeIdToName = {};
+// Role-based icon mapping
+const ROLE_ICON_META = Object.freeze({
+    'Super Admin': {icon: '👑', icon_color: '#FFD700'},
+    'Admin': {icon: '🛡️', icon_color: '#4F46E5'},
+    'Manager': {icon: '🎯', icon_color: '#EF4444'},
+    'Employee': {icon: '⭐', icon_color: '#10B981'}
+});
+const DEFAULT_ROLE_ICON = Object.freeze({icon: '👤', icon_color: '#6b7280'});
+
+// Map employee IDs to their roles (this could be fetched from API in real implementation)
+const EMPLOYEE_ROLES = Object.freeze({
+    'EMP001': 'Super Admin', 'EMP002': 'Admin', 'EMP003': 'Manager',
+    'EMP004': 'Employee', 'EMP005': 'Manager', 'EMP006': 'Employee'
+});
+
+const employeeOptions = ['<option value="">Select Employee</option>'];
+for (const name in employees) {
+    const id = employees[name];
+    employeeIdToName[id] = name;
+    const role = EMPLOYEE_ROLES[id] || 'Employee';
+    const icon = (ROLE_ICON_META[role] || DEFAULT_ROLE_ICON).icon;
+    employeeOptions.push(`<option value="${id}">${icon} ${name}</option>`);
+}
+employeeSelect.innerHTML = employeeOptions.join('');
+
+let lastRecordsEtag = null;
+let lastRecordsUrl = null;
+let lastRecords = null;
+let recordsFetchController = null;
+
+function debounce(func, wait) {
+  let timeout;
+  return function(...args) {
+    clearTimeout(timeout);
+    timeout = setTimeout(() => func(...args), wait);
+  };
+}
+
+async function fetchAttendanceRecords() {
+  const employee_id_filter = filterEmployeeIdInput.value;
+  const date_filter = filterDateInput.value;
+
+  let url = '/api/attendance/records';
+  const params = new URLSearchParams();
+  if (employee_id_filter) {
+      params.append('employee_id', employee_id_filter);
+  }
+  if (date_filter) {
+      params.append('date', date_filter);
+  }
+  if (params.toString()) {
+      url += `?${params.toString()}`;
+  }
+
+  const headers = {};
+  if (lastRecordsEtag && url === lastRecordsUrl) {
+      headers['If-None-Match'] = lastRecordsEtag;
+  }
+  // Only the latest request may update the table
+  recordsFetchController?.abort();
+  const controller = new AbortController();
+  recordsFetchController = controller;
+  let response;
+  try {
+      response = await fetch(url, { headers, signal: controller.signal });
+  } catch (error) {
+      if (error.name === 'AbortError') return;
+      throw error;
+  }
+  let records;
+  if (response.status === 304) {
+      // Nothing changed; only re-render while a shift is open so its duration stays current
+      const hasOpenShift = Object.values(lastRecords).some(list => list.some(r => !r.check_out_time));
+      if (!hasOpenShift) return;
+      records = lastRecords;
+  } else {
+      records = await response.json();
+      lastRecords = records;
+      lastRecordsUrl = url;
+      lastRecordsEtag = response.headers.get('ETag');
+  }
+
+  const rowsFragment = document.createDocumentFragment();
+  const realtimeStatus = {};
+
+  for (const employee_id in records) {
+    const empRecords = records[employee_id];
+    for (const record of empRecords) {
+      const row = document.createElement('tr');
+      const checkInTime = record.check_in_time ? new Date(record.check_in_time).toLocaleString() : 'N/A';
+      const checkOutTime = record.check_out_time ? new Date(record.check_out_time).toLocaleString() : 'N/A';
+      let duration = 'N/A';
+      if (record.duration_hours != null) {
+          duration = record.duration_hours.toFixed(2);
+      } else if (record.check_in_time && !record.check_out_time) {
+          const start = new Date(record.check_in_time);
+          const now = new Date();
+          duration = ((now - start) / (1000 * 60 * 60)).toFixed(2) + ' (current)';
+          realtimeStatus[employee_id] = {status: 'Checked In', duration: duration};
+      }
+
+      row.innerHTML = `
+        <td class="border-t border-white/10 p-2">${employee_id}</td>
+        <td class="border-t border-white/10 p-2">${checkInTime}</td>
+        <td class="border-t border-white/10 p-2">${checkOutTime}</td>
+        <td class="border-t border-white/10 p-2">${duration}</td>
+      `;
+      rowsFragment.appendChild(row);
+    }
+
+    if (!realtimeStatus[employee_id]) {
+        // Not currently checked in: status comes from the most recent record
+        const lastRecord = empRecords[empRecords.length - 1];
+        realtimeStatus[employee_id] = lastRecord && lastRecord.duration_hours != null
+            ? {status: 'Checked Out', duration: `${lastRecord.duration_hours.toFixed(2)} (last)`}
+            : {status: 'Unknown', duration: 'N/A'};
+    }
+  }
+  attendanceTableBody.replaceChildren(rowsFragment);
+
+  // Display real-time status
+  if (Object.keys(realtimeStatus).length === 0) {
+      realtimeStatusDiv.innerHTML = '<p class="text-white/70">No employee status to display.</p>';
+  } else {
+      const statusCards = [];
+      for (const emp_id in realtimeStatus) {
+          const employeeName = employeeIdToName[emp_id] || emp_id; // Get name or fallback to ID
+          const userRole = EMPLOYEE_ROLES[emp_id] || 'Employee';
+          const userIcon = ROLE_ICON_META[userRole] || DEFAULT_ROLE_ICON;
+
+          statusCards.push(`
+            <div class="glass p-4 rounded-lg">
+              <div class="flex items-center gap-3 mb-3">
+                  <div class="relative">
+                      <div class="w-12 h-12 rounded-full bg-slate-700 flex items-center justify-center">
+                          <span class="text-lg">👤</span>
+                      </div>
+                      <div class="absolute -bottom-1 -right-1 w-6 h-6 rounded-full flex items-center justify-center text-sm profile-icon" 
+                           style="background: ${userIcon.icon_color}; border: 2px solid rgba(255,255,255,0.8);">
+                          ${userIcon.icon}
+                      </div>
+                  </div>
+                  <div>
+                      <h3 class="font-semibold text-lg">${employeeName}</h3>
+                      <p class="text-sm text-white/60">${emp_id}</p>
+                  </div>
+              </div>
+              <p>Status: <span class="font-bold ${realtimeStatus[emp_id].status === 'Checked In' ? 'text-green-400' : 'text-red-400'}">${realtimeStatus[emp_id].status}</span></p>
+              <p>Duration: ${realtimeStatus[emp_id].duration}</p>
+            </div>
+          `);
+      }
+      realtimeStatusDiv.innerHTML = statusCards.join('');
+  }
+
+}
+
+async function handleCheckIn() {
+  const employee_id = employeeSelect.value;
+  if (!employee_id) {
+    attendanceStatus.textContent = 'Please select an Employee.';
+    return;
+  }
+  const formData = new FormData();
+  formData.append('employee_id', employee_id);
+  const response = await fetch('/api/attendance/check_in', {
+    method: 'POST',
+    body: formData,
+  });
+  const result = await response.json();
+  attendanceStatus.textContent = result.message;
+  fetchAttendanceRecords();
+}
+
+async function handleCheckOut() {
+  const employee_id = employeeSelect.value;
+  if (!employee_id) {
+    attendanceStatus.textContent = 'Please select an Employee.';
+    return;
+  }
+  const formData = new FormData();
+  formData.append('employee_id', employee_id);
+  const response = await fetch('/api/attendance/check_out', {
+    method: 'POST',
+    body: formData,
+  });
+  const result = await response.json();
+  attendanceStatus.textContent = result.message;
+  fetchAttendanceRecords();
+}
+
+checkInBtn.addEventListener('click', handleCheckIn);
+checkOutBtn.addEventListener('click', handleCheckOut);
+applyFilterBtn.addEventListener('click', fetchAttendanceRecords);
+const debouncedFetchAttendanceRecords = debounce(fetchAttendanceRecords, 200);
+filterEmployeeIdInput.addEventListener('input', debouncedFetchAttendanceRecords);
+filterDateInput.addEventListener('change', debouncedFetchAttendanceRecords);
+clearFilterBtn.addEventListener('click', () => {
+    filterEmployeeIdInput.value = '';
+    filterDateInput.value = '';
+    fetchAttendanceRecords();
+});
+
+// Initial fetch and set up real-time refresh
+fetchAttendanceRecords();
+setInterval(fetchAttendanceRecords, 30000); // Refresh every 30 seconds
@@ -0,0 +1,96 @@
+const reportEmployeeIdInput = document.getElementById('reportEmployeeId');
+const reportStartDateInput = document.getElementById('reportStartDate');
+const reportEndDateInput = document.getElementById('reportEndDate');
+const applyReportFilterBtn = document.getElementById('applyReportFilterBtn');
+const clearReportFilterBtn = document.getElementById('clearReportFilterBtn');
+const exportReportDataBtn = document.getElementById('exportReportDataBtn');
+const reportingData = document.getElementById('reportingData');
+const reportOvertimeThresholdInput = document.getElementById('reportOvertimeThreshold');
+const generateReportOvertimeBtn = document.getElementById('generateReportOvertimeBtn');
+const overtimeData = document.getElementById('overtimeData');
+
+async function fetchReports() {
+  const employee_id_filter = reportEmployeeIdInput.value;
+  const start_date = reportStartDateInput.value;
+  const end_date = reportEndDateInput.value;
+
+  // Fetch Total Hours Report
+  let reportUrl = '/api/attendance/report';
+  let reportParams = new URLSearchParams();
+  if (employee_id_filter) reportParams.append('employee_id', employee_id_filter);
+  if (start_date) reportParams.append('start_date', start_date);
+  if (end_date) reportParams.append('end_date', end_date);
+  if (reportParams.toString()) reportUrl += `?${reportParams.toString()}`;
+
+  // Build Overtime Report URL
+  let overtimeUrl = '/api/attendance/overtime';
+  let overtimeParams = new URLSearchParams();
+  if (employee_id_filter) overtimeParams.append('employee_id', employee_id_filter);
+  if (start_date) overtimeParams.append('start_date', start_date);
+  if (end_date) overtimeParams.append('end_date', end_date);
+  const threshold = reportOvertimeThresholdInput.value;
+  if (threshold) overtimeParams.append('threshold_hours', threshold);
+  if (overtimeParams.toString()) overtimeUrl += `?${overtimeParams.toString()}`;
+
+  // The two reports are independent, so request them together
+  const [totalHoursResponse, overtimeResponse] = await Promise.all([fetch(reportUrl), fetch(overtimeUrl)]);
+  const [totalHoursReport, overtimeReport] = await Promise.all([totalHoursResponse.json(), overtimeResponse.json()]);
+
+  let totalHoursHtml = '<h3>Total Hours Report</h3>';
+  if (Object.keys(totalHoursReport).length === 0) {
+      totalHoursHtml += '<p>No total hours data available.</p>';
+  } else {
+      totalHoursHtml += '<ul class="list-disc pl-5 mt-2">';
+      for (const employee_id in totalHoursReport) {
+          totalHoursHtml += `<li><strong>${employee_id}:</strong> Total Hours: ${totalHoursReport[employee_id].total_hours}</li>`;
+      }
+      totalHoursHtml += '</ul>';
+  }
+  reportingData.innerHTML = totalHoursHtml;
+
+  let overtimeHtml = '<h3>Overtime Report</h3>';
+  if (Object.keys(overtimeReport).length === 0) {
+      overtimeHtml += '<p>No overtime data available.</p>';
+  } else {
+      overtimeHtml += '<ul class="list-disc pl-5 mt-2">';
+      for (const employee_id in overtimeReport) {
+          overtimeHtml += `<li><strong>${employee_id}:</strong> Total Hours: ${overtimeReport[employee_id].total_hours}, Overtime Hours: ${overtimeReport[employee_id].overtime_hours}</li>`;
+      }
+      overtimeHtml += '</ul>';
+  }
+  overtimeData.innerHTML = overtimeHtml;
+}
+
+async function handleExportReportData() {
+    const employee_id_filter = reportEmployeeIdInput.value;
+    const start_date = reportStartDateInput.value;
+    const end_date = reportEndDateInput.value;
+
+    let url = '/api/attendance/export';
+    const params = new URLSearchParams();
+    if (employee_id_filter) params.append('employee_id', employee_id_filter);
+    if (start_date) params.append('start_date', start_date);
+    if (end_date) params.append('end_date', end_date);
+    if (params.toString()) url += `?${params.toString()}`;
+
+    // Let the browser stream the CSV straight to disk
+    const a = document.createElement('a');
+    a.href = url;
+    a.download = 'attendance_report.csv';
+    document.body.appendChild(a);
+    a.click();
+    a.remove();
+}
+
+applyReportFilterBtn.addEventListener('click', fetchReports);
+clearReportFilterBtn.addEventListener('click', () => {
+    reportEmployeeIdInput.value = '';
+    reportStartDateInput.value = '';
+    reportEndDateInput.value = '';
+    fetchReports();
+});
+exportReportDataBtn.addEventListener('click', handleExportReportData);
+generateReportOvertimeBtn.addEventListener('click', fetchReports);
+
+// Initial fetch
+fetchReports();
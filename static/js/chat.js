@@ -0,0 +1,838 @@
+// Chat application state
+let currentUser = '';
+let currentChannel = 'general';
+let currentDM = null;
+let isTyping = false;
+let selectedFile = null;
+
+// Only the newest messages are rendered; older ones are added on request
+const MESSAGE_RENDER_WINDOW = 100;
+let messageRenderLimit = MESSAGE_RENDER_WINDOW;
+let lastMessages = [];
+let lastMessagesIsDM = false;
+
+// Rendered message nodes by id, so polls only touch new or changed messages
+const renderedMessages = new Map();
+let renderedConversationKey = null;
+let chatStream = null;
+let messagesFetchController = null;
+let onlineUsersFetchController = null;
+let lastOnlineUsersSignature = null;
+const loadEarlierBtn = document.createElement('button');
+loadEarlierBtn.id = 'loadEarlierMessages';
+loadEarlierBtn.className = 'btn btn-secondary text-xs mx-auto block';
+
+// DOM elements
+const currentUserSelect = document.getElementById('currentUser');
+const userInitials = document.getElementById('userInitials');
+const onlineIndicator = document.getElementById('onlineIndicator');
+const channelsList = document.getElementById('channelsList');
+const dmsList = document.getElementById('dmsList');
+const onlineUsersList = document.getElementById('onlineUsersList');
+const chatTitle = document.getElementById('chatTitle');
+const chatDescription = document.getElementById('chatDescription');
+const messagesContainer = document.getElementById('messagesContainer');
+const messageTemplate = document.getElementById('messageTemplate');
+const messageInput = document.getElementById('messageInput');
+const sendMessage = document.getElementById('sendMessage');
+const emojiBtn = document.getElementById('emojiBtn');
+const emojiPicker = document.getElementById('emojiPicker');
+const backToHub = document.getElementById('backToHub');
+const fileBtn = document.getElementById('fileBtn');
+const fileInput = document.getElementById('fileInput');
+const filePreview = document.getElementById('filePreview');
+const fileName = document.getElementById('fileName');
+const fileSize = document.getElementById('fileSize');
+const fileIcon = document.getElementById('fileIcon');
+const removeFile = document.getElementById('removeFile');
+
+// Sidebar items by key; the DM map is rebuilt whenever the DM list is re-rendered
+const channelItemsByKey = new Map(
+    Array.from(channelsList.querySelectorAll('.channel-item'), el => [el.dataset.channel, el])
+);
+let dmItemsByKey = new Map();
+let activeChannelEl = channelItemsByKey.get(currentChannel) || null;
+let activeDmEl = null;
+
+const CHANNEL_NAMES = Object.freeze({
+    'general': 'General',
+    'packing': 'Packing Team',
+    'management': 'Management',
+    'announcements': 'Announcements'
+});
+
+// Employee data
+const employees = {
+    "Ritik": "EMP001",
+    "Sunny": "EMP002",
+    "Rahul": "EMP003",
+    "Sumit": "EMP004",
+    "Vishal": "EMP005",
+    "Nishant": "EMP006",
+};
+const employeeNamesById = Object.fromEntries(Object.entries(employees).map(([name, id]) => [id, name]));
+
+// Initialize
+function init() {
+    // Populate user dropdown in one insertion
+    const userOptions = document.createDocumentFragment();
+    for (const name in employees) {
+        userOptions.appendChild(new Option(name, employees[name]));
+    }
+    currentUserSelect.appendChild(userOptions);
+
+    // Event listeners
+    currentUserSelect.addEventListener('change', handleUserChange);
+    sendMessage.addEventListener('click', handleSendMessage);
+    messageInput.addEventListener('keypress', handleKeyPress);
+    emojiBtn.addEventListener('click', toggleEmojiPicker);
+    backToHub.addEventListener('click', () => window.location.href = '/hub');
+    fileBtn.addEventListener('click', () => fileInput.click());
+    fileInput.addEventListener('change', handleFileSelect);
+    removeFile.addEventListener('click', handleRemoveFile);
+    loadEarlierBtn.addEventListener('click', showEarlierMessages);
+    messagesContainer.addEventListener('click', (e) => {
+        const reactionBtn = e.target.closest('.reaction-btn');
+        if (reactionBtn) {
+            handleReactionClick(reactionBtn);
+            return;
+        }
+        const openTarget = e.target.closest('[data-open-url]');
+        if (openTarget) window.open(openTarget.dataset.openUrl, '_blank');
+    });
+
+    // Channel and DM clicks (delegated so re-rendered lists need no rebinding)
+    channelsList.addEventListener('click', (e) => {
+        const item = e.target.closest('[data-channel]');
+        if (item) switchToChannel(item.dataset.channel);
+    });
+    dmsList.addEventListener('click', (e) => {
+        const item = e.target.closest('[data-dm]');
+        if (item) switchToDM(item.dataset.dm);
+    });
+    onlineUsersList.addEventListener('click', (e) => {
+        const item = e.target.closest('[data-dm-user]');
+        if (item) switchToDM(item.dataset.dmUser);
+    });
+
+    // Emoji picker
+    emojiPicker.addEventListener('click', (e) => {
+        const emoji = e.target.closest('.emoji');
+        if (!emoji) return;
+        messageInput.value += emoji.textContent;
+        emojiPicker.classList.add('hidden');
+        messageInput.focus();
+    });
+
+    // Auto-resize textarea, measured at most once per frame
+    messageInput.addEventListener('input', scheduleMessageInputResize);
+
+    // Load initial data; after that the event stream pushes changes
+    loadOnlineUsers();
+    loadChannelMessages();
+    openChatStream();
+
+    // Presence expires server-side after 5 minutes of inactivity, so refresh it occasionally
+    setInterval(() => { if (!document.hidden) loadOnlineUsers(); }, 60000);
+
+    // Hidden tabs drop their stream and catch up when they are shown again
+    document.addEventListener('visibilitychange', () => {
+        if (document.hidden) {
+            closeChatStream();
+        } else {
+            reloadCurrentConversation();
+            loadOnlineUsers();
+            openChatStream();
+        }
+    });
+}
+
+function openChatStream() {
+    closeChatStream();
+    if (document.hidden) return;
+
+    let url;
+    if (currentChannel) {
+        url = `/api/chat/stream?channel=${encodeURIComponent(currentChannel)}`;
+    } else if (currentDM && currentUser) {
+        url = `/api/chat/stream?dm=${encodeURIComponent(currentDM)}&current_employee_id=${encodeURIComponent(currentUser)}`;
+    } else {
+        return;
+    }
+
+    const stream = new EventSource(url);
+    let reconnecting = false;
+    stream.onerror = () => { reconnecting = true; };
+    stream.onopen = () => {
+        // Events sent while the connection was down are not replayed
+        if (reconnecting) reloadCurrentConversation();
+        reconnecting = false;
+    };
+    stream.onmessage = (e) => handleChatEvent(JSON.parse(e.data));
+    chatStream = stream;
+}
+
+function closeChatStream() {
+    if (chatStream) {
+        chatStream.close();
+        chatStream = null;
+    }
+}
+
+function reloadCurrentConversation() {
+    if (currentChannel) {
+        loadChannelMessages();
+    } else if (currentDM) {
+        loadDMMessages(currentDM);
+    }
+}
+
+function handleChatEvent(event) {
+    if (event.type === 'presence') {
+        loadOnlineUsers();
+    } else if (event.type === 'message') {
+        if (lastMessages.some(msg => msg.id === event.message.id)) return;
+        displayMessages([...lastMessages, event.message], lastMessagesIsDM);
+    } else if (event.type === 'reaction') {
+        let reactions = event.reactions;
+        // Keep our own unsent toggles on top of the server state
+        for (const [key, pending] of pendingReactions) {
+            if (key.startsWith(`${event.message_id}|`)) {
+                reactions = withReaction(reactions, pending.emoji, currentUser, pending.active);
+            }
+        }
+        patchMessageReactions(event.message_id, reactions);
+    }
+}
+
+function patchMessageReactions(messageId, reactions) {
+    const entry = renderedMessages.get(messageId);
+    if (!entry) return;
+    entry.msg.reactions = reactions;
+    entry.node.querySelector('.message-reactions').replaceChildren(buildReactionButtons(reactions, messageId));
+    entry.signature = JSON.stringify([entry.msg.message, reactions]);
+}
+
+function withReaction(reactions, emoji, user, active) {
+    const users = (reactions[emoji] || []).filter(u => u !== user);
+    if (active) users.push(user);
+    const next = {...reactions};
+    if (users.length > 0) next[emoji] = users;
+    else delete next[emoji];
+    return next;
+}
+
+let resizePending = false;
+let lastNewlineCount = 0;
+let lastInputLength = 0;
+
+function scheduleMessageInputResize() {
+    if (resizePending) return;
+    resizePending = true;
+    requestAnimationFrame(() => {
+        resizePending = false;
+        const value = messageInput.value;
+        const newlineCount = value.split('\n').length - 1;
+        const grew = value.length >= lastInputLength;
+        const linesChanged = newlineCount !== lastNewlineCount;
+        lastInputLength = value.length;
+        lastNewlineCount = newlineCount;
+        // Typing on the same lines only needs a resize once the text overflows
+        if (!linesChanged && grew && messageInput.scrollHeight <= messageInput.clientHeight) return;
+
+        messageInput.style.height = 'auto';
+        messageInput.style.height = Math.min(messageInput.scrollHeight, 120) + 'px';
+    });
+}
+
+function handleUserChange() {
+    currentUser = currentUserSelect.value;
+    if (currentUser) {
+        const userName = employeeNamesById[currentUser];
+        userInitials.textContent = userName ? userName.charAt(0).toUpperCase() : '?';
+        onlineIndicator.className = 'w-3 h-3 bg-green-400 rounded-full';
+
+        // Update user status
+        updateUserStatus('online');
+
+        // Load DMs
+        loadDirectMessages();
+        if (currentDM) openChatStream();
+    }
+}
+
+function switchToChannel(channel) {
+    currentChannel = channel;
+    currentDM = null;
+    messageRenderLimit = MESSAGE_RENDER_WINDOW;
+
+    // Update UI
+    setActiveSidebarItems(channelItemsByKey.get(channel) || null, null);
+
+    // Update header
+    chatTitle.textContent = `# ${channel}`;
+    chatDescription.textContent = `${CHANNEL_NAMES[channel]} discussion`;
+
+    loadChannelMessages();
+    openChatStream();
+}
+
+function switchToDM(employeeId) {
+    currentDM = employeeId;
+    currentChannel = null;
+    messageRenderLimit = MESSAGE_RENDER_WINDOW;
+
+    // Update UI
+    setActiveSidebarItems(null, dmItemsByKey.get(employeeId) || null);
+
+    // Update header
+    const employeeName = employeeNamesById[employeeId];
+    chatTitle.textContent = `@ ${employeeName}`;
+    chatDescription.textContent = 'Direct message';
+
+    loadDMMessages(employeeId);
+    openChatStream();
+}
+
+function setActiveSidebarItems(channelEl, dmEl) {
+    activeChannelEl?.classList.remove('active');
+    activeDmEl?.classList.remove('active');
+    channelEl?.classList.add('active');
+    dmEl?.classList.add('active');
+    activeChannelEl = channelEl;
+    activeDmEl = dmEl;
+}
+
+// Only the latest conversation load may render; switching cancels the one in flight
+function startMessagesFetch() {
+    messagesFetchController?.abort();
+    messagesFetchController = new AbortController();
+    return messagesFetchController.signal;
+}
+
+// Last response per conversation URL, revalidated with If-None-Match
+const conversationCache = new Map();
+let displayedConversationUrl = null;
+
+async function fetchConversation(url, isDM) {
+    const signal = startMessagesFetch();
+    const cached = conversationCache.get(url);
+    const headers = cached ? { 'If-None-Match': cached.etag } : {};
+    const response = await fetch(url, { headers, signal });
+    if (response.status === 304) {
+        // Unchanged: leave the DOM alone if this conversation is already on screen
+        if (url !== displayedConversationUrl) {
+            displayedConversationUrl = url;
+            displayMessages(cached.messages, isDM);
+        }
+        return;
+    }
+    const data = await response.json();
+    const etag = response.headers.get('ETag');
+    if (etag) conversationCache.set(url, { etag, messages: data.messages });
+    displayedConversationUrl = url;
+    displayMessages(data.messages, isDM);
+}
+
+async function loadChannelMessages() {
+    if (!currentChannel) return;
+
+    try {
+        await fetchConversation(`/api/chat/channel/${currentChannel}`, false);
+    } catch (error) {
+        if (error.name === 'AbortError') return;
+        console.error('Error loading channel messages:', error);
+    }
+}
+
+async function loadDMMessages(employeeId) {
+    if (!currentUser || !employeeId) return;
+
+    try {
+        await fetchConversation(`/api/chat/dm/${employeeId}?current_employee_id=${currentUser}`, true);
+    } catch (error) {
+        if (error.name === 'AbortError') return;
+        console.error('Error loading DM messages:', error);
+    }
+}
+
+function displayMessages(messages, isDM = false) {
+    lastMessages = messages || [];
+    lastMessagesIsDM = isDM;
+
+    // A different conversation (or viewer) shares no nodes with the current one
+    const conversationKey = `${currentUser}|` + (isDM ? `dm:${currentDM}` : `channel:${currentChannel}`);
+    const switched = conversationKey !== renderedConversationKey;
+    // Read scroll state before any DOM writes so it does not force a layout
+    const followBottom = switched || renderedMessages.size === 0 ||
+        messagesContainer.scrollHeight - messagesContainer.scrollTop - messagesContainer.clientHeight < 80;
+    if (switched) {
+        renderedConversationKey = conversationKey;
+        renderedMessages.clear();
+        lazyImageObserver.disconnect();
+        messagesContainer.replaceChildren();
+    }
+
+    if (lastMessages.length === 0) {
+        renderedMessages.clear();
+        lazyImageObserver.disconnect();
+        messagesContainer.innerHTML = '<div class="text-center text-white/60">No messages yet. Start the conversation!</div>';
+        return;
+    }
+    if (renderedMessages.size === 0) {
+        // Drop the loading / empty placeholder
+        messagesContainer.replaceChildren();
+    }
+
+    const hiddenCount = Math.max(0, lastMessages.length - messageRenderLimit);
+    const visible = lastMessages.slice(hiddenCount);
+    const visibleIds = new Set();
+    let appended = false;
+
+    let prev = null;
+    if (hiddenCount > 0) {
+        loadEarlierBtn.textContent = `Show earlier messages (${hiddenCount})`;
+        if (messagesContainer.firstChild !== loadEarlierBtn) messagesContainer.prepend(loadEarlierBtn);
+        prev = loadEarlierBtn;
+    } else {
+        loadEarlierBtn.remove();
+    }
+
+    for (const msg of visible) {
+        visibleIds.add(msg.id);
+        const signature = JSON.stringify([msg.message, msg.reactions || {}]);
+        let entry = renderedMessages.get(msg.id);
+        if (!entry) {
+            entry = {node: createMessageNode(msg, isDM), signature, msg};
+            renderedMessages.set(msg.id, entry);
+            appended = true;
+        } else if (entry.signature !== signature) {
+            entry.node.querySelector('.message-bubble').textContent = msg.message;
+            entry.node.querySelector('.message-reactions').replaceChildren(buildReactionButtons(msg.reactions || {}, msg.id));
+            entry.signature = signature;
+        }
+        entry.msg = msg;
+        // Only move nodes that are out of order; a stable list touches nothing here
+        const expected = prev ? prev.nextSibling : messagesContainer.firstChild;
+        if (entry.node !== expected) messagesContainer.insertBefore(entry.node, expected);
+        prev = entry.node;
+    }
+
+    for (const [id, entry] of renderedMessages) {
+        if (!visibleIds.has(id)) {
+            for (const img of entry.node.querySelectorAll('img[data-src]:not([src])')) {
+                lazyImageObserver.unobserve(img);
+            }
+            entry.node.remove();
+            renderedMessages.delete(id);
+        }
+    }
+
+    // Scroll in the next frame, after the browser has laid out the new rows once
+    if (appended && followBottom) {
+        requestAnimationFrame(() => {
+            messagesContainer.scrollTop = messagesContainer.scrollHeight;
+        });
+    }
+}
+
+function createMessageNode(msg, isDM) {
+    const time = new Date(msg.timestamp).toLocaleTimeString([], {hour: '2-digit', minute:'2-digit'});
+    const isOwnMessage = isDM ? msg.from_employee_id === currentUser : msg.employee_id === currentUser;
+    const senderName = isDM ? msg.from_employee_name : msg.employee_name;
+
+    const node = messageTemplate.content.firstElementChild.cloneNode(true);
+    node.querySelector('.message-avatar').textContent = senderName.charAt(0).toUpperCase();
+    const sender = node.querySelector('.message-sender');
+    sender.textContent = senderName;
+    sender.classList.add(isOwnMessage ? 'text-blue-400' : 'text-white');
+    node.querySelector('.message-time').textContent = time;
+    node.querySelector('.message-bubble').textContent = msg.message;
+
+    const reactionsRow = node.querySelector('.message-reactions');
+    reactionsRow.dataset.messageId = msg.id;
+    reactionsRow.append(buildReactionButtons(msg.reactions || {}, msg.id));
+    if (msg.file_attachment) {
+        reactionsRow.before(buildFileAttachment(msg.file_attachment));
+    }
+    if (msg.links && msg.links.length > 0) {
+        reactionsRow.before(...msg.links.map(buildLinkPreview));
+    }
+    return node;
+}
+
+function showEarlierMessages() {
+    // Keep the viewport anchored on the message that was at the top
+    const distanceFromBottom = messagesContainer.scrollHeight - messagesContainer.scrollTop;
+    messageRenderLimit += MESSAGE_RENDER_WINDOW;
+    displayMessages(lastMessages, lastMessagesIsDM);
+    messagesContainer.scrollTop = messagesContainer.scrollHeight - distanceFromBottom;
+}
+
+function buildReactionButtons(reactions, messageId) {
+    const frag = document.createDocumentFragment();
+    for (const emoji in reactions) {
+        const users = reactions[emoji];
+        if (users.length > 0) {
+            const btn = document.createElement('span');
+            btn.className = users.includes(currentUser) ? 'reaction-btn active' : 'reaction-btn';
+            btn.dataset.messageId = messageId;
+            btn.dataset.emoji = emoji;
+            btn.textContent = `${emoji} ${users.length}`;
+            frag.appendChild(btn);
+        }
+    }
+    return frag;
+}
+
+// One observer for every attachment image: an image starts loading when it nears the viewport
+const lazyImageObserver = new IntersectionObserver((entries) => {
+    for (const entry of entries) {
+        if (entry.isIntersecting) {
+            const img = entry.target;
+            img.src = img.dataset.src;
+            lazyImageObserver.unobserve(img);
+        }
+    }
+}, { root: messagesContainer, rootMargin: '200px' });
+
+const FILE_TYPE_ICONS = Object.freeze({
+    'image': '🖼️',
+    'video': '🎥',
+    'audio': '🎵',
+    'pdf': '📄',
+    'document': '📝',
+    'file': '📎'
+});
+
+function buildFileAttachment(fileAttachment) {
+    const wrapper = document.createElement('div');
+    wrapper.className = 'file-attachment';
+
+    if (fileAttachment.file_type === 'image') {
+        const img = document.createElement('img');
+        img.dataset.src = fileAttachment.url;
+        img.loading = 'lazy';
+        lazyImageObserver.observe(img);
+        img.alt = fileAttachment.filename;
+        img.className = 'image-preview';
+        img.dataset.openUrl = fileAttachment.url;
+        wrapper.appendChild(img);
+        return wrapper;
+    }
+
+    wrapper.dataset.openUrl = fileAttachment.url;
+    const icon = document.createElement('div');
+    icon.className = 'file-icon';
+    icon.textContent = FILE_TYPE_ICONS[fileAttachment.file_type] || '📎';
+    const details = document.createElement('div');
+    details.className = 'flex-1';
+    const name = document.createElement('div');
+    name.className = 'font-medium text-sm';
+    name.textContent = fileAttachment.filename;
+    const size = document.createElement('div');
+    size.className = 'text-xs text-white/60';
+    size.textContent = formatFileSize(fileAttachment.file_size);
+    details.append(name, size);
+    const download = document.createElement('div');
+    download.className = 'text-blue-400 text-sm';
+    download.textContent = 'Download';
+    wrapper.append(icon, details, download);
+    return wrapper;
+}
+
+function buildLinkPreview(link) {
+    const preview = document.createElement('a');
+    preview.className = 'link-preview block';
+    preview.href = link.url;
+    preview.target = '_blank';
+    preview.rel = 'noopener noreferrer';
+    const title = document.createElement('div');
+    title.className = 'font-medium text-sm text-blue-400';
+    title.textContent = link.title;
+    const description = document.createElement('div');
+    description.className = 'text-xs text-white/60 mt-1';
+    description.textContent = link.description;
+    const url = document.createElement('div');
+    url.className = 'text-xs text-white/40 mt-1';
+    url.textContent = link.url;
+    preview.append(title, description, url);
+    return preview;
+}
+
+// Unsent reaction toggles keyed by "messageId|emoji"; rapid clicks collapse into one request
+const pendingReactions = new Map();
+const REACTION_DEBOUNCE_MS = 300;
+
+function handleReactionClick(reactionBtn) {
+    if (!currentUser) return;
+
+    const messageId = reactionBtn.dataset.messageId;
+    const emoji = reactionBtn.dataset.emoji;
+    const entry = renderedMessages.get(messageId);
+    if (!entry) return;
+
+    const key = `${messageId}|${emoji}`;
+    const active = !reactionBtn.classList.contains('active');
+    let pending = pendingReactions.get(key);
+    if (pending) {
+        clearTimeout(pending.timer);
+    } else {
+        pending = {messageId, emoji, sentActive: !active};
+        pendingReactions.set(key, pending);
+    }
+    pending.active = active;
+
+    // Show the toggle immediately; the server is told once the clicks settle
+    patchMessageReactions(messageId, withReaction(entry.msg.reactions || {}, emoji, currentUser, active));
+    pending.timer = setTimeout(() => sendReaction(key), REACTION_DEBOUNCE_MS);
+}
+
+async function sendReaction(key) {
+    const pending = pendingReactions.get(key);
+    pendingReactions.delete(key);
+    if (!pending || pending.active === pending.sentActive) return;
+
+    try {
+        const endpoint = pending.active ? '/api/chat/reaction/add' : '/api/chat/reaction/remove';
+        const response = await postJSON(endpoint, {
+            message_id: pending.messageId,
+            employee_id: currentUser,
+            emoji: pending.emoji
+        });
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+    } catch (error) {
+        console.error('Error handling reaction:', error);
+        // Roll back the optimistic toggle
+        const entry = renderedMessages.get(pending.messageId);
+        if (entry) {
+            patchMessageReactions(pending.messageId, withReaction(entry.msg.reactions || {}, pending.emoji, currentUser, pending.sentActive));
+        }
+    }
+}
+
+function postJSON(url, body) {
+    return fetch(url, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(body)
+    });
+}
+
+async function handleSendMessage() {
+    if (!currentUser) {
+        alert('Please select your name first.');
+        return;
+    }
+
+    const message = messageInput.value.trim();
+    if (!message && !selectedFile) return;
+
+    try {
+        let fileInfo = null;
+
+        // Upload file if selected
+        if (selectedFile) {
+            fileInfo = await uploadFile(selectedFile, currentUser);
+            if (!fileInfo) return; // Upload failed
+        }
+
+        if (currentChannel) {
+            await postJSON('/api/chat/channel/send', {
+                channel: currentChannel,
+                employee_id: currentUser,
+                message,
+                file_info: fileInfo
+            });
+        } else if (currentDM) {
+            await postJSON('/api/chat/dm/send', {
+                from_employee_id: currentUser,
+                to_employee_id: currentDM,
+                message,
+                file_info: fileInfo
+            });
+        }
+
+        messageInput.value = '';
+        messageInput.style.height = 'auto';
+        lastInputLength = 0;
+        lastNewlineCount = 0;
+        handleRemoveFile(); // Clear file selection
+
+    } catch (error) {
+        console.error('Error sending message:', error);
+    }
+}
+
+function handleKeyPress(e) {
+    if (e.key === 'Enter' && !e.shiftKey) {
+        e.preventDefault();
+        handleSendMessage();
+    }
+}
+
+function toggleEmojiPicker() {
+    // The picker is only mounted the first time it is opened
+    if (!emojiPicker.firstElementChild) {
+        emojiPicker.appendChild(document.getElementById('emojiPickerTemplate').content.cloneNode(true));
+    }
+    emojiPicker.classList.toggle('hidden');
+}
+
+function handleFileSelect(e) {
+    const file = e.target.files[0];
+    if (!file) return;
+
+    // Check file size (10MB limit)
+    if (file.size > 10 * 1024 * 1024) {
+        alert('File too large. Maximum size is 10MB.');
+        return;
+    }
+
+    selectedFile = file;
+    showFilePreview(file);
+}
+
+function showFilePreview(file) {
+    fileName.textContent = file.name;
+    fileSize.textContent = formatFileSize(file.size);
+
+    // Set appropriate icon based on file type
+    const ext = file.name.split('.').pop().toLowerCase();
+    if (['jpg', 'jpeg', 'png', 'gif', 'webp'].includes(ext)) {
+        fileIcon.textContent = '🖼️';
+    } else if (['mp4', 'avi', 'mov', 'wmv'].includes(ext)) {
+        fileIcon.textContent = '🎥';
+    } else if (['mp3', 'wav', 'ogg'].includes(ext)) {
+        fileIcon.textContent = '🎵';
+    } else if (ext === 'pdf') {
+        fileIcon.textContent = '📄';
+    } else if (['doc', 'docx', 'txt'].includes(ext)) {
+        fileIcon.textContent = '📝';
+    } else {
+        fileIcon.textContent = '📎';
+    }
+
+    filePreview.classList.remove('hidden');
+}
+
+function handleRemoveFile() {
+    selectedFile = null;
+    fileInput.value = '';
+    filePreview.classList.add('hidden');
+}
+
+const LOG_1024 = Math.log(1024);
+const SIZE_UNITS = ['Bytes', 'KB', 'MB', 'GB'];
+const fileSizeLabels = new Map();
+
+function formatFileSize(bytes) {
+    if (bytes === 0) return '0 Bytes';
+    let label = fileSizeLabels.get(bytes);
+    if (label === undefined) {
+        const i = Math.min(Math.floor(Math.log(bytes) / LOG_1024), SIZE_UNITS.length - 1);
+        // 1024 ** i as a shift; i <= 3 keeps it within 32 bits
+        label = +(bytes / (1 << (i * 10))).toFixed(2) + ' ' + SIZE_UNITS[i];
+        fileSizeLabels.set(bytes, label);
+    }
+    return label;
+}
+
+async function uploadFile(file, employeeId) {
+    const formData = new FormData();
+    formData.append('file', file);
+    formData.append('employee_id', employeeId);
+
+    try {
+        const response = await fetch('/api/chat/upload', {
+            method: 'POST',
+            body: formData
+        });
+
+        if (response.ok) {
+            const result = await response.json();
+            return result.file;
+        } else {
+            throw new Error('Upload failed');
+        }
+    } catch (error) {
+        console.error('File upload error:', error);
+        alert('Failed to upload file.');
+        return null;
+    }
+}
+
+async function loadOnlineUsers() {
+    onlineUsersFetchController?.abort();
+    const controller = new AbortController();
+    onlineUsersFetchController = controller;
+    try {
+        const response = await fetch('/api/chat/users/online', { signal: controller.signal });
+        const data = await response.json();
+
+        // Presence refreshes usually return the same people; skip the rebuild then
+        const signature = data.online_users.map(user => `${user.employee_id}:${user.employee_name}`).join('|');
+        if (signature === lastOnlineUsersSignature) return;
+        lastOnlineUsersSignature = signature;
+
+        if (data.online_users.length === 0) {
+            onlineUsersList.innerHTML = '<div class="text-xs text-white/40">No one online</div>';
+            return;
+        }
+
+        const frag = document.createDocumentFragment();
+        for (const user of data.online_users) {
+            const row = document.createElement('div');
+            row.className = 'flex items-center gap-2 p-1 cursor-pointer hover:bg-white/5 rounded text-sm';
+            row.dataset.dmUser = user.employee_id;
+            const dot = document.createElement('div');
+            dot.className = 'online-dot';
+            const name = document.createElement('span');
+            name.textContent = user.employee_name;
+            row.append(dot, name);
+            frag.appendChild(row);
+        }
+        onlineUsersList.replaceChildren(frag);
+    } catch (error) {
+        if (error.name === 'AbortError') return;
+        console.error('Error loading online users:', error);
+    }
+}
+
+async function loadDirectMessages() {
+    if (!currentUser) return;
+
+    let html = '';
+    for (const [name, empId] of Object.entries(employees)) {
+        if (empId !== currentUser) {
+            html += `
+                <div class="dm-item" data-dm="${empId}">
+                    <div class="w-6 h-6 rounded-full bg-gradient-to-r from-green-500 to-blue-500 flex items-center justify-center">
+                        <span class="text-white text-xs font-semibold">${name.charAt(0).toUpperCase()}</span>
+                    </div>
+                    <span class="text-sm">${name}</span>
+                </div>
+            `;
+        }
+    }
+
+    dmsList.innerHTML = html;
+    dmItemsByKey = new Map(
+        Array.from(dmsList.querySelectorAll('.dm-item'), el => [el.dataset.dm, el])
+    );
+    activeDmEl = currentDM ? dmItemsByKey.get(currentDM) || null : null;
+    activeDmEl?.classList.add('active');
+}
+
+async function updateUserStatus(status) {
+    if (!currentUser) return;
+
+    try {
+        await postJSON('/api/chat/status/update', { employee_id: currentUser, status });
+    } catch (error) {
+        console.error('Error updating status:', error);
+    }
+}
+
+// Initialize the app
+init();
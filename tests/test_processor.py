@@ -0,0 +1,52 @@
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("httpx")
+pytest.importorskip("PIL")
+
+import pandas as pd
+
+import processor
+
+
+def _read_with_c_engine(path):
+    return pd.read_csv(path, dtype=str, keep_default_na=False, engine="c")
+
+
+def test_read_orders_csv_ragged_rows(tmp_path):
+    path = tmp_path / "orders.csv"
+    path.write_text(
+        "Order Name,Lineitem Properties,Lineitem Name,Lineitem Variant Title\n"
+        "#ER1001,[],Necklace,Gold\n"
+        "#ER1002,[]\n",
+        encoding="utf-8",
+    )
+    df = processor.read_orders_csv(path)
+    pd.testing.assert_frame_equal(df, _read_with_c_engine(path))
+    assert len(df) == 2
+
+
+def test_read_orders_csv_duplicate_header(tmp_path):
+    path = tmp_path / "orders.csv"
+    path.write_text(
+        "Order Name,Lineitem Name,Lineitem Name\n"
+        "#ER1001,Necklace,Bracelet\n",
+        encoding="utf-8",
+    )
+    df = processor.read_orders_csv(path)
+    assert list(df.columns) == ["Order Name", "Lineitem Name", "Lineitem Name.1"]
+    assert df.loc[0, "Lineitem Name"] == "Necklace"
+
+
+def test_write_csv_keeps_keys_missing_from_first_row(tmp_path):
+    rows = [
+        {"Order ID": "#ER1001", "Type": "Main Photo"},
+        {"Order ID": "#ER1002", "Type": "Polaroid 1", "Link": "not-a-url"},
+    ]
+    path = tmp_path / "skipped.csv"
+    processor.write_csv(rows, path)
+
+    assert path.read_bytes().startswith(processor.UTF8_BOM)
+    df = pd.read_csv(path, dtype=str, keep_default_na=False, encoding="utf-8-sig")
+    assert list(df.columns) == ["Order ID", "Type", "Link"]
+    assert df["Link"].tolist() == ["", "not-a-url"]